@@ -4,9 +4,12 @@ PostgreSQL connection settings and utilities
 """
 
 import os
+import time
+import threading
+import weakref
 import psycopg2
 from psycopg2.extras import RealDictCursor, Json
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import logging
 from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
@@ -52,43 +55,287 @@ POOL_CONFIG = {
     'maxconn': safe_int_env('DB_POOL_MAX', 20),
 }
 
+# Seconds a caller waits for a free pooled connection before giving up
+POOL_CHECKOUT_TIMEOUT = safe_int_env('DB_POOL_TIMEOUT', 10)
+
+# Idle connections older than this (seconds) are pinged before being handed out
+POOL_HEALTHCHECK_INTERVAL = safe_int_env('DB_POOL_HEALTHCHECK_INTERVAL', 30)
+
+# Idle connections older than this (seconds) are closed and replaced instead of reused
+POOL_MAX_IDLE = safe_int_env('DB_POOL_MAX_IDLE', 300)
+
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+    pass
+
+class PooledConnection:
+    """
+    A connection checked out of the shared pool.
+
+    Behaves like a raw psycopg2 connection so existing call sites keep working:
+    ``with manager.connection() as conn`` commits/rolls back like psycopg2 and then
+    returns the connection to the pool, and ``conn.close()`` returns it instead of
+    tearing down the TCP session.
+    """
+
+    def __init__(self, manager: 'DatabaseManager', conn):
+        object.__setattr__(self, '_manager', manager)
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_generation', manager._generation)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, '_conn')
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    @property
+    def closed(self) -> int:
+        conn = object.__getattribute__(self, '_conn')
+        return 1 if conn is None else conn.closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        conn = object.__getattribute__(self, '_conn')
+        try:
+            if conn is not None and not conn.closed:
+                if exc_type is None:
+                    conn.commit()
+                else:
+                    conn.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        conn = object.__getattribute__(self, '_conn')
+        if conn is not None:
+            object.__setattr__(self, '_conn', None)
+            object.__getattribute__(self, '_manager')._release(
+                conn, object.__getattribute__(self, '_generation'))
+
+    def __del__(self):
+        # Safety net for call sites that return early without closing
+        try:
+            self.close()
+        except Exception:
+            pass
+
+def _reset_manager_after_fork(manager_ref):
+    manager = manager_ref()
+    if manager is not None:
+        manager._reset_after_fork()
+
 class DatabaseManager:
-    """Database manager for PostgreSQL operations"""
+    """
+    Database manager for PostgreSQL operations backed by a thread-safe connection pool.
+
+    The pool is created lazily on first checkout and again in every child process
+    after ``fork()``, so gunicorn workers started with ``preload_app`` never share
+    the master's sockets.
+    """
 
-    def __init__(self):
+    # Pools inherited across fork() are kept referenced so their sockets are never
+    # finalised (and the parent's sessions terminated) from inside the child.
+    _abandoned_pools: List[Any] = []
+
+    def __init__(self, minconn: int = None, maxconn: int = None,
+                 checkout_timeout: float = None, healthcheck_interval: float = None,
+                 max_idle: float = None):
         self.pool = None
-        self._initialize_pool()
+        self.minconn = minconn if minconn is not None else POOL_CONFIG['minconn']
+        self.maxconn = maxconn if maxconn is not None else POOL_CONFIG['maxconn']
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else POOL_CHECKOUT_TIMEOUT
+        self.healthcheck_interval = (healthcheck_interval if healthcheck_interval is not None
+                                     else POOL_HEALTHCHECK_INTERVAL)
+        self.max_idle = max_idle if max_idle is not None else POOL_MAX_IDLE
+        self._generation = 0
+        self._reset_state()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=lambda ref=weakref.ref(self): _reset_manager_after_fork(ref))
+
+    def _reset_state(self):
+        """(Re)create locks, slots and counters for the current process"""
+        self._pid = os.getpid()
+        self._init_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._stats_lock = threading.Lock()
+        self._last_used: Dict[int, float] = {}
+        self._stats = {
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'health_check_failures': 0,
+            'recycled_idle': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        }
+
+    def _reset_after_fork(self):
+        """Drop the parent's pool in a freshly forked child; the next checkout builds a new one"""
+        if self.pool is not None:
+            DatabaseManager._abandoned_pools.append(self.pool)
+            self.pool = None
+        self._generation += 1
+        self._reset_state()
 
     def _initialize_pool(self):
         """Initialize the connection pool"""
         try:
-            self.pool = SimpleConnectionPool(
-                **POOL_CONFIG,
+            self.pool = ThreadedConnectionPool(
+                self.minconn,
+                self.maxconn,
                 **DATABASE_CONFIG
             )
-            logger.info("✅ Database connection pool initialized successfully")
+            self._pool_created_at = time.monotonic()
+            for conn in getattr(self.pool, '_pool', []):
+                self._last_used[id(conn)] = self._pool_created_at
+            logger.info(f"✅ Database connection pool initialized successfully "
+                        f"(pid={os.getpid()}, min={self.minconn}, max={self.maxconn})")
         except Exception as e:
             logger.error(f"❌ Failed to initialize database pool: {e}")
             raise
 
+    def _ensure_pool(self):
+        """Create the pool on first use in this process"""
+        if self.pool is None:
+            with self._init_lock:
+                if self.pool is None:
+                    self._initialize_pool()
+
+    def _is_healthy(self, conn) -> bool:
+        """Cheap liveness check, only pinging connections that sat idle for a while"""
+        if conn.closed:
+            with self._stats_lock:
+                self._stats['health_check_failures'] += 1
+            return False
+        now = time.monotonic()
+        if id(conn) not in self._last_used:
+            # Opened just now by getconn()
+            self._last_used[id(conn)] = now
+            return True
+        idle_for = now - self._last_used[id(conn)]
+        if idle_for > self.max_idle:
+            with self._stats_lock:
+                self._stats['recycled_idle'] += 1
+            return False
+        if idle_for < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            with self._stats_lock:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _checkout(self, timeout: float = None):
+        """Take a healthy raw connection out of the pool, waiting up to ``timeout`` seconds"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        self._ensure_pool()
+        if not self._slots.acquire(timeout=timeout):
+            with self._stats_lock:
+                self._stats['checkout_timeouts'] += 1
+            raise PoolTimeoutError(f"No database connection available within {timeout}s "
+                                   f"(pool max={self.maxconn})")
+        try:
+            conn = None
+            # Each discarded connection frees a pool slot, so this loop always terminates
+            for _ in range(self.maxconn + 1):
+                conn = self.pool.getconn()
+                if self._is_healthy(conn):
+                    break
+                self._last_used.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+                conn = None
+            if conn is None:
+                raise PoolError("Could not obtain a healthy database connection")
+        except Exception:
+            self._slots.release()
+            raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+            self._stats['total_wait_ms'] += wait_ms
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+        return conn
+
+    def _release(self, conn, generation: int = None):
+        """Hand a raw connection back to the pool"""
+        if generation is not None and generation != self._generation:
+            # Checked out before a fork; it belongs to the abandoned parent pool
+            return
+        try:
+            if conn.closed:
+                self._last_used.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+            else:
+                if conn.autocommit:
+                    conn.autocommit = False
+                self._last_used[id(conn)] = time.monotonic()
+                # putconn rolls back any transaction the caller left open
+                self.pool.putconn(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to return connection to pool: {e}")
+        finally:
+            with self._stats_lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+
+    def connection(self, timeout: float = None) -> PooledConnection:
+        """Check out a pooled connection that can be used like ``psycopg2.connect()``"""
+        return PooledConnection(self, self._checkout(timeout))
+
     @contextmanager
     def get_connection(self):
         """Get a connection from the pool"""
         conn = None
+        generation = self._generation
         try:
-            conn = self.pool.getconn()
+            conn = self._checkout()
             yield conn
         except Exception as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
             logger.error(f"❌ Database connection error: {e}")
             raise
         finally:
             if conn:
-                self.pool.putconn(conn)
+                self._release(conn, generation)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizing and checkout metrics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        checkouts = stats['checkouts']
+        stats.update({
+            'pid': self._pid,
+            'pool_initialized': self.pool is not None,
+            'minconn': self.minconn,
+            'maxconn': self.maxconn,
+            'idle': len(getattr(self.pool, '_pool', []) or []),
+            'avg_wait_ms': round(stats['total_wait_ms'] / checkouts, 3) if checkouts else 0.0,
+            'utilisation': round(stats['in_use'] / self.maxconn, 3) if self.maxconn else 0.0,
+        })
+        stats['total_wait_ms'] = round(stats['total_wait_ms'], 3)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 3)
+        return stats
 
     @contextmanager
     def get_cursor(self, commit=True):
@@ -383,14 +630,21 @@ class AnalyticsRepository:
 
 # Global database manager instance
 db_manager = None
+_db_manager_lock = threading.Lock()
 
 def initialize_database():
     """Initialize the global database manager"""
     global db_manager
     if db_manager is None:
-        db_manager = DatabaseManager()
+        with _db_manager_lock:
+            if db_manager is None:
+                db_manager = DatabaseManager()
     return db_manager
 
+def get_pooled_connection(timeout: float = None) -> PooledConnection:
+    """Check out a connection from the process-wide pool shared by every component"""
+    return initialize_database().connection(timeout)
+
 def get_repositories():
     """Get repository instances"""
     if db_manager is None:
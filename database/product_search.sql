@@ -0,0 +1,29 @@
+-- =====================================================================
+-- PRODUCT SEARCH INDEXES
+-- Full-text search vector (GIN) for search_products; ranking also uses
+-- the existing trigram index idx_products_name_gin
+-- =====================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Weighted document: name and brand rank above category, description lowest.
+-- A generated column is recomputed by PostgreSQL on every INSERT/UPDATE.
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(product_name, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(brand, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+    ) STORED;
+
+COMMENT ON COLUMN products.search_vector IS 'Weighted full-text document (name/brand A, category B, description C)';
+
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING gin(search_vector);
+
+-- Trigram matching on product_name (typos, partial words) uses the existing index
+CREATE INDEX IF NOT EXISTS idx_products_name_gin ON products USING gin(product_name gin_trgm_ops);
+
+ANALYZE products;
+
+SELECT 'Product search indexes ready: ' || COUNT(*) || ' products' AS status
+FROM products;
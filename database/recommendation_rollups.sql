@@ -0,0 +1,203 @@
+-- =====================================================================
+-- RECOMMENDATION ROLLUP TABLES
+-- Precomputed popularity and co-purchase counts so recommendation
+-- queries are indexed lookups instead of aggregates over orders
+-- =====================================================================
+
+-- Orders per product, per customer state ('ALL' = every state)
+CREATE TABLE IF NOT EXISTS product_popularity (
+    product_id INTEGER NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+    state VARCHAR(50) NOT NULL,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    last_30d_count INTEGER NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, state)
+);
+
+COMMENT ON TABLE product_popularity IS 'Order counts per product and customer state (state = ALL for the national total)';
+COMMENT ON COLUMN product_popularity.order_count IS 'All-time orders; incremented by trg_orders_recommendation_rollups';
+COMMENT ON COLUMN product_popularity.last_30d_count IS 'Orders in the last 30 days; exact after refresh_recommendation_rollups()';
+
+CREATE INDEX IF NOT EXISTS idx_product_popularity_state_count
+    ON product_popularity(state, order_count DESC);
+CREATE INDEX IF NOT EXISTS idx_product_popularity_state_recent
+    ON product_popularity(state, last_30d_count DESC);
+
+-- Customers who bought both products (symmetric: both (a, b) and (b, a) are stored)
+CREATE TABLE IF NOT EXISTS product_copurchase (
+    product_a INTEGER NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+    product_b INTEGER NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+    weight INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_a, product_b)
+);
+
+COMMENT ON TABLE product_copurchase IS 'Number of customers who bought both product_a and product_b';
+
+CREATE INDEX IF NOT EXISTS idx_product_copurchase_a_weight
+    ON product_copurchase(product_a, weight DESC);
+
+-- Needed by the incremental trigger to find a customer's other purchases quickly
+CREATE INDEX IF NOT EXISTS idx_orders_customer_product ON orders(customer_id, product_id);
+
+-- ---------------------------------------------------------------------
+-- Full rebuild (periodic job): exact counts and rolling 30-day window
+-- The aggregates are built into temp staging tables without locking the
+-- rollups, so create_order's trigger keeps running. Only the final swap
+-- holds the lock; orders committed after the staging snapshot (created_at
+-- within catchup_window, not yet staged) are added back during the swap.
+-- ---------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION refresh_recommendation_rollups()
+RETURNS VOID AS $$
+DECLARE
+    -- Orders committed after the snapshot but created longer ago than this are picked up by the next run
+    catchup_window CONSTANT INTERVAL := INTERVAL '15 minutes';
+    started_at TIMESTAMP := clock_timestamp();
+BEGIN
+    DROP TABLE IF EXISTS pg_temp.rollup_orders, pg_temp.rollup_popularity,
+                         pg_temp.rollup_copurchase, pg_temp.rollup_late_orders;
+
+    -- One statement, so one snapshot: every aggregate below agrees on the same set of orders
+    CREATE TEMP TABLE rollup_orders ON COMMIT DROP AS
+    SELECT o.order_id, o.created_at, o.customer_id, o.product_id, c.state
+    FROM orders o
+    JOIN customers c ON c.customer_id = o.customer_id
+    JOIN products p ON p.product_id = o.product_id;
+    CREATE INDEX ON rollup_orders(customer_id, product_id);
+    CREATE INDEX ON rollup_orders(order_id, created_at);
+    ANALYZE rollup_orders;
+
+    CREATE TEMP TABLE rollup_popularity ON COMMIT DROP AS
+    SELECT r.product_id,
+           COALESCE(r.state, 'ALL') AS state,
+           COUNT(*) AS order_count,
+           COUNT(*) FILTER (WHERE r.created_at >= CURRENT_DATE - INTERVAL '30 days') AS last_30d_count
+    FROM rollup_orders r
+    GROUP BY GROUPING SETS ((r.product_id, r.state), (r.product_id));
+
+    CREATE TEMP TABLE rollup_copurchase ON COMMIT DROP AS
+    SELECT a.product_id AS product_a, b.product_id AS product_b, COUNT(*) AS weight
+    FROM (SELECT DISTINCT customer_id, product_id FROM rollup_orders) a
+    JOIN (SELECT DISTINCT customer_id, product_id FROM rollup_orders) b
+      ON a.customer_id = b.customer_id AND a.product_id <> b.product_id
+    GROUP BY a.product_id, b.product_id;
+
+    -- Short critical section: serialise with the incremental trigger for the swap only
+    LOCK TABLE product_popularity, product_copurchase IN SHARE ROW EXCLUSIVE MODE;
+
+    -- Holding the lock, every order whose trigger already ran has committed; later ones
+    -- are still waiting on the lock and will be counted by their own trigger after the swap
+    CREATE TEMP TABLE rollup_late_orders ON COMMIT DROP AS
+    SELECT o.order_id, o.created_at, o.customer_id, o.product_id, c.state
+    FROM orders o
+    JOIN customers c ON c.customer_id = o.customer_id
+    JOIN products p ON p.product_id = o.product_id
+    WHERE o.created_at >= started_at - catchup_window
+      AND NOT EXISTS (
+          SELECT 1 FROM rollup_orders r
+          WHERE r.order_id = o.order_id AND r.created_at = o.created_at
+      );
+
+    DELETE FROM product_popularity;
+    INSERT INTO product_popularity (product_id, state, order_count, last_30d_count, refreshed_at)
+    SELECT product_id, state, order_count, last_30d_count, CURRENT_TIMESTAMP
+    FROM rollup_popularity;
+
+    INSERT INTO product_popularity AS pp (product_id, state, order_count, last_30d_count, refreshed_at)
+    SELECT l.product_id, COALESCE(l.state, 'ALL'), COUNT(*),
+           COUNT(*) FILTER (WHERE l.created_at >= CURRENT_DATE - INTERVAL '30 days'), CURRENT_TIMESTAMP
+    FROM rollup_late_orders l
+    GROUP BY GROUPING SETS ((l.product_id, l.state), (l.product_id))
+    ON CONFLICT (product_id, state) DO UPDATE
+        SET order_count = pp.order_count + EXCLUDED.order_count,
+            last_30d_count = pp.last_30d_count + EXCLUDED.last_30d_count;
+
+    DELETE FROM product_copurchase;
+    INSERT INTO product_copurchase (product_a, product_b, weight)
+    SELECT product_a, product_b, weight FROM rollup_copurchase;
+
+    -- A late order adds a pair per customer only when it is that customer's first purchase of the product
+    INSERT INTO product_copurchase AS pc (product_a, product_b, weight)
+    SELECT pair.a, pair.b, COUNT(*)
+    FROM (
+        WITH new_products AS (
+            SELECT DISTINCT l.customer_id, l.product_id FROM rollup_late_orders l
+            WHERE NOT EXISTS (
+                SELECT 1 FROM rollup_orders r
+                WHERE r.customer_id = l.customer_id AND r.product_id = l.product_id
+            )
+        ),
+        customer_products AS (
+            SELECT r.customer_id, r.product_id FROM rollup_orders r
+            WHERE r.customer_id IN (SELECT customer_id FROM new_products)
+            UNION
+            SELECT customer_id, product_id FROM new_products
+        )
+        SELECT n.customer_id, n.product_id AS a, cp.product_id AS b
+        FROM new_products n
+        JOIN customer_products cp ON cp.customer_id = n.customer_id AND cp.product_id <> n.product_id
+        UNION
+        SELECT n.customer_id, cp.product_id, n.product_id
+        FROM new_products n
+        JOIN customer_products cp ON cp.customer_id = n.customer_id AND cp.product_id <> n.product_id
+    ) pair
+    GROUP BY pair.a, pair.b
+    ON CONFLICT (product_a, product_b) DO UPDATE
+        SET weight = pc.weight + EXCLUDED.weight;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION refresh_recommendation_rollups IS 'Rebuild product_popularity and product_copurchase from orders (run periodically)';
+
+-- ---------------------------------------------------------------------
+-- Incremental maintenance: every new order updates the rollups
+-- ---------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION update_recommendation_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    customer_state VARCHAR(50);
+BEGIN
+    IF NEW.product_id IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    SELECT state INTO customer_state FROM customers WHERE customer_id = NEW.customer_id;
+
+    INSERT INTO product_popularity (product_id, state, order_count, last_30d_count)
+    SELECT NEW.product_id, s.state, 1, 1
+    FROM unnest(ARRAY['ALL', customer_state]) AS s(state)
+    WHERE s.state IS NOT NULL
+    ON CONFLICT (product_id, state) DO UPDATE
+        SET order_count = product_popularity.order_count + 1,
+            last_30d_count = product_popularity.last_30d_count + 1;
+
+    -- Co-purchase weights count customers, so only a customer's first order of a product adds pairs
+    IF NOT EXISTS (
+        SELECT 1 FROM orders
+        WHERE customer_id = NEW.customer_id AND product_id = NEW.product_id
+          AND (order_id, created_at) <> (NEW.order_id, NEW.created_at)
+    ) THEN
+        INSERT INTO product_copurchase (product_a, product_b, weight)
+        SELECT pair.a, pair.b, 1
+        FROM (SELECT DISTINCT product_id FROM orders
+              WHERE customer_id = NEW.customer_id
+                AND product_id IS NOT NULL AND product_id <> NEW.product_id) other,
+             LATERAL (VALUES (NEW.product_id, other.product_id),
+                             (other.product_id, NEW.product_id)) AS pair(a, b)
+        ON CONFLICT (product_a, product_b) DO UPDATE
+            SET weight = product_copurchase.weight + 1;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_orders_recommendation_rollups ON orders;
+CREATE TRIGGER trg_orders_recommendation_rollups
+    AFTER INSERT ON orders
+    FOR EACH ROW EXECUTE FUNCTION update_recommendation_rollups();
+
+-- Initial build
+SELECT refresh_recommendation_rollups();
+
+SELECT 'Recommendation rollups built: ' || COUNT(*) || ' popularity rows' AS status
+FROM product_popularity;
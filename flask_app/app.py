@@ -27,10 +27,11 @@ from psycopg2.extras import RealDictCursor
 import gc
 import psutil
 import threading
+import queue
 from contextlib import contextmanager
 
 # Flask imports
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_session import Session
 from flask_cors import CORS
@@ -41,7 +42,7 @@ from groq import Groq
 import google.generativeai as genai
 from mem0 import Memory
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import PointStruct
 import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
@@ -53,7 +54,7 @@ logger = logging.getLogger(__name__)
 
 # Local imports
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
-from config.database_config import DatabaseManager, CustomerRepository, OrderRepository, AnalyticsRepository
+from config.database_config import initialize_database, CustomerRepository, OrderRepository, AnalyticsRepository
 from config.appconfig import QDRANT_URL, QDRANT_API_KEY, GROQ_API_KEY, GOOGLE_API_KEY, is_production
 from config.logging_config import setup_logging
 
@@ -62,6 +63,11 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.enhanced_db_querying import EnhancedDatabaseQuerying
+from src.response_streaming import relay_completion_stream, format_sse
+from src.embedding_cache import EmbeddingCache
+from src.vector_indexer import EMBEDDING_MODEL
+from src.vector_search import CollectionRegistry, format_hits
+from src.offline_embedding import offline_embedding
 
 # Add session manager import
 from src.session_manager import session_manager
@@ -196,10 +202,11 @@ try:
         api_key=QDRANT_API_KEY,
     )
 
-    # Test Qdrant connection
+    # Test Qdrant connection and load the collection registry used by vector search
+    collection_registry = CollectionRegistry(qdrant_client)
     try:
-        collections = qdrant_client.get_collections()
-        app_logger.info(f"✅ Connected to local Qdrant with {len(collections.collections)} collections")
+        collections = collection_registry.refresh()
+        app_logger.info(f"✅ Connected to local Qdrant with {len(collections)} collections")
     except Exception as e:
         app_logger.warning(f"⚠️ Qdrant connection test failed: {e}")
 
@@ -236,7 +243,7 @@ except Exception as e:
 
 # Initialize database
 try:
-    db_manager = DatabaseManager()
+    db_manager = initialize_database()
     customer_repo = CustomerRepository(db_manager)
     order_repo = OrderRepository(db_manager)
     analytics_repo = AnalyticsRepository(db_manager)
@@ -285,10 +292,15 @@ try:
 
     redis_client = redis.Redis(host=redis_host, port=redis_port, db=redis_db, decode_responses=True)
     redis_client.ping()
+    # Embedding vectors are cached as raw float32 bytes, so they need a non-decoding client
+    embedding_redis_client = redis.Redis(host=redis_host, port=redis_port, db=redis_db, decode_responses=False)
     app_logger.info(f"✅ Redis cache initialized successfully - {redis_host}:{redis_port}")
 except Exception as e:
     error_logger.warning(f"⚠️ Redis not available, caching disabled: {e}")
     redis_client = None
+    embedding_redis_client = None
+
+embedding_cache = EmbeddingCache(redis_client=embedding_redis_client)
 
 # Nigerian States for filtering
 NIGERIAN_STATES = [
@@ -447,34 +459,25 @@ def get_embedding(text: str) -> List[float]:
         # Check if Google AI is configured
         if not GOOGLE_API_KEY or GOOGLE_API_KEY == 'your-google-api-key-here':
             app_logger.warning("⚠️ Google API key not configured, using fallback embedding")
-            # Create a simple hash-based embedding as fallback
-            import hashlib
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            # Convert hash to a list of floats (384 dimensions for compatibility)
-            fallback_embedding = [float(int(text_hash[i:i+2], 16)) / 255.0 for i in range(0, min(len(text_hash), 32), 2)]
-            # Pad to 384 dimensions
-            while len(fallback_embedding) < 384:
-                fallback_embedding.append(0.0)
-            return fallback_embedding[:384]  # Ensure exactly 384 dimensions
-
-        # Check cache first
-        cache_key = f"embedding:{hash(text)}"
-        if redis_client:
-            cached = redis_client.get(cache_key)
-            if cached:
-                return json.loads(cached)
+            # Offline hashed n-gram projection (deterministic, 384 dimensions)
+            return offline_embedding(text)
+
+        # Check cache first (content-addressed, shared across workers)
+        cache_key = embedding_cache.make_key(text, EMBEDDING_MODEL, "retrieval_document")
+        cached = embedding_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         # Generate embedding using the correct Google AI API
         result = genai.embed_content(
-            model="models/text-embedding-004",
+            model=EMBEDDING_MODEL,
             content=text,
             task_type="retrieval_document"
         )
         embedding = result['embedding']
 
         # Cache the result
-        if redis_client:
-            redis_client.setex(cache_key, 3600, json.dumps(embedding))  # Cache for 1 hour
+        embedding_cache.set(cache_key, embedding)
 
         return embedding
 
@@ -482,28 +485,21 @@ def get_embedding(text: str) -> List[float]:
         error_logger.error(f"❌ Embedding generation failed: {e}")
         app_logger.info("🔄 Using fallback embedding method...")
 
-        # Fallback: Simple text-based embedding (for development/testing)
+        # Fallback: offline hashed n-gram embedding (no network needed)
         try:
-            # Create a simple hash-based embedding as fallback
-            import hashlib
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            # Convert hash to a list of floats (384 dimensions for compatibility)
-            fallback_embedding = [float(int(text_hash[i:i+2], 16)) / 255.0 for i in range(0, min(len(text_hash), 32), 2)]
-            # Pad to 384 dimensions
-            while len(fallback_embedding) < 384:
-                fallback_embedding.append(0.0)
-
+            fallback_embedding = offline_embedding(text)
             app_logger.info(f"✅ Generated fallback embedding with {len(fallback_embedding)} dimensions")
-            return fallback_embedding[:384]  # Ensure exactly 384 dimensions
+            return fallback_embedding
 
         except Exception as fallback_error:
             error_logger.error(f"❌ Fallback embedding also failed: {fallback_error}")
             return []
 
 
-def get_ai_response(query: str, context: str = "", user_id: str = "anonymous") -> str:
+def get_ai_response(query: str, context: str = "", user_id: str = "anonymous", on_token=None) -> str:
     """
     Generate AI response using Llama models via Groq API with Nigerian e-commerce context
+    When ``on_token`` is given the completion is streamed and each cleaned chunk is passed to it
     """
     try:
         # Log memory usage before AI processing
@@ -568,18 +564,22 @@ def get_ai_response(query: str, context: str = "", user_id: str = "anonymous") -
                     temperature=0.3,
                     max_tokens=300,  # Reduced for more concise responses
                     top_p=0.9,
-                    stream=False,
+                    stream=on_token is not None,
                     timeout=30
                 )
+                if on_token is not None:
+                    response, tokens_used = relay_completion_stream(completion, on_token)
+                else:
+                    response = completion.choices[0].message.content
+                    tokens_used = completion.usage.total_tokens if completion.usage else 0
             except Exception as e:
                 app_logger.error(f"❌ Groq API error in Flask app: {e}")
                 return "I'm experiencing technical difficulties with the AI service. Please try again later or contact support."
 
-            response = completion.choices[0].message.content
             app_logger.info(f"✅ AI response generated successfully: {len(response)} characters")
 
             # Track API usage
-            usage_tracker.track_groq_request(completion.usage.total_tokens if completion.usage else 0)
+            usage_tracker.track_groq_request(tokens_used)
 
             # Store conversation in memory if available
             if memory:
@@ -625,36 +625,27 @@ def search_vector_database(query: str, collection_name: str = "customer_data") -
             app_logger.warning("⚠️ No embedding generated, skipping vector search")
             return []
 
-        # Check if collection exists
+        # Check if collection exists (cached registry, no Qdrant round trip)
         try:
-            collections = qdrant_client.get_collections()
-            collection_names = [col.name for col in collections.collections]
-
-            if collection_name not in collection_names:
-                app_logger.info(f"📝 Collection '{collection_name}' doesn't exist, creating it...")
-
-                # Create collection with proper vector configuration
-                qdrant_client.create_collection(
-                    collection_name=collection_name,
-                    vectors_config=VectorParams(size=len(query_embedding), distance=Distance.COSINE)
-                )
-                app_logger.info(f"✅ Created collection '{collection_name}' with {len(query_embedding)} dimensions")
-
+            if collection_registry.ensure(collection_name, len(query_embedding)):
                 # For now, return empty results as there's no data yet
                 return []
-
         except Exception as collection_error:
             app_logger.warning(f"⚠️ Collection check failed: {collection_error}")
             return []
 
         # Search Qdrant
-        results = qdrant_client.search(
-            collection_name=collection_name,
-            query_vector=query_embedding,
-            limit=5
-        )
+        try:
+            results = qdrant_client.search(
+                collection_name=collection_name,
+                query_vector=query_embedding,
+                limit=5
+            )
+        except Exception as search_error:
+            collection_registry.handle_search_error(collection_name, search_error)
+            return []
 
-        search_results = [{"id": r.id, "score": r.score, "payload": r.payload} for r in results]
+        search_results = format_hits(results)
         app_logger.info(f"🔍 Vector search returned {len(search_results)} results")
 
         return search_results
@@ -955,6 +946,56 @@ def parse_order_intent(query: str) -> Dict[str, Any]:
             "order_type": "inquiry"
         }
 
+def wants_event_stream(data: Optional[Dict]) -> bool:
+    """Client opted into Server-Sent Events via ``"stream": true`` or an ``Accept: text/event-stream`` header"""
+    if isinstance(data, dict) and data.get('stream') in (True, 'true', '1', 1):
+        return True
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def event_stream_response(produce, finalize) -> Response:
+    """
+    📡 Run ``produce(on_token)`` on a worker thread and relay its tokens as Server-Sent Events.
+    Emits ``token`` events while the model generates, then one ``done`` event carrying
+    ``finalize(result)`` (the same payload the JSON endpoint returns).
+    """
+    tokens: "queue.Queue[Optional[str]]" = queue.Queue()
+    outcome: Dict[str, Any] = {}
+
+    def worker():
+        try:
+            outcome['result'] = produce(tokens.put)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            tokens.put(None)
+
+    threading.Thread(target=worker, name='sse-producer', daemon=True).start()
+
+    def generate():
+        while True:
+            token = tokens.get()
+            if token is None:
+                break
+            yield format_sse('token', {'text': token})
+
+        if 'error' in outcome:
+            error_logger.error(f"❌ Streaming response error: {outcome['error']}")
+            yield format_sse('error', {'success': False, 'message': 'Chat service temporarily unavailable'})
+            return
+        try:
+            yield format_sse('done', finalize(outcome['result']))
+        except Exception as e:
+            error_logger.error(f"❌ Streaming finalize error: {e}")
+            yield format_sse('error', {'success': False, 'message': 'Chat service temporarily unavailable'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     """Enhanced AI Chat API endpoint with order intent recognition"""
@@ -1062,9 +1103,6 @@ def api_chat():
         if vector_results:
             context += f"Related information: {safe_json_dumps(vector_results[:2])}\n"
 
-        # Generate AI response with enhanced context
-        ai_response = get_ai_response(query, context, user_id)
-
         # Add general quick actions if none were added
         if not quick_actions:
             if any(word in query.lower() for word in ['payment', 'refund', 'issue']):
@@ -1074,14 +1112,28 @@ def api_chat():
             if any(word in query.lower() for word in ['customer', 'profile']):
                 quick_actions.append({'text': 'View Customer Profile', 'action': 'view_profile'})
 
-        return jsonify({
-            'success': True,
-            'response': ai_response,
-            'quick_actions': quick_actions,
-            'order_intent': order_intent,
-            'customer_authenticated': bool(customer_id),
-            'timestamp': datetime.now().isoformat()
-        })
+        def build_chat_payload(ai_response: str) -> Dict[str, Any]:
+            # Same cleanup the streamed tokens get, so JSON and SSE clients see identical text
+            return {
+                'success': True,
+                'response': enhanced_db._strip_markdown_formatting(ai_response),
+                'quick_actions': quick_actions,
+                'order_intent': order_intent,
+                'customer_authenticated': bool(customer_id),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        # 📡 Streaming mode: forward tokens as they arrive, full payload in the final event
+        if wants_event_stream(data):
+            return event_stream_response(
+                lambda on_token: get_ai_response(query, context, user_id, on_token=on_token),
+                build_chat_payload
+            )
+
+        # Generate AI response with enhanced context
+        ai_response = get_ai_response(query, context, user_id)
+
+        return jsonify(build_chat_payload(ai_response))
 
     except Exception as e:
         error_logger.error(f"❌ Chat API error: {e}")
@@ -1137,6 +1189,106 @@ def api_quick_action():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+def run_enhanced_query(user_query: str, session_context: Dict[str, Any], on_token=None) -> Dict[str, Any]:
+    """Run the enhanced query pipeline and sanitize internal fallback messages for the web client"""
+    # Process the query with session context
+    try:
+        logger.info(f"🔧 CALLING enhanced_db.process_enhanced_query with query: '{user_query}'")
+        result = enhanced_db.process_enhanced_query(user_query, session_context, on_token=on_token)
+        logger.info(f"🔧 RECEIVED RESULT from enhanced_db: {type(result).__name__}, success={result.get('success') if isinstance(result, dict) else 'N/A'}")
+    except Exception as e:
+        logger.error(f"🔧 EXCEPTION in enhanced_db.process_enhanced_query: {e}")
+        result = {
+            'success': False,
+            'response': "Hello! 😊 I'm here to help. Tell me what you'd like to do — for example, 'show latest phones', 'view my orders', or 'help with delivery fees'.",
+            'error': str(e)
+        }
+
+    # Sanitize any internal fallback messages before returning to the web client
+    if isinstance(result, dict):
+        resp_text = result.get('response')
+        if isinstance(resp_text, str) and 'Invalid query structure detected' in resp_text:
+            result['response'] = (
+                "Hello! 😊 I'm here to help. Tell me what you'd like to do — for example, "
+                "'show latest phones', 'view my orders', or 'help with delivery fees'."
+            )
+
+    return result
+
+
+def store_enhanced_query_exchange(user_query: str, result: Dict[str, Any]):
+    """Persist the user query and AI response in the current (or a new) conversation"""
+    # Store message in chat if we have a conversation
+    conversation_id = session.get('current_conversation_id')
+    if conversation_id:
+        try:
+            # Add user message
+            session_manager.add_message(
+                conversation_id=conversation_id,
+                content=user_query,
+                sender_type='user',
+                metadata={}
+            )
+
+            # 🏷️ Update conversation title if this is the first user message (ChatGPT-style)
+            session_manager.update_conversation_title_if_new(conversation_id, user_query)
+
+            # Add AI response
+            ai_metadata = {
+                'query_type': result.get('query_type'),
+                'execution_time': result.get('execution_time'),
+                'results_count': result.get('results_count'),
+                'sql_query': result.get('sql_query')
+            }
+
+            session_manager.add_message(
+                conversation_id=conversation_id,
+                content=result.get('response', 'Sorry, I encountered an issue.'),
+                sender_type='ai',
+                metadata=ai_metadata
+            )
+
+        except Exception as msg_error:
+            app_logger.error(f"❌ Message storage error: {msg_error}")
+
+    # Update session with current conversation if needed
+    if not conversation_id and session.get('user_authenticated'):
+        try:
+            # 🏷️ Create new conversation with intelligent title generation
+            intelligent_title = session_manager.generate_conversation_title(user_query)
+            new_conversation_id = session_manager.create_conversation(
+                session_id=session['session_id'],
+                title=intelligent_title
+            )
+            session['current_conversation_id'] = new_conversation_id
+            app_logger.info(f"✅ Created new conversation: {new_conversation_id} with title: '{intelligent_title}'")
+
+            # Add messages to new conversation
+            session_manager.add_message(
+                conversation_id=new_conversation_id,
+                content=user_query,
+                sender_type='user',
+                metadata={}
+            )
+
+            ai_metadata = {
+                'query_type': result.get('query_type'),
+                'execution_time': result.get('execution_time'),
+                'results_count': result.get('results_count'),
+                'sql_query': result.get('sql_query')
+            }
+
+            session_manager.add_message(
+                conversation_id=new_conversation_id,
+                content=result.get('response', 'Sorry, I encountered an issue.'),
+                sender_type='ai',
+                metadata=ai_metadata
+            )
+
+        except Exception as conv_error:
+            app_logger.error(f"❌ Conversation creation error: {conv_error}")
+
+
 @app.route('/api/enhanced-query', methods=['POST'])
 def api_enhanced_query():
     """Enhanced query API using the new EnhancedDatabaseQuerying system"""
@@ -1223,97 +1375,30 @@ def api_enhanced_query():
         # 🔧 DEBUG: Log session context for troubleshooting
         app_logger.info(f"🔍 Session context: user_authenticated={session_context['user_authenticated']}, customer_id={session_context['customer_id']}, user_role={session_context['user_role']}, is_staff={session_context['is_staff']}")
 
-        # Process the query with session context
-        try:
-            logger.info(f"🔧 CALLING enhanced_db.process_enhanced_query with query: '{user_query}'")
-            result = enhanced_db.process_enhanced_query(user_query, session_context)
-            logger.info(f"🔧 RECEIVED RESULT from enhanced_db: {type(result).__name__}, success={result.get('success') if isinstance(result, dict) else 'N/A'}")
-        except Exception as e:
-            logger.error(f"🔧 EXCEPTION in enhanced_db.process_enhanced_query: {e}")
-            result = {
-                'success': False,
-                'response': "Hello! 😊 I'm here to help. Tell me what you'd like to do — for example, 'show latest phones', 'view my orders', or 'help with delivery fees'.",
-                'error': str(e)
-            }
-
-        # Sanitize any internal fallback messages before returning to the web client
-        if isinstance(result, dict):
-            resp_text = result.get('response')
-            if isinstance(resp_text, str) and 'Invalid query structure detected' in resp_text:
-                result['response'] = (
-                    "Hello! 😊 I'm here to help. Tell me what you'd like to do — for example, "
-                    "'show latest phones', 'view my orders', or 'help with delivery fees'."
-                )
-
-        # Store message in chat if we have a conversation
-        conversation_id = session.get('current_conversation_id')
-        if conversation_id:
-            try:
-                # Add user message
-                session_manager.add_message(
-                    conversation_id=conversation_id,
-                    content=user_query,
-                    sender_type='user',
-                    metadata={}
-                )
-
-                # 🏷️ Update conversation title if this is the first user message (ChatGPT-style)
-                session_manager.update_conversation_title_if_new(conversation_id, user_query)
-
-                # Add AI response
-                ai_metadata = {
-                    'query_type': result.get('query_type'),
-                    'execution_time': result.get('execution_time'),
-                    'results_count': result.get('results_count'),
-                    'sql_query': result.get('sql_query')
-                }
-
-                session_manager.add_message(
-                    conversation_id=conversation_id,
-                    content=result.get('response', 'Sorry, I encountered an issue.'),
-                    sender_type='ai',
-                    metadata=ai_metadata
-                )
-
-            except Exception as msg_error:
-                app_logger.error(f"❌ Message storage error: {msg_error}")
-
-        # Update session with current conversation if needed
-        if not conversation_id and session.get('user_authenticated'):
-            try:
-                # 🏷️ Create new conversation with intelligent title generation
-                intelligent_title = session_manager.generate_conversation_title(user_query)
-                new_conversation_id = session_manager.create_conversation(
-                    session_id=session['session_id'],
-                    title=intelligent_title
-                )
-                session['current_conversation_id'] = new_conversation_id
-                app_logger.info(f"✅ Created new conversation: {new_conversation_id} with title: '{intelligent_title}'")
-
-                # Add messages to new conversation
-                session_manager.add_message(
-                    conversation_id=new_conversation_id,
-                    content=user_query,
-                    sender_type='user',
-                    metadata={}
-                )
+        # 📡 Streaming mode: forward tokens as they arrive, full result in the final event
+        if wants_event_stream(data):
+            # Session changes cannot be saved once the response has started, so open the conversation now
+            if not session.get('current_conversation_id') and session.get('user_authenticated'):
+                try:
+                    session['current_conversation_id'] = session_manager.create_conversation(
+                        session_id=session['session_id'],
+                        title=session_manager.generate_conversation_title(user_query)
+                    )
+                except Exception as conv_error:
+                    app_logger.error(f"❌ Conversation creation error: {conv_error}")
 
-                ai_metadata = {
-                    'query_type': result.get('query_type'),
-                    'execution_time': result.get('execution_time'),
-                    'results_count': result.get('results_count'),
-                    'sql_query': result.get('sql_query')
-                }
+            def finalize_stream(result: Dict[str, Any]) -> Dict[str, Any]:
+                store_enhanced_query_exchange(user_query, result)
+                app_logger.info(f"Enhanced query streamed: {result.get('query_type')} - {result.get('execution_time')}")
+                return result
 
-                session_manager.add_message(
-                    conversation_id=new_conversation_id,
-                    content=result.get('response', 'Sorry, I encountered an issue.'),
-                    sender_type='ai',
-                    metadata=ai_metadata
-                )
+            return event_stream_response(
+                lambda on_token: run_enhanced_query(user_query, session_context, on_token=on_token),
+                finalize_stream
+            )
 
-            except Exception as conv_error:
-                app_logger.error(f"❌ Conversation creation error: {conv_error}")
+        result = run_enhanced_query(user_query, session_context)
+        store_enhanced_query_exchange(user_query, result)
 
         # Log successful query processing
         app_logger.info(f"Enhanced query processed: {result.get('query_type')} - {result.get('execution_time')}")
@@ -1770,15 +1855,7 @@ def login_api():
             }), 400
 
         # Database connection for authentication
-        db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
-        conn = psycopg2.connect(**db_config)
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
@@ -1996,16 +2073,7 @@ def logout():
         # 🔧 CRITICAL FIX: Clear database conversation context
         try:
             # Clear conversation context from database to prevent leakage
-            db_config = {
-                'host': safe_str_env('DB_HOST', 'localhost'),
-                'port': safe_int_env('DB_PORT', 5432),
-                'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-                'user': safe_str_env('DB_USER', 'postgres'),
-                'password': safe_str_env('DB_PASSWORD', 'oracle'),
-            }
-
-            import psycopg2
-            conn = psycopg2.connect(**db_config)
+            conn = get_db_connection()
             cursor = conn.cursor()
 
             # Clear conversation context for this customer to prevent leakage
@@ -2214,15 +2282,7 @@ def delete_conversation(conversation_id):
 
             app_logger.info(f"✅ Guest session {session_id} deleting conversation {conversation_id}")
 
-        db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
-        conn = psycopg2.connect(**db_config)
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         # First, delete all messages in the conversation
@@ -2314,15 +2374,7 @@ def signup_api():
             }), 400
 
         # Database connection for registration
-        db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
-        conn = psycopg2.connect(**db_config)
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
@@ -3651,15 +3703,7 @@ def customer_profile_api():
             }), 401
 
         # Database connection
-        db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
-        conn = psycopg2.connect(**db_config)
+        conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
 
         if request.method == 'GET':
@@ -3977,15 +4021,7 @@ def get_whatsapp_conversations():
             return jsonify({'error': 'Authentication required'}), 401
 
         # Get WhatsApp conversations from database
-        db_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': os.getenv('DB_NAME', 'nigerian_ecommerce'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'oracle'),
-        }
-
-        with psycopg2.connect(**db_config) as conn:
+        with get_db_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute("""
                     SELECT wc.conversation_id, wc.phone_number, wc.conversation_status,
@@ -4136,14 +4172,7 @@ def manage_rate_limit_config():
 
         if request.method == 'GET':
             # Get current rate limit configuration
-            db_config = {
-                'host': os.getenv('DB_HOST', 'localhost'),
-                'port': safe_int_env('DB_PORT', 5432),
-                'database': os.getenv('DB_NAME', 'nigerian_ecommerce'),
-                'user': os.getenv('DB_USER', 'postgres'),
-                'password': os.getenv('DB_PASSWORD', 'oracle'),
-            }
-            with psycopg2.connect(**db_config) as conn:
+            with get_db_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     cursor.execute("SELECT * FROM whatsapp_rate_limits ORDER BY user_tier")
                     configs = cursor.fetchall()
@@ -4200,14 +4229,7 @@ def get_rate_limit_summary():
         if user_role not in ['admin', 'moderator']:
             return jsonify({'error': 'Admin access required'}), 403
 
-        db_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': os.getenv('DB_NAME', 'nigerian_ecommerce'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'oracle'),
-        }
-        with psycopg2.connect(**db_config) as conn:
+        with get_db_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute("""
                     SELECT * FROM v_rate_limit_summary
@@ -4272,38 +4294,173 @@ def log_memory_usage():
     app_logger.info(f"Memory usage: {memory_info.rss / 1024 / 1024:.2f} MB")
 
 # Connection pooling for database
-_db_pool = None
-_pool_lock = threading.Lock()
-
-@contextmanager
 def get_db_connection():
-    """Get database connection with proper cleanup"""
-    global _db_pool
-    conn = None
+    """
+    Check out a connection from the shared pool.
+
+    The pool is built lazily inside each gunicorn worker after fork. Use it as
+    ``with get_db_connection() as conn`` or call ``conn.close()`` to hand the
+    connection back to the pool.
+    """
     try:
-        if _db_pool is None:
-            with _pool_lock:
-                if _db_pool is None:
-                    # Initialize connection pool
-                    db_config = {
-                        'host': safe_str_env('DB_HOST', 'localhost'),
-                        'port': safe_int_env('DB_PORT', 5432),
-                        'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-                        'user': safe_str_env('DB_USER', 'postgres'),
-                        'password': safe_str_env('DB_PASSWORD', 'oracle'),
-                        'sslmode': safe_str_env('DB_SSLMODE', 'prefer'),
-                        'connect_timeout': safe_int_env('DB_CONNECT_TIMEOUT', 10),
-                    }
-                    conn = psycopg2.connect(**db_config)
-        else:
-            conn = psycopg2.connect(**db_config)
-        yield conn
+        return db_manager.connection()
     except Exception as e:
         app_logger.error(f"Database connection error: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
+
+@app.route('/api/admin/db-pool/stats', methods=['GET'])
+def get_db_pool_stats():
+    """Get database connection pool utilisation for admin monitoring"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        return jsonify({
+            'success': True,
+            'pool': db_manager.get_pool_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get DB pool stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/admin/sql-cache/stats', methods=['GET'])
+def get_sql_cache_stats():
+    """Get SQL generation cache and SQL template hit/miss counters for admin monitoring"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        # Queries run through enhanced_db (run_enhanced_query), so its cache holds the live counters
+        sql_cache = getattr(enhanced_db, 'sql_cache', None)
+        sql_templates = getattr(enhanced_db, 'sql_templates', None)
+        return jsonify({
+            'success': True,
+            'enabled': sql_cache is not None,
+            'stats': sql_cache.get_stats() if sql_cache else {},
+            'template_stats': sql_templates.get_stats() if sql_templates else {},
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get SQL cache stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/admin/embedding-cache/stats', methods=['GET'])
+def get_embedding_cache_stats():
+    """Get embedding cache hit/miss counters for admin monitoring"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        return jsonify({
+            'success': True,
+            'redis_enabled': embedding_cache.redis_client is not None,
+            'stats': embedding_cache.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get embedding cache stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/admin/recommendations/stats', methods=['GET'])
+def get_recommendation_stats():
+    """Get recommendation fan-out timings, cache counters and similarity model status for admin monitoring"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        return jsonify({
+            'success': True,
+            'fanout': recommendation_engine.get_fanout_stats(),
+            'popularity_cache': recommendation_engine.popularity_cache.get_stats(),
+            'item_similarity': recommendation_engine.item_similarity.get_stats(),
+            'profile_cache': recommendation_engine.profile_cache.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get recommendation stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/admin/intent-patterns/stats', methods=['GET'])
+def get_intent_pattern_stats():
+    """Get per-pattern hit statistics for the shopping intent regex registries"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        from src.pattern_registry import get_pattern_registry_stats
+        return jsonify({
+            'success': True,
+            'registries': get_pattern_registry_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get intent pattern stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/admin/agent-memory/stats', methods=['GET'])
+def get_agent_memory_stats():
+    """Get agent memory consolidation queue depth/lag, ingest queue and embedding cache counters"""
+    try:
+        # Check if user has admin role
+        user_role = session.get('user_role', 'customer')
+        if user_role not in ['admin', 'moderator']:
+            return jsonify({'error': 'Admin access required'}), 403
+
+        agent_memory = getattr(enhanced_db, 'agent_memory', None)
+        if not hasattr(agent_memory, 'get_consolidation_stats'):
+            return jsonify({
+                'success': True,
+                'enabled': False,
+                'timestamp': datetime.now().isoformat()
+            })
+
+        return jsonify({
+            'success': True,
+            'enabled': True,
+            'consolidation': agent_memory.get_consolidation_stats(),
+            'ingest': agent_memory.get_ingest_stats(),
+            'embedding_cache': agent_memory.get_embedding_cache_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        app_logger.error(f"❌ Get agent memory stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 
 @app.route('/debug/env')
 def debug_environment():
@@ -135,10 +135,9 @@ def load_user_from_database(email, password_hash):
     """
     try:
         # Import your existing database config
-        from config.database_config import DATABASE_CONFIG
-        import psycopg2
+        from config.database_config import get_pooled_connection
 
-        conn = psycopg2.connect(**DATABASE_CONFIG)
+        conn = get_pooled_connection()
         cursor = conn.cursor()
 
         # Use the authentication function from the migration
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Index Benchmark
+============================
+
+Measures build time, query latency and recall of the agent_memories vector index
+for the flat (exact) and HNSW (approximate) algorithms at several collection sizes.
+
+- Synthetic 384-d embeddings are clustered (like real memories of similar phrasing)
+  and loaded once per size under a throwaway key prefix
+- Both indexes are built over the same documents, one after the other
+- Recall@k is measured against exact numpy cosine top-k
+- The filtered VectorRangeQuery used by retrieve_memories/similar_memory_exists is
+  timed as well
+
+HNSW parameters come from the same environment variables as the application
+(MEMORY_HNSW_M, MEMORY_HNSW_EF_CONSTRUCTION, MEMORY_HNSW_EF_RUNTIME).
+Requires Redis Stack (RediSearch + RedisJSON). 1M memories need roughly 4 GB of RAM.
+
+Usage:
+    python scripts/benchmark_memory_index.py [--sizes 10000,100000,1000000] [--queries 200]
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import redis
+from redisvl.index import SearchIndex
+from redisvl.schema.schema import IndexSchema
+from redisvl.query import VectorQuery, VectorRangeQuery
+from redisvl.query.filter import Tag
+
+from config.appconfig import REDIS_URL
+from src.agent_memory_system import (
+    MEMORY_EMBEDDING_DIMS, MEMORY_DISTANCE_THRESHOLD, MEMORY_HNSW_M,
+    MEMORY_HNSW_EF_CONSTRUCTION, MEMORY_HNSW_EF_RUNTIME, memory_index_schema
+)
+
+BENCH_USERS = 1000
+
+
+def synthetic_embeddings(count: int, rng: np.random.Generator, clusters: int = 256) -> np.ndarray:
+    """Unit vectors scattered around random centroids"""
+    centroids = rng.standard_normal((clusters, MEMORY_EMBEDDING_DIMS)).astype(np.float32)
+    vectors = centroids[rng.integers(0, clusters, count)]
+    vectors += 0.35 * rng.standard_normal((count, MEMORY_EMBEDDING_DIMS)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def load_memories(client, prefix: str, vectors: np.ndarray, batch_size: int = 2000):
+    """Write synthetic memory documents (same layout as AgentMemorySystem) without any index"""
+    loader = SearchIndex(
+        schema=IndexSchema.from_dict(memory_index_schema(f"{prefix}_loader", "flat", prefix=prefix)),
+        redis_client=client
+    )
+    for start in range(0, len(vectors), batch_size):
+        loader.load([
+            {
+                "user_id": f"user_{i % BENCH_USERS}",
+                "content": f"benchmark memory {i}",
+                "memory_type": "episodic",
+                "metadata": "{}",
+                "created_at": "2025-01-01T00:00:00",
+                "embedding": vectors[i].tolist(),
+                "memory_id": str(i),
+                "thread_id": "benchmark",
+                "confidence_score": 1.0,
+            }
+            for i in range(start, min(start + batch_size, len(vectors)))
+        ], id_field="memory_id")
+
+
+def exact_top_k(queries: np.ndarray, vectors: np.ndarray, k: int, chunk: int = 16) -> np.ndarray:
+    """Ground-truth cosine neighbours (unit vectors), computed a few queries at a time"""
+    truth = []
+    for start in range(0, len(queries), chunk):
+        scores = queries[start:start + chunk] @ vectors.T
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        truth.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(truth)
+
+
+def wait_until_indexed(index: SearchIndex) -> float:
+    started = time.perf_counter()
+    while True:
+        info = index.info()
+        if float(info.get('percent_indexed', 1) or 0) >= 1.0 and str(info.get('indexing', 0)) in ('0', 'False'):
+            return time.perf_counter() - started
+        time.sleep(0.5)
+
+
+def percentile(samples, pct: float) -> float:
+    return float(np.percentile(np.array(samples) * 1000, pct))
+
+
+def run_algorithm(client, prefix: str, algorithm: str, queries: np.ndarray, truth: np.ndarray,
+                  query_users, k: int) -> dict:
+    name = f"{prefix}_{algorithm}"
+    index = SearchIndex(
+        schema=IndexSchema.from_dict(memory_index_schema(name, algorithm, prefix=prefix)),
+        redis_client=client
+    )
+    index.create(overwrite=True)
+    build_seconds = wait_until_indexed(index)
+
+    knn_latency, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        results = index.query(VectorQuery(
+            vector=query.tolist(), vector_field_name="embedding",
+            num_results=k, return_fields=["memory_id"]
+        ))
+        knn_latency.append(time.perf_counter() - started)
+        found = {int(doc["memory_id"]) for doc in results}
+        recalls.append(len(found & set(expected.tolist())) / k)
+
+    range_latency = []
+    for query, user_id in zip(queries, query_users):
+        started = time.perf_counter()
+        index.query(VectorRangeQuery(
+            vector=query.tolist(), vector_field_name="embedding", num_results=5,
+            distance_threshold=MEMORY_DISTANCE_THRESHOLD, return_fields=["memory_id"],
+            filter_expression=Tag("user_id") == user_id
+        ))
+        range_latency.append(time.perf_counter() - started)
+
+    index.delete(drop=False)
+    return {
+        'build_s': build_seconds,
+        'recall': float(np.mean(recalls)),
+        'knn_p50': percentile(knn_latency, 50),
+        'knn_p95': percentile(knn_latency, 95),
+        'range_p50': percentile(range_latency, 50),
+        'range_p95': percentile(range_latency, 95),
+    }
+
+
+def delete_prefix(client, prefix: str):
+    batch = []
+    for key in client.scan_iter(match=f"{prefix}:*", count=5000):
+        batch.append(key)
+        if len(batch) >= 5000:
+            client.delete(*batch)
+            batch = []
+    if batch:
+        client.delete(*batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent memory vector index")
+    parser.add_argument('--sizes', default="10000,100000,1000000", help="Comma separated collection sizes")
+    parser.add_argument('--queries', type=int, default=200, help="Queries per size")
+    parser.add_argument('--k', type=int, default=10, help="Neighbours for recall@k")
+    parser.add_argument('--redis-url', default=REDIS_URL)
+    args = parser.parse_args()
+
+    client = redis.from_url(args.redis_url, decode_responses=False)
+    rng = np.random.default_rng(42)
+
+    print(f"📊 agent_memories index benchmark (HNSW M={MEMORY_HNSW_M}, "
+          f"EF_CONSTRUCTION={MEMORY_HNSW_EF_CONSTRUCTION}, EF_RUNTIME={MEMORY_HNSW_EF_RUNTIME})")
+    print(f"{'size':>9} {'index':>5} {'build s':>8} {'recall@' + str(args.k):>9} "
+          f"{'knn p50':>8} {'knn p95':>8} {'range p50':>9} {'range p95':>9}   (latencies in ms)")
+
+    for size in [int(value) for value in args.sizes.split(',') if value.strip()]:
+        prefix = f"bench_memory_{size}"
+        vectors = synthetic_embeddings(size, rng)
+        queries = vectors[rng.choice(size, args.queries, replace=False)].copy()
+        queries += 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        truth = exact_top_k(queries, vectors, args.k)
+        query_users = [f"user_{i % BENCH_USERS}" for i in rng.integers(0, size, args.queries)]
+
+        try:
+            load_memories(client, prefix, vectors)
+            for algorithm in ('flat', 'hnsw'):
+                stats = run_algorithm(client, prefix, algorithm, queries, truth, query_users, args.k)
+                print(f"{size:>9} {algorithm:>5} {stats['build_s']:>8.1f} {stats['recall']:>9.3f} "
+                      f"{stats['knn_p50']:>8.2f} {stats['knn_p95']:>8.2f} "
+                      f"{stats['range_p50']:>9.2f} {stats['range_p95']:>9.2f}")
+        finally:
+            delete_prefix(client, prefix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Product Search Benchmark
+========================
+
+Compares the two search_products query shapes at several catalog sizes:
+
+- ilike:    the ILIKE '%q%' scan over name/description/brand/category
+- fulltext: search_vector @@ websearch_to_tsquery OR trigram word match on product_name,
+            ranked with ts_rank_cd + word_similarity (database/product_search.sql)
+
+Synthetic products are generated inside PostgreSQL into a throwaway schema
+(search_bench) with the same table, trigram index and search migration as the real
+catalog; the live products table is never touched. Both query shapes come from
+ProductSearchBackend, with personalisation arrays bound exactly as the engine does.
+Requires the pg_trgm extension (database_schema.sql). 1M products need roughly 1.5 GB.
+
+Usage:
+    python scripts/benchmark_product_search.py [--sizes 10000,100000,1000000]
+                                               [--repeat 20] [--keep]
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import initialize_database
+from src.product_search import ProductSearchBackend
+
+BENCH_SCHEMA = "search_bench"
+SEARCH_SQL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'database', 'product_search.sql')
+
+BRANDS = ['Samsung', 'Tecno', 'Infinix', 'Apple', 'Nike', 'Adidas', 'LG', 'Hisense',
+          'Nestle', 'Dangote', 'Oraimo', 'HP', 'Lenovo', 'Binatone', 'Thermocool', 'Ankara House']
+CATEGORIES = ['Electronics', 'Fashion', 'Beauty', 'Computing', 'Automotive', 'Books',
+              'Sports', 'Home & Kitchen', 'Groceries', 'Phones & Tablets']
+ADJECTIVES = ['Wireless', 'Premium', 'Classic', 'Portable', 'Smart', 'Organic', 'Slim',
+              'Heavy Duty', 'Rechargeable', 'Handmade', 'Waterproof', 'Compact']
+NOUNS = ['Smartphone', 'Headphones', 'Sneakers', 'Laptop', 'Blender', 'Refrigerator', 'Power Bank',
+         'Agbada', 'Face Cream', 'Rice Cooker', 'Football', 'Novel', 'Generator', 'Smartwatch']
+
+# Whole words, multi-word, brand, partial word and a typo
+QUERIES = ['smartphone', 'wireless headphones', 'samsung', 'rice cook', 'refridgerator',
+           'waterproof smartwatch', 'agbada']
+FAVORITE_CATEGORIES = ['Electronics', 'Phones & Tablets', 'Fashion']
+FAVORITE_BRANDS = ['Samsung', 'Nike', 'Oraimo']
+
+
+def load_catalog(cursor, size: int):
+    """Fresh search_bench.products with ``size`` generated rows (indexes come from the migration)"""
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.products")
+    cursor.execute(f"""
+        CREATE TABLE {BENCH_SCHEMA}.products (
+            product_id SERIAL PRIMARY KEY,
+            product_name VARCHAR(255) NOT NULL,
+            category VARCHAR(100) NOT NULL,
+            brand VARCHAR(100),
+            description TEXT,
+            price DECIMAL(12,2) NOT NULL,
+            currency VARCHAR(3) DEFAULT 'NGN',
+            in_stock BOOLEAN DEFAULT true,
+            stock_quantity INTEGER DEFAULT 0
+        )
+    """)
+    cursor.execute(f"""
+        INSERT INTO {BENCH_SCHEMA}.products (product_name, category, brand, description, price, in_stock, stock_quantity)
+        SELECT b || ' ' || a || ' ' || n || ' ' || (g %% 997),
+               c,
+               b,
+               'The ' || lower(a) || ' ' || lower(n) || ' by ' || b || ', loved by ' || lower(c)
+                   || ' shoppers across Lagos, Abuja and Kano. Model ' || g,
+               1000 + (g * 7919) %% 2000000,
+               g %% 20 <> 0,
+               g %% 60
+        FROM generate_series(1, %(size)s) g,
+             LATERAL (SELECT (%(brands)s::text[])[1 + g %% %(n_brands)s] AS b,
+                             (%(categories)s::text[])[1 + (g / 7) %% %(n_categories)s] AS c,
+                             (%(adjectives)s::text[])[1 + (g / 3) %% %(n_adjectives)s] AS a,
+                             (%(nouns)s::text[])[1 + (g / 11) %% %(n_nouns)s] AS n) words
+    """, {
+        'size': size,
+        'brands': BRANDS, 'n_brands': len(BRANDS),
+        'categories': CATEGORIES, 'n_categories': len(CATEGORIES),
+        'adjectives': ADJECTIVES, 'n_adjectives': len(ADJECTIVES),
+        'nouns': NOUNS, 'n_nouns': len(NOUNS),
+    })
+
+
+def time_query(cursor, sql: str, params, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(0.95 * (len(timings) - 1))], len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ILIKE vs full-text/trigram product search")
+    parser.add_argument('--sizes', default="10000,100000,1000000", help="Comma separated catalog sizes")
+    parser.add_argument('--repeat', type=int, default=20, help="Executions per query and mode")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help=f"Keep the {BENCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    db_manager = initialize_database()
+    backend = ProductSearchBackend(db_manager.get_connection)
+    with open(SEARCH_SQL_FILE, encoding='utf-8') as sql_file:
+        search_migration = sql_file.read()
+
+    with db_manager.get_connection() as conn:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public")
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA}")
+            # Unqualified "products" (queries and migration) now resolves to the benchmark table
+            cursor.execute(f"SET search_path TO {BENCH_SCHEMA}, public")
+
+            print(f"{'size':>9} {'mode':>9} {'query':<22} {'median ms':>10} {'p95 ms':>9} {'rows':>5}")
+            for size in sizes:
+                started = time.perf_counter()
+                load_catalog(cursor, size)
+                load_s = time.perf_counter() - started
+                started = time.perf_counter()
+                cursor.execute(search_migration)
+                print(f"📦 {size} products loaded in {load_s:.1f}s, "
+                      f"search_vector + GIN built in {time.perf_counter() - started:.1f}s")
+
+                totals = {'ilike': 0.0, 'fulltext': 0.0}
+                for query in QUERIES:
+                    for mode in ('ilike', 'fulltext'):
+                        sql, params = backend.build_query(
+                            query, limit=args.limit, favorite_categories=FAVORITE_CATEGORIES,
+                            favorite_brands=FAVORITE_BRANDS, fulltext=(mode == 'fulltext'))
+                        median, p95, rows = time_query(cursor, sql, params, args.repeat)
+                        totals[mode] += median
+                        print(f"{size:>9} {mode:>9} {query:<22} {median:>10.2f} {p95:>9.2f} {rows:>5}")
+                speedup = totals['ilike'] / totals['fulltext'] if totals['fulltext'] else 0.0
+                print(f"⚡ {size}: ilike {totals['ilike']:.1f} ms vs fulltext {totals['fulltext']:.1f} ms "
+                      f"summed medians ({speedup:.1f}x)")
+        finally:
+            cursor.execute("RESET search_path")
+            if not args.keep:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+            cursor.close()
+            conn.autocommit = False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Item Similarity Model Build
+===========================
+
+Builds the item-item cosine neighbour model used for collaborative filtering
+(src/item_similarity.py) from the orders table and publishes it to ITEM_SIMILARITY_DIR.
+Running Flask/gunicorn workers memory-map the new version on their next reload check.
+
+Usage:
+    python scripts/build_item_similarity.py [--top-k 50] [--model-dir DIR]
+                                            [--interval SECONDS]
+
+    --interval   keep running and rebuild every SECONDS (otherwise build once, e.g. from cron)
+"""
+
+import sys
+import os
+import time
+import argparse
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import initialize_database
+from src.item_similarity import build_item_similarity_model, ITEM_SIMILARITY_DIR, ITEM_SIMILARITY_TOP_K
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the item-item similarity model")
+    parser.add_argument('--top-k', type=int, default=ITEM_SIMILARITY_TOP_K, help="Neighbours kept per product")
+    parser.add_argument('--model-dir', default=ITEM_SIMILARITY_DIR)
+    parser.add_argument('--interval', type=int, default=0, help="Rebuild every N seconds (0 = once)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    db_manager = initialize_database()
+
+    while True:
+        try:
+            meta = build_item_similarity_model(db_manager, model_dir=args.model_dir, top_k=args.top_k)
+            print(f"✅ Published item similarity model {meta['version']}: {meta['products']} products, "
+                  f"{meta['purchases']} purchases, {meta['build_seconds']}s ({meta['backend']})")
+        except Exception as e:
+            print(f"❌ Item similarity build failed: {e}")
+            if not args.interval:
+                sys.exit(1)
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Markdown Streaming Consistency Check
+====================================
+
+Verifies that IncrementalMarkdownStripper (SSE token stream) produces exactly what
+EnhancedDatabaseQuerying._strip_markdown_formatting produces for the full response,
+no matter where the completion is split into deltas.
+
+- Hand-written responses with code fences, inline code, links, quotes and lists
+- Random markdown fragments glued together (fences and markers split mid-run)
+- Every response is streamed with random chunk boundaries and character by character
+
+Usage:
+    python scripts/check_markdown_streaming.py [--iterations 20000] [--seed 7]
+"""
+
+import sys
+import os
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.enhanced_db_querying import EnhancedDatabaseQuerying
+from src.response_streaming import IncrementalMarkdownStripper
+
+SAMPLES = [
+    "Inline ```x``` fence here",
+    "Here:\n```\ncode\n```\n\nDone.",
+    "Here are **three** options:\n\n1. Samsung Galaxy A54 - ₦450K, great `camera` and [battery](https://x.ng).\n"
+    "2. Tecno Camon 20 - budget pick.\n\n> Tip: prices include VAT.\n\n\n\nLet me know!",
+    "> quote\n- a\n* b\n+ c\n12. twelve\nPrice 1.5 kg, well-known brand",
+    ">\nhello\n-\n  item\n[multi\nline](link)",
+    "  leading space\n\n\n\n\ntrailing   \t \n\n",
+]
+FRAGMENTS = ["a", "word", " ", "  ", "\t", "\n", "\n\n", "`", "``", "```", "[", "]", "(", ")",
+             "[x](y)", "(u)", "> ", ">", "-", "- ", "* ", "+ ", "1.", "1. ", "12", "**", "x.", "₦"]
+
+
+def strip_full(text: str) -> str:
+    return EnhancedDatabaseQuerying._strip_markdown_formatting(None, text)
+
+
+def strip_streamed(text: str, cuts) -> str:
+    stripper = IncrementalMarkdownStripper()
+    out, previous = [], 0
+    for cut in list(cuts) + [len(text)]:
+        out.append(stripper.feed(text[previous:cut]))
+        previous = cut
+    out.append(stripper.flush())
+    return "".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz chunk boundaries of the streaming markdown stripper")
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for i in range(args.iterations):
+        if i < len(SAMPLES):
+            text = SAMPLES[i]
+        else:
+            text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 60)))
+        splits = [range(1, len(text))]  # character by character
+        if len(text) > 1:
+            splits.append(sorted(rng.sample(range(1, len(text)), rng.randint(0, min(30, len(text) - 1)))))
+
+        expected = strip_full(text)
+        for cuts in splits:
+            streamed = strip_streamed(text, cuts)
+            if streamed != expected:
+                failures += 1
+                if failures <= 10:
+                    print(f"❌ {text!r} split at {list(cuts)}:\n   streamed {streamed!r}\n   expected {expected!r}")
+
+    if failures:
+        print(f"❌ {failures} mismatches in {args.iterations} responses")
+        sys.exit(1)
+    print(f"✅ Streamed output matches _strip_markdown_formatting for {args.iterations} responses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Bulk Vector Indexing
+====================
+
+Streams customers, products and orders from PostgreSQL into the Qdrant collection
+used by search_vector_database (customer_data by default).
+
+- Rows are read with server-side cursors and embedded one batch request at a time
+- Texts already in the embedding cache (Redis, shared with the Flask app) are not re-embedded;
+  the cache client uses the app's REDIS_HOST / REDIS_PORT / REDIS_DB (db 1 by default)
+- Progress is checkpointed after every upserted batch; re-running resumes where it stopped
+- Point ids are derived from the primary key, so re-indexing overwrites instead of duplicating
+
+Usage:
+    python scripts/index_vector_database.py [--sources customers,products,orders]
+                                            [--batch-size 100] [--concurrency 4]
+                                            [--limit N] [--reset]
+"""
+
+import sys
+import os
+import argparse
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis
+import google.generativeai as genai
+from qdrant_client import QdrantClient
+
+from config.appconfig import QDRANT_URL, QDRANT_API_KEY, GOOGLE_API_KEY
+from config.database_config import initialize_database, safe_int_env, safe_str_env
+from src.embedding_cache import EmbeddingCache
+from src.vector_indexer import (
+    VectorIndexer, INDEX_SOURCES, VECTOR_COLLECTION_NAME, VECTOR_INDEX_BATCH_SIZE,
+    VECTOR_INDEX_EMBED_CONCURRENCY, VECTOR_INDEX_CHECKPOINT_FILE
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the Qdrant vector collection from PostgreSQL")
+    parser.add_argument('--sources', default=",".join(INDEX_SOURCES), help="Comma separated tables to index")
+    parser.add_argument('--collection', default=VECTOR_COLLECTION_NAME)
+    parser.add_argument('--batch-size', type=int, default=VECTOR_INDEX_BATCH_SIZE, help="Rows per embed/upsert batch")
+    parser.add_argument('--concurrency', type=int, default=VECTOR_INDEX_EMBED_CONCURRENCY,
+                        help="Embedding batches in flight")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after N rows per source")
+    parser.add_argument('--checkpoint-file', default=VECTOR_INDEX_CHECKPOINT_FILE)
+    parser.add_argument('--reset', action='store_true', help="Ignore saved checkpoints and start over")
+    # Same Redis database as the Flask app (flask_app/app.py), so cached embeddings are shared
+    parser.add_argument('--redis-host', default=safe_str_env('REDIS_HOST', '10.161.142.19'))
+    parser.add_argument('--redis-port', type=int, default=safe_int_env('REDIS_PORT', 6379))
+    parser.add_argument('--redis-db', type=int, default=safe_int_env('REDIS_DB', 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    sources = [name.strip() for name in args.sources.split(',') if name.strip()]
+    unknown = [name for name in sources if name not in INDEX_SOURCES]
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(unknown)} (choose from {', '.join(INDEX_SOURCES)})")
+
+    if not GOOGLE_API_KEY or GOOGLE_API_KEY == 'your-google-api-key-here':
+        print("❌ GOOGLE_API_KEY is not configured; bulk indexing needs the embedding API")
+        sys.exit(1)
+    genai.configure(api_key=GOOGLE_API_KEY)
+
+    try:
+        cache_client = redis.Redis(host=args.redis_host, port=args.redis_port, db=args.redis_db,
+                                   decode_responses=False)
+        cache_client.ping()
+    except Exception as e:
+        print(f"⚠️ Redis not available ({e}), embedding cache limited to this process")
+        cache_client = None
+
+    indexer = VectorIndexer(
+        db_manager=initialize_database(),
+        qdrant_client=QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY),
+        embedding_cache=EmbeddingCache(redis_client=cache_client),
+        collection_name=args.collection,
+        checkpoint_file=args.checkpoint_file,
+        batch_size=args.batch_size,
+        embed_concurrency=args.concurrency,
+    )
+    if args.reset:
+        indexer.reset_checkpoints(sources)
+
+    total = 0
+    for result in indexer.index_all(sources, limit=args.limit):
+        total += result['processed']
+        print(f"📥 {result['source']:>9}: {result['processed']} rows in {result['elapsed_s']}s "
+              f"(indexed total {result['indexed_total']}, last id {result['last_id']})")
+
+    print(f"✅ Indexed {total} rows into '{args.collection}'")
+    print(f"🧮 Embedding cache: {indexer.embedding_cache.get_stats()}")
+
+
+if __name__ == '__main__':
+    main()
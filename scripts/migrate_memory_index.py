@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Index Migration
+============================
+
+Creates the configured agent_memories index (MEMORY_INDEX_ALGORITHM / MEMORY_HNSW_*)
+over the existing memory documents and waits until Redis reports it fully indexed.
+Application workers keep serving from the previous index until then and switch on
+their own; they never drop it.
+
+Once every worker has been restarted or has switched, run again with --drop-previous
+to remove the old index definitions (the memory documents are kept).
+
+Usage:
+    python scripts/migrate_memory_index.py [--timeout 3600] [--drop-previous]
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis
+from redisvl.index import SearchIndex
+from redisvl.schema.schema import IndexSchema
+
+from config.appconfig import REDIS_URL
+from src.agent_memory_system import (
+    MEMORY_INDEX_MIGRATION_TIMEOUT, memory_index_name, memory_index_schema,
+    memory_index_ready, list_memory_indexes, drop_previous_memory_indexes
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the configured agent memory index")
+    parser.add_argument('--timeout', type=int, default=MEMORY_INDEX_MIGRATION_TIMEOUT,
+                        help="Seconds to wait for the index to finish back-filling")
+    parser.add_argument('--drop-previous', action='store_true',
+                        help="Drop other agent_memories indexes once the configured one is complete")
+    args = parser.parse_args()
+
+    client = redis.from_url(REDIS_URL, decode_responses=False)
+    target_name = memory_index_name()
+    target = SearchIndex(
+        schema=IndexSchema.from_dict(memory_index_schema(target_name)),
+        redis_client=client
+    )
+    if not target.exists():
+        target.create(overwrite=False)
+        print(f"📦 Created memory index {target_name}")
+
+    deadline = time.time() + args.timeout
+    while not memory_index_ready(target):
+        if time.time() > deadline:
+            print(f"❌ {target_name} still indexing after {args.timeout}s, previous indexes kept")
+            sys.exit(1)
+        print(f"⏳ {target_name}: {float(target.info().get('percent_indexed', 0) or 0):.0%} indexed")
+        time.sleep(5)
+    print(f"✅ {target_name} fully indexed ({target.info().get('num_docs', 0)} memories)")
+
+    previous = [name for name in list_memory_indexes(client) if name != target_name]
+    if not args.drop_previous:
+        if previous:
+            print(f"ℹ️ Previous indexes kept: {', '.join(previous)} (re-run with --drop-previous)")
+        return
+
+    dropped = drop_previous_memory_indexes(client)
+    print(f"🗑️ Dropped {len(dropped)} previous index(es): {', '.join(dropped) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
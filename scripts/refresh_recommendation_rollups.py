@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Recommendation Rollup Refresh
+=============================
+
+Rebuilds product_popularity and product_copurchase (database/recommendation_rollups.sql)
+from the orders table. New orders keep the rollups current through a trigger; this job
+restores exact counts and rolls the 30-day window forward, so run it periodically (cron).
+
+Usage:
+    python scripts/refresh_recommendation_rollups.py [--install]
+
+    --install   create the rollup tables, functions and trigger first (idempotent)
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import initialize_database
+
+ROLLUPS_SQL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'database', 'recommendation_rollups.sql')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the recommendation rollup tables")
+    parser.add_argument('--install', action='store_true', help="Apply database/recommendation_rollups.sql first")
+    args = parser.parse_args()
+
+    db_manager = initialize_database()
+    started = time.perf_counter()
+
+    with db_manager.get_cursor() as cursor:
+        if args.install:
+            with open(ROLLUPS_SQL_FILE, encoding='utf-8') as sql_file:
+                cursor.execute(sql_file.read())
+            print(f"🗄️ Installed rollup tables from {ROLLUPS_SQL_FILE}")
+        else:
+            cursor.execute("SELECT refresh_recommendation_rollups()")
+
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM product_popularity) AS popularity_rows,
+                   (SELECT COUNT(*) FROM product_copurchase) AS copurchase_rows
+        """)
+        counts = cursor.fetchone()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Recommendation rollups refreshed in {elapsed:.2f}s: "
+          f"{counts['popularity_rows']} popularity rows, {counts['copurchase_rows']} co-purchase pairs")
+
+
+if __name__ == '__main__':
+    main()
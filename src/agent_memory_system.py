@@ -17,15 +17,21 @@ import os
 import json
 import logging
 import time
+import hashlib
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
-from queue import Queue
+from queue import Queue, Empty, Full
+import numpy as np
 import redis
 import ulid
 
+from config.database_config import safe_int_env, safe_str_env
+
 # LangGraph and memory components
 from langchain_core.tools import tool
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage, ToolMessage
@@ -46,7 +52,7 @@ except ImportError:
 try:
     from redisvl.index import SearchIndex
     from redisvl.schema.schema import IndexSchema
-    from redisvl.query import VectorRangeQuery
+    from redisvl.query import VectorRangeQuery, FilterQuery, CountQuery
     from redisvl.query.filter import Tag
     from redisvl.utils.vectorize import HFTextVectorizer
     REDISVL_AVAILABLE = True
@@ -69,7 +75,25 @@ logger = logging.getLogger(__name__)
 SYSTEM_USER_ID = "system"
 MEMORY_EMBEDDING_DIMS = 384  # MiniLM embedding dimension
 MEMORY_DISTANCE_THRESHOLD = 0.3
-MEMORY_CONSOLIDATION_INTERVAL = 600  # 10 minutes
+MEMORY_CONSOLIDATION_INTERVAL = 600  # 10 minutes - longest a scheduled consolidation can be deferred
+MEMORY_CONSOLIDATION_DEBOUNCE = safe_int_env('MEMORY_CONSOLIDATION_DEBOUNCE', 30)  # quiet seconds before running
+MEMORY_CONSOLIDATION_WORKERS = safe_int_env('MEMORY_CONSOLIDATION_WORKERS', 2)
+MEMORY_CONSOLIDATION_BATCH_SIZE = safe_int_env('MEMORY_CONSOLIDATION_BATCH_SIZE', 500)  # memories clustered per pass
+MEMORY_CONSOLIDATION_MIN_MEMORIES = safe_int_env('MEMORY_CONSOLIDATION_MIN_MEMORIES', 10)
+MEMORY_MERGE_DISTANCE_THRESHOLD = 0.15  # cosine distance under which memories are near-duplicates
+MEMORY_EMBEDDING_CACHE_SIZE = safe_int_env('MEMORY_EMBEDDING_CACHE_SIZE', 1024)  # content-hash -> embedding LRU
+MEMORY_INGEST_BATCH_SIZE = safe_int_env('MEMORY_INGEST_BATCH_SIZE', 32)  # memories embedded per embed_many call
+MEMORY_INGEST_MAX_WAIT_MS = safe_int_env('MEMORY_INGEST_MAX_WAIT_MS', 250)  # wait for a batch to fill
+MEMORY_INGEST_QUEUE_SIZE = safe_int_env('MEMORY_INGEST_QUEUE_SIZE', 10000)  # pending memories before dropping
+
+# Vector index for agent_memories: "hnsw" (approximate, sub-linear) or "flat" (exact brute force)
+MEMORY_INDEX_NAME = "agent_memories"
+MEMORY_INDEX_PREFIX = "memory"
+MEMORY_INDEX_ALGORITHM = safe_str_env('MEMORY_INDEX_ALGORITHM', 'hnsw').lower()
+MEMORY_HNSW_M = safe_int_env('MEMORY_HNSW_M', 16)
+MEMORY_HNSW_EF_CONSTRUCTION = safe_int_env('MEMORY_HNSW_EF_CONSTRUCTION', 200)
+MEMORY_HNSW_EF_RUNTIME = safe_int_env('MEMORY_HNSW_EF_RUNTIME', 10)
+MEMORY_INDEX_MIGRATION_TIMEOUT = safe_int_env('MEMORY_INDEX_MIGRATION_TIMEOUT', 3600)  # seconds
 
 # Global model cache to prevent reloading
 _GLOBAL_VECTORIZER_CACHE = {}
@@ -105,6 +129,125 @@ class StoredMemory:
     metadata: str = "{}"
     confidence_score: float = 0.0
 
+@dataclass
+class PendingMemory:
+    """A memory waiting in the ingest queue to be embedded and stored"""
+    content: str
+    memory_type: MemoryType
+    user_id: str = SYSTEM_USER_ID
+    thread_id: Optional[str] = None
+    metadata: str = "{}"
+    confidence_score: float = 1.0
+    enqueued_at: float = 0.0
+
+class ConsolidationScheduler:
+    """
+    Debounced, de-duplicating scheduler for per-user memory consolidation.
+
+    A user is pending at most once: repeated requests push its run back by ``debounce``
+    seconds (never beyond ``max_delay`` after the first request). A dispatcher thread sleeps
+    until the next run is due and hands it to a bounded worker pool; the same user never
+    runs twice at once, and a request that arrives mid-run schedules one follow-up run.
+    """
+
+    def __init__(self, run: Callable[[str], None], workers: int = 2,
+                 debounce: float = 30, max_delay: float = 600):
+        self._run = run
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._due: Dict[str, float] = {}        # user_id -> monotonic time the run is due
+        self._requested: Dict[str, float] = {}  # user_id -> first (uncoalesced) request
+        self._running: set = set()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="memory-consolidation")
+        self._stopped = False
+        self._stats = {
+            'scheduled': 0,
+            'coalesced': 0,
+            'completed': 0,
+            'failed': 0,
+            'last_lag_s': 0.0,
+            'max_lag_s': 0.0,
+            'last_duration_s': 0.0,
+        }
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def schedule(self, user_id: str):
+        now = time.monotonic()
+        with self._condition:
+            if self._stopped:
+                return
+            first = self._requested.setdefault(user_id, now)
+            if user_id in self._due:
+                self._stats['coalesced'] += 1
+            else:
+                self._stats['scheduled'] += 1
+            self._due[user_id] = min(now + self.debounce, first + self.max_delay)
+            self._condition.notify()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    now = time.monotonic()
+                    ready = [user_id for user_id, due in self._due.items()
+                             if due <= now and user_id not in self._running]
+                    if ready:
+                        break
+                    waiting = [due for user_id, due in self._due.items() if user_id not in self._running]
+                    self._condition.wait(timeout=max(0.0, min(waiting) - now) if waiting else None)
+                if self._stopped:
+                    return
+
+                for user_id in ready:
+                    del self._due[user_id]
+                    lag = now - self._requested.pop(user_id)
+                    self._stats['last_lag_s'] = round(lag, 3)
+                    self._stats['max_lag_s'] = round(max(self._stats['max_lag_s'], lag), 3)
+                    self._running.add(user_id)
+                    self._executor.submit(self._run_one, user_id)
+
+    def _run_one(self, user_id: str):
+        started = time.monotonic()
+        failed = False
+        try:
+            self._run(user_id)
+        except Exception as e:
+            failed = True
+            logger.error(f"❌ Memory consolidation error for {user_id}: {e}")
+        finally:
+            with self._condition:
+                self._running.discard(user_id)
+                self._stats['failed' if failed else 'completed'] += 1
+                self._stats['last_duration_s'] = round(time.monotonic() - started, 3)
+                # A request that arrived while running may now be due
+                self._condition.notify()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._condition:
+            oldest = min(self._requested.values()) if self._requested else None
+            return {
+                **self._stats,
+                'queue_depth': len(self._due),
+                'running': len(self._running),
+                'oldest_pending_s': round(now - oldest, 3) if oldest is not None else 0.0,
+                'debounce_s': self.debounce,
+                'max_delay_s': self.max_delay,
+            }
+
+    def shutdown(self, timeout: float = 5):
+        """Stop dispatching; pending runs are discarded, running ones finish"""
+        with self._condition:
+            self._stopped = True
+            self._due.clear()
+            self._requested.clear()
+            self._condition.notify_all()
+        self._dispatcher.join(timeout=timeout)
+        self._executor.shutdown(wait=False)
+
 class AgentMemorySystem:
     """
     🧠 Redis-based Agent Memory System
@@ -132,6 +275,9 @@ class AgentMemorySystem:
         # Initialize memory consolidation
         self._init_memory_consolidation()
 
+        # Initialize batched memory ingestion
+        self._init_memory_ingest()
+
         logger.info("🧠 Agent Memory System initialized successfully")
 
     def _init_redis_clients(self):
@@ -156,6 +302,11 @@ class AgentMemorySystem:
 
     def _init_embeddings(self):
         """Initialize text embedding system with global caching"""
+        # Recently embedded texts (repeated insight phrases, dedup + store of the same content)
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self._embedding_cache_stats = {'hits': 0, 'misses': 0}
+
         try:
             if REDISVL_AVAILABLE and SENTENCE_TRANSFORMERS_AVAILABLE:
                 # Set environment variable to avoid tokenizer warnings
@@ -195,83 +346,184 @@ class AgentMemorySystem:
             return
 
         try:
-            # Define schema for memory storage
-            memory_schema = IndexSchema.from_dict({
-                "index": {
-                    "name": "agent_memories",
-                    "prefix": "memory",
-                    "key_separator": ":",
-                    "storage_type": "json",
-                },
-                "fields": [
-                    {"name": "content", "type": "text"},
-                    {"name": "memory_type", "type": "tag"},
-                    {"name": "metadata", "type": "text"},
-                    {"name": "created_at", "type": "text"},
-                    {"name": "user_id", "type": "tag"},
-                    {"name": "memory_id", "type": "tag"},
-                    {"name": "thread_id", "type": "tag"},
-                    {"name": "confidence_score", "type": "numeric"},
-                    {
-                        "name": "embedding",
-                        "type": "vector",
-                        "attrs": {
-                            "algorithm": "flat",
-                            "dims": MEMORY_EMBEDDING_DIMS,
-                            "distance_metric": "cosine",
-                            "datatype": "float32",
-                        },
-                    },
-                ],
-            })
-
             # Create Redis client for RedisVL (without decode_responses for binary data)
-            redisvl_client = redis.from_url(self.redis_url, decode_responses=False)
+            self._redisvl_client = redis.from_url(self.redis_url, decode_responses=False)
 
-            # Create the search index
+            target_name = memory_index_name()
             self.long_term_memory_index = SearchIndex(
-                schema=memory_schema,
-                redis_client=redisvl_client
+                schema=IndexSchema.from_dict(memory_index_schema(target_name)),
+                redis_client=self._redisvl_client
             )
 
-            try:
-                self.long_term_memory_index.create(overwrite=False)
-                logger.info("✅ Created new long-term memory index")
-            except Exception as e:
-                # Index likely already exists, which is fine
-                logger.debug(f"Memory index creation info: {e}")
-                pass
-
-            logger.info("✅ Long-term memory index initialized")
+            if not self.long_term_memory_index.exists():
+                try:
+                    self.long_term_memory_index.create(overwrite=False)
+                    logger.info(f"✅ Created new long-term memory index: {target_name}")
+                except Exception as e:
+                    # Another worker process may have created it first
+                    if not self.long_term_memory_index.exists():
+                        raise
+                    logger.debug(f"Memory index {target_name} created concurrently: {e}")
+
+            if memory_index_ready(self.long_term_memory_index):
+                logger.info(f"✅ Long-term memory index initialized: {target_name}")
+                return
+
+            # The index is still back-filling (in this worker or another one). If a previous
+            # agent_memories index (e.g. the flat one) covers the same documents, keep serving
+            # from it and switch once the new index is complete. Dropping the previous index is
+            # a separate step (scripts/migrate_memory_index.py --drop-previous).
+            previous = [name for name in list_memory_indexes(self._redisvl_client) if name != target_name]
+            if previous:
+                self.long_term_memory_index = SearchIndex.from_existing(previous[0], redis_client=self._redisvl_client)
+                threading.Thread(
+                    target=self.migrate_memory_index,
+                    daemon=True
+                ).start()
+                logger.info(f"🔄 Serving from {previous[0]} until {target_name} is fully indexed")
+            else:
+                logger.info(f"⏳ Long-term memory index {target_name} is still indexing existing memories")
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize long-term memory index: {e}")
             self.long_term_memory_index = None
 
+    def migrate_memory_index(self, timeout: int = MEMORY_INDEX_MIGRATION_TIMEOUT) -> bool:
+        """
+        Online migration to the configured index (algorithm / HNSW parameters).
+        The new index is created over the same ``memory:`` documents and Redis back-fills it
+        in the background; this worker keeps querying the current index until the new one
+        reports percent_indexed == 1, then switches. Previous index definitions are left in
+        place for other workers; drop them with scripts/migrate_memory_index.py.
+        """
+        target_name = memory_index_name()
+        try:
+            target = SearchIndex(
+                schema=IndexSchema.from_dict(memory_index_schema(target_name)),
+                redis_client=self._redisvl_client
+            )
+            if not target.exists():
+                target.create(overwrite=False)
+
+            deadline = time.time() + timeout
+            while not memory_index_ready(target):
+                if time.time() > deadline:
+                    logger.warning(f"⚠️ Memory index migration timed out, keeping {self.long_term_memory_index.name}")
+                    return False
+                time.sleep(1)
+
+            self.long_term_memory_index = target
+            logger.info(f"✅ Long-term memory index switched to {target_name} ({target.info().get('num_docs', 0)} memories)")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Memory index migration failed: {e}")
+            return False
+
     def _init_memory_consolidation(self):
         """Initialize background memory consolidation"""
-        self.consolidation_queue = Queue()
-        self._consolidation_running = True
+        self.consolidation_scheduler = ConsolidationScheduler(
+            self._consolidate_memories_for_user,
+            workers=MEMORY_CONSOLIDATION_WORKERS,
+            debounce=MEMORY_CONSOLIDATION_DEBOUNCE,
+            max_delay=MEMORY_CONSOLIDATION_INTERVAL
+        )
 
-        # Start consolidation worker thread
-        self.consolidation_thread = threading.Thread(
-            target=self._memory_consolidation_worker,
+        logger.info("✅ Memory consolidation scheduler started")
+
+    def _init_memory_ingest(self):
+        """Initialize the background queue that embeds and stores memories in batches"""
+        self.ingest_queue: "Queue[Optional[PendingMemory]]" = Queue(maxsize=MEMORY_INGEST_QUEUE_SIZE)
+        self._ingest_running = True
+        self._ingest_stats_lock = threading.Lock()
+        self._ingest_stats = {
+            'queued': 0,
+            'stored': 0,
+            'duplicates': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'last_batch_ms': 0.0,
+        }
+
+        self.ingest_thread = threading.Thread(
+            target=self._memory_ingest_worker,
             daemon=True
         )
-        self.consolidation_thread.start()
-
-        logger.info("✅ Memory consolidation worker started")
+        self.ingest_thread.start()
+
+        logger.info("✅ Memory ingest worker started")
+
+    def embed(self, content: str) -> List[float]:
+        """Embed ``content``, reusing the vector when identical text was embedded recently"""
+        key = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                self._embedding_cache_stats['hits'] += 1
+                return embedding
+            self._embedding_cache_stats['misses'] += 1
+
+        embedding = self.vectorizer.embed(content)
+        self._remember_embeddings({key: embedding})
+        return embedding
+
+    def embed_many(self, contents: List[str]) -> List[List[float]]:
+        """Embed several texts with one batched model call for the ones not cached"""
+        keys = [hashlib.sha1(content.encode('utf-8')).hexdigest() for content in contents]
+        embeddings: Dict[str, List[float]] = {}
+        with self._embedding_cache_lock:
+            for key in keys:
+                embedding = self._embedding_cache.get(key)
+                if embedding is not None:
+                    self._embedding_cache.move_to_end(key)
+                    embeddings[key] = embedding
+            self._embedding_cache_stats['hits'] += sum(1 for key in keys if key in embeddings)
+            self._embedding_cache_stats['misses'] += sum(1 for key in keys if key not in embeddings)
+
+        missing = {}
+        for key, content in zip(keys, contents):
+            if key not in embeddings:
+                missing.setdefault(key, content)
+        if missing:
+            vectors = self.vectorizer.embed_many(list(missing.values()), batch_size=MEMORY_INGEST_BATCH_SIZE)
+            fresh = dict(zip(missing.keys(), vectors))
+            self._remember_embeddings(fresh)
+            embeddings.update(fresh)
+        return [embeddings[key] for key in keys]
+
+    def _remember_embeddings(self, embeddings: Dict[str, List[float]]):
+        with self._embedding_cache_lock:
+            for key, embedding in embeddings.items():
+                self._embedding_cache[key] = embedding
+                self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > MEMORY_EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+
+    def get_embedding_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the embedding LRU"""
+        with self._embedding_cache_lock:
+            lookups = self._embedding_cache_stats['hits'] + self._embedding_cache_stats['misses']
+            return {
+                **self._embedding_cache_stats,
+                'size': len(self._embedding_cache),
+                'max_size': MEMORY_EMBEDDING_CACHE_SIZE,
+                'hit_rate': round(self._embedding_cache_stats['hits'] / lookups, 4) if lookups else 0.0,
+            }
 
     def similar_memory_exists(self, content: str, memory_type: MemoryType,
                             user_id: str = SYSTEM_USER_ID,
                             thread_id: Optional[str] = None,
-                            distance_threshold: float = MEMORY_DISTANCE_THRESHOLD) -> bool:
-        """Check if a similar long-term memory already exists"""
+                            distance_threshold: float = MEMORY_DISTANCE_THRESHOLD,
+                            embedding: Optional[List[float]] = None) -> bool:
+        """Check if a similar long-term memory already exists (pass ``embedding`` to skip re-embedding)"""
         if not self.long_term_memory_index or not self.vectorizer:
             return False
 
         try:
-            content_embedding = self.vectorizer.embed(content)
+            content_embedding = embedding if embedding is not None else self.embed(content)
 
             # Build filters
             filters = (Tag("user_id") == user_id) & (Tag("memory_type") == memory_type.value)
@@ -315,21 +567,22 @@ class AgentMemorySystem:
 
         logger.debug(f"📝 Storing memory: {content[:50]}...")
 
+        # Embed once: the same vector serves the duplicate check and the stored record
+        try:
+            embedding = self.embed(content)
+        except Exception as embed_error:
+            logger.debug(f"⚠️ Embedding failed: {embed_error}")
+            return False
+
         # Check for duplicates with error handling
         try:
-            if self.similar_memory_exists(content, memory_type, user_id, thread_id):
+            if self.similar_memory_exists(content, memory_type, user_id, thread_id, embedding=embedding):
                 logger.debug("🔄 Similar memory exists, skipping storage")
                 return False
         except Exception:
             logger.debug("⚠️ Duplicate check failed, proceeding anyway")
 
         try:
-            # Generate embedding with error handling
-            try:
-                embedding = self.vectorizer.embed(content)
-            except Exception as embed_error:
-                logger.debug(f"⚠️ Embedding failed: {embed_error}")
-                return False
 
             # Create memory data
             memory_data = {
@@ -378,6 +631,159 @@ class AgentMemorySystem:
             logger.debug(f"❌ Memory storage error: {e}")
             return False
 
+    def enqueue_memory(self, content: str, memory_type: MemoryType,
+                       user_id: str = SYSTEM_USER_ID,
+                       thread_id: Optional[str] = None,
+                       metadata: Optional[str] = None,
+                       confidence_score: float = 1.0) -> bool:
+        """
+        Queue a memory for background storage and return immediately.
+        The ingest worker embeds queued memories in batches, drops duplicates and bulk-loads
+        the rest into the index, then schedules consolidation for the affected users.
+        """
+        if not self.long_term_memory_index or not self.vectorizer:
+            return False
+
+        pending = PendingMemory(
+            content=content,
+            memory_type=memory_type,
+            user_id=user_id or SYSTEM_USER_ID,
+            thread_id=thread_id,
+            metadata=metadata or "{}",
+            confidence_score=confidence_score,
+            enqueued_at=time.time(),
+        )
+        try:
+            self.ingest_queue.put_nowait(pending)
+        except Full:
+            with self._ingest_stats_lock:
+                self._ingest_stats['dropped'] += 1
+            logger.warning("⚠️ Memory ingest queue full, dropping memory")
+            return False
+
+        with self._ingest_stats_lock:
+            self._ingest_stats['queued'] += 1
+        return True
+
+    def _memory_ingest_worker(self):
+        """Background worker: collect queued memories into batches and store them"""
+        while self._ingest_running:
+            try:
+                first = self.ingest_queue.get()
+                if first is None:
+                    break
+
+                # Let the batch fill up for a short while before paying for the model call
+                batch = [first]
+                deadline = time.time() + MEMORY_INGEST_MAX_WAIT_MS / 1000
+                stop = False
+                while len(batch) < MEMORY_INGEST_BATCH_SIZE:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending = self.ingest_queue.get(timeout=remaining)
+                    except Empty:
+                        break
+                    if pending is None:
+                        stop = True
+                        break
+                    batch.append(pending)
+
+                self._store_memory_batch(batch)
+                if stop:
+                    break
+
+            except Exception as e:
+                logger.error(f"❌ Memory ingest error: {e}")
+
+    def _store_memory_batch(self, batch: List[PendingMemory]) -> int:
+        """Embed a batch with one embed_many call, drop duplicates and bulk-load the rest"""
+        started = time.time()
+
+        # Identical memories queued together only need to be stored once
+        unique: Dict[tuple, PendingMemory] = {}
+        for pending in batch:
+            unique.setdefault((pending.user_id, pending.memory_type, pending.thread_id, pending.content), pending)
+        pending_memories = list(unique.values())
+        duplicates = len(batch) - len(pending_memories)
+
+        try:
+            embeddings = self.embed_many([pending.content for pending in pending_memories])
+        except Exception as e:
+            logger.error(f"❌ Batch embedding failed for {len(pending_memories)} memories: {e}")
+            with self._ingest_stats_lock:
+                self._ingest_stats['failed'] += len(pending_memories)
+            return 0
+
+        records = []
+        stored_users = set()
+        for pending, embedding in zip(pending_memories, embeddings):
+            try:
+                if self.similar_memory_exists(pending.content, pending.memory_type, pending.user_id,
+                                              pending.thread_id, embedding=embedding):
+                    duplicates += 1
+                    continue
+            except Exception:
+                logger.debug("⚠️ Duplicate check failed, proceeding anyway")
+
+            records.append({
+                "user_id": pending.user_id,
+                "content": pending.content,
+                "memory_type": pending.memory_type.value,
+                "metadata": pending.metadata,
+                "created_at": datetime.fromtimestamp(pending.enqueued_at).isoformat(),
+                "embedding": embedding,
+                "memory_id": str(ulid.ULID()),
+                "thread_id": pending.thread_id,
+                "confidence_score": pending.confidence_score,
+            })
+            stored_users.add(pending.user_id)
+
+        stored, failed = 0, 0
+        if records:
+            try:
+                self.long_term_memory_index.load(records)
+                stored = len(records)
+            except Exception as e:
+                # Same graceful degradation as store_memory: plain Redis keys, one pipeline
+                logger.debug(f"⚠️ Bulk index load failed, using simple storage: {e}")
+                try:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for record in records:
+                        pipe.setex(f"simple_memory:{record['memory_id']}", 86400, json.dumps({
+                            "content": record["content"],
+                            "memory_type": record["memory_type"],
+                            "user_id": record["user_id"],
+                            "created_at": record["created_at"]
+                        }))
+                    pipe.execute()
+                    stored = len(records)
+                except Exception:
+                    logger.debug("⚠️ Memory storage unavailable, continuing without memory")
+                    failed = len(records)
+                    stored_users.clear()
+
+        for user_id in stored_users:
+            self.schedule_memory_consolidation(user_id)
+
+        elapsed_ms = (time.time() - started) * 1000
+        with self._ingest_stats_lock:
+            self._ingest_stats['stored'] += stored
+            self._ingest_stats['duplicates'] += duplicates
+            self._ingest_stats['failed'] += failed
+            self._ingest_stats['batches'] += 1
+            self._ingest_stats['last_batch_size'] = len(batch)
+            self._ingest_stats['last_batch_ms'] = round(elapsed_ms, 2)
+
+        logger.debug(f"📝 Memory batch: {stored} stored, {duplicates} duplicates ({len(batch)} queued, {elapsed_ms:.1f}ms)")
+        return stored
+
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """Counters of the batched memory ingest queue"""
+        with self._ingest_stats_lock:
+            return {**self._ingest_stats, 'pending': self.ingest_queue.qsize()}
+
     def retrieve_memories(self, query: str,
                          memory_type: Union[MemoryType, List[MemoryType], None] = None,
                          user_id: str = SYSTEM_USER_ID,
@@ -397,7 +803,7 @@ class AgentMemorySystem:
 
             # Create vector query
             vector_query = VectorRangeQuery(
-                vector=self.vectorizer.embed(query),
+                vector=self.embed(query),
                 return_fields=[
                     "content", "memory_type", "metadata", "created_at",
                     "memory_id", "thread_id", "user_id", "confidence_score"
@@ -445,32 +851,7 @@ class AgentMemorySystem:
             results = self.long_term_memory_index.query(vector_query)
 
             # Parse results into StoredMemory objects
-            memories = []
-            for doc in results:
-                try:
-                    # Safely parse the created_at field
-                    created_at_str = doc.get("created_at", "")
-                    try:
-                        created_at = datetime.fromisoformat(created_at_str)
-                    except (ValueError, TypeError):
-                        created_at = datetime.now()
-
-                    memory = StoredMemory(
-                        id=doc.get("id", ""),
-                        memory_id=doc.get("memory_id", ""),
-                        user_id=doc.get("user_id", ""),
-                        thread_id=doc.get("thread_id"),
-                        memory_type=MemoryType(doc.get("memory_type", "episodic")),
-                        content=doc.get("content", ""),
-                        created_at=created_at,
-                        metadata=doc.get("metadata", "{}"),
-                        confidence_score=float(doc.get("confidence_score", 0.0))
-                    )
-                    memories.append(memory)
-                except Exception as e:
-                    logger.error(f"Error parsing memory result: {e}")
-                    logger.debug(f"Problematic document: {doc}")
-                    continue
+            memories = self._parse_memory_results(results)
 
             logger.debug(f"📋 Retrieved {len(memories)} memories")
             return memories
@@ -479,6 +860,63 @@ class AgentMemorySystem:
             logger.error(f"❌ Error retrieving memories: {e}")
             return []
 
+    def _parse_memory_results(self, results: List[Dict[str, Any]]) -> List[StoredMemory]:
+        """Convert index search results into StoredMemory objects"""
+        memories = []
+        for doc in results:
+            try:
+                # Safely parse the created_at field
+                created_at_str = doc.get("created_at", "")
+                try:
+                    created_at = datetime.fromisoformat(created_at_str)
+                except (ValueError, TypeError):
+                    created_at = datetime.now()
+
+                memory = StoredMemory(
+                    id=doc.get("id", ""),
+                    memory_id=doc.get("memory_id", ""),
+                    user_id=doc.get("user_id", ""),
+                    thread_id=doc.get("thread_id"),
+                    memory_type=MemoryType(doc.get("memory_type", "episodic")),
+                    content=doc.get("content", ""),
+                    created_at=created_at,
+                    metadata=doc.get("metadata", "{}"),
+                    confidence_score=float(doc.get("confidence_score", 0.0))
+                )
+                memories.append(memory)
+            except Exception as e:
+                logger.error(f"Error parsing memory result: {e}")
+                logger.debug(f"Problematic document: {doc}")
+                continue
+        return memories
+
+    def _fetch_user_memories(self, user_id: str, memory_type: MemoryType,
+                             limit: int = MEMORY_CONSOLIDATION_BATCH_SIZE):
+        """
+        A user's memories of one type together with their stored embeddings.
+        Uses a tag-only FilterQuery, so nothing is embedded and no vectors are scanned.
+        """
+        query = FilterQuery(
+            filter_expression=(Tag("user_id") == user_id) & (Tag("memory_type") == memory_type.value),
+            return_fields=[
+                "content", "memory_type", "metadata", "created_at",
+                "memory_id", "thread_id", "user_id", "confidence_score"
+            ],
+            num_results=limit,
+        )
+        memories = self._parse_memory_results(self.long_term_memory_index.query(query))
+        if not memories:
+            return [], np.empty((0, MEMORY_EMBEDDING_DIMS), dtype=np.float32)
+
+        # One JSON.MGET for every embedding of the batch
+        stored = self.redis_client.json().mget([memory.id for memory in memories], "$.embedding")
+        kept, vectors = [], []
+        for memory, embedding in zip(memories, stored):
+            if embedding and embedding[0]:
+                kept.append(memory)
+                vectors.append(embedding[0])
+        return kept, np.asarray(vectors, dtype=np.float32).reshape(len(kept), -1)
+
     def get_memory_context_for_ai(self, query: str, user_id: str,
                                  thread_id: Optional[str] = None,
                                  max_memories: int = 5) -> str:
@@ -519,21 +957,6 @@ class AgentMemorySystem:
             logger.error(f"❌ Error getting memory context: {e}")
             return ""
 
-    def _memory_consolidation_worker(self):
-        """Background worker for memory consolidation"""
-        while self._consolidation_running:
-            try:
-                # Wait for consolidation tasks
-                if not self.consolidation_queue.empty():
-                    user_id = self.consolidation_queue.get(timeout=MEMORY_CONSOLIDATION_INTERVAL)
-                    self._consolidate_memories_for_user(user_id)
-                else:
-                    time.sleep(MEMORY_CONSOLIDATION_INTERVAL)
-
-            except Exception as e:
-                logger.error(f"❌ Memory consolidation error: {e}")
-                time.sleep(60)  # Wait before retrying
-
     def _consolidate_memories_for_user(self, user_id: str):
         """Consolidate similar memories for a specific user"""
         if not self.long_term_memory_index:
@@ -542,24 +965,15 @@ class AgentMemorySystem:
         try:
             logger.info(f"🔧 Consolidating memories for user: {user_id}")
 
-            # Get all memories for user
-            all_memories = self.retrieve_memories(
-                query="",  # Empty query to get all
-                user_id=user_id,
-                distance_threshold=1.0,  # Get all memories
-                limit=100
-            )
-
-            # Group similar memories and consolidate
-            # This is a simplified version - could be enhanced with clustering
             consolidated_count = 0
             for memory_type in [MemoryType.EPISODIC, MemoryType.SEMANTIC]:
-                type_memories = [m for m in all_memories if m.memory_type == memory_type]
+                # Cheap count first: most users never reach the consolidation threshold
+                if self.count_memories(user_id, memory_type) <= MEMORY_CONSOLIDATION_MIN_MEMORIES:
+                    continue
+                type_memories, embeddings = self._fetch_user_memories(user_id, memory_type)
 
-                if len(type_memories) > 10:  # Only consolidate if we have many memories
-                    # Find similar groups and merge (simplified approach)
-                    # In production, you'd use clustering algorithms
-                    consolidated_count += self._merge_similar_memories(type_memories)
+                if len(type_memories) > MEMORY_CONSOLIDATION_MIN_MEMORIES:  # Only consolidate if we have many memories
+                    consolidated_count += self._merge_similar_memories(type_memories, embeddings)
 
             if consolidated_count > 0:
                 logger.info(f"✅ Consolidated {consolidated_count} memories for user {user_id}")
@@ -567,32 +981,94 @@ class AgentMemorySystem:
         except Exception as e:
             logger.error(f"❌ Error consolidating memories for user {user_id}: {e}")
 
-    def _merge_similar_memories(self, memories: List[StoredMemory]) -> int:
-        """Merge similar memories (simplified implementation)"""
-        # This is a placeholder for more sophisticated memory consolidation
-        # In production, you'd implement clustering and intelligent merging
-        return 0
+    def _merge_similar_memories(self, memories: List[StoredMemory], embeddings: np.ndarray,
+                                distance_threshold: float = MEMORY_MERGE_DISTANCE_THRESHOLD) -> int:
+        """
+        Merge near-duplicate memories and return how many records were removed.
+        Pairwise cosine similarity of the whole batch is one matrix product; memories are then
+        clustered greedily around the most confident (then most recent) unassigned memory.
+        Each cluster keeps that memory, with the highest confidence and a merge count in its
+        metadata, and the other members are deleted.
+        """
+        if len(memories) < 2:
+            return 0
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        vectors = embeddings / np.where(norms == 0, 1.0, norms)
+        similar = (vectors @ vectors.T) >= (1.0 - distance_threshold)
+
+        order = sorted(range(len(memories)),
+                       key=lambda i: (memories[i].confidence_score, memories[i].created_at),
+                       reverse=True)
+        assigned = np.zeros(len(memories), dtype=bool)
+        pipe = self.redis_client.pipeline(transaction=False)
+        removed = 0
+
+        for i in order:
+            if assigned[i]:
+                continue
+            members = np.flatnonzero(similar[i] & ~assigned)
+            assigned[members] = True
+            duplicates = [memories[j] for j in members if j != i]
+            if not duplicates:
+                continue
+
+            keeper = memories[i]
+            metadata = self._load_metadata(keeper.metadata)
+            metadata['merged_count'] = sum(
+                self._load_metadata(memory.metadata).get('merged_count', 1) for memory in [keeper] + duplicates
+            )
+            metadata['last_merged_at'] = datetime.now().isoformat()
+            confidence = max(memory.confidence_score for memory in [keeper] + duplicates)
+
+            pipe.json().set(keeper.id, "$.confidence_score", confidence)
+            pipe.json().set(keeper.id, "$.metadata", json.dumps(metadata))
+            pipe.delete(*[memory.id for memory in duplicates])
+            removed += len(duplicates)
+
+        if removed:
+            pipe.execute()
+        return removed
+
+    @staticmethod
+    def _load_metadata(metadata: Optional[str]) -> Dict[str, Any]:
+        """Memory metadata as a dict (non-JSON metadata is kept under 'note')"""
+        try:
+            loaded = json.loads(metadata or "{}")
+        except (TypeError, ValueError):
+            return {'note': metadata}
+        return loaded if isinstance(loaded, dict) else {'note': loaded}
 
     def schedule_memory_consolidation(self, user_id: str):
-        """Schedule memory consolidation for a user"""
+        """Schedule memory consolidation for a user (repeated requests are coalesced)"""
         try:
-            self.consolidation_queue.put(user_id)
+            self.consolidation_scheduler.schedule(user_id)
             logger.debug(f"📅 Scheduled memory consolidation for user: {user_id}")
         except Exception as e:
             logger.error(f"❌ Error scheduling consolidation: {e}")
 
+    def get_consolidation_stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput of the consolidation scheduler"""
+        return self.consolidation_scheduler.get_stats()
+
+    def count_memories(self, user_id: str, memory_type: Optional[MemoryType] = None) -> int:
+        """
+        Number of stored memories for a user (optionally of one type).
+        Tag-only FT.SEARCH with LIMIT 0 0: answered from the tag index, no embedding, no vectors.
+        """
+        if not self.long_term_memory_index:
+            return 0
+
+        filters = Tag("user_id") == (user_id or SYSTEM_USER_ID)
+        if memory_type:
+            filters = filters & (Tag("memory_type") == memory_type.value)
+        return int(self.long_term_memory_index.query(CountQuery(filter_expression=filters)))
+
     def get_memory_stats(self, user_id: str) -> Dict[str, Any]:
         """Get memory statistics for a user"""
         try:
-            episodic_count = len(self.retrieve_memories(
-                query="", memory_type=MemoryType.EPISODIC,
-                user_id=user_id, distance_threshold=1.0, limit=1000
-            ))
-
-            semantic_count = len(self.retrieve_memories(
-                query="", memory_type=MemoryType.SEMANTIC,
-                user_id=user_id, distance_threshold=1.0, limit=1000
-            ))
+            episodic_count = self.count_memories(user_id, MemoryType.EPISODIC)
+            semantic_count = self.count_memories(user_id, MemoryType.SEMANTIC)
 
             return {
                 "user_id": user_id,
@@ -608,11 +1084,107 @@ class AgentMemorySystem:
 
     def cleanup(self):
         """Cleanup resources"""
-        self._consolidation_running = False
-        if hasattr(self, 'consolidation_thread'):
-            self.consolidation_thread.join(timeout=5)
+        # Memories queued before the sentinel are still stored
+        if hasattr(self, 'ingest_thread'):
+            try:
+                self.ingest_queue.put(None, timeout=5)
+            except Full:
+                # Worker is stuck (Redis/embedding); stop after its current batch instead of hanging
+                self._ingest_running = False
+                backlog = self.ingest_queue.qsize()
+                with self._ingest_stats_lock:
+                    self._ingest_stats['dropped'] += backlog
+                logger.warning(f"⚠️ Memory ingest queue full at shutdown, dropping {backlog} queued memories")
+            self.ingest_thread.join(timeout=10)
+            self._ingest_running = False
+        if hasattr(self, 'consolidation_scheduler'):
+            self.consolidation_scheduler.shutdown(timeout=5)
         logger.info("🧹 Agent memory system cleaned up")
 
+def memory_vector_attrs(algorithm: str = MEMORY_INDEX_ALGORITHM) -> Dict[str, Any]:
+    """Vector field attributes of the agent_memories index"""
+    attrs = {
+        "algorithm": algorithm,
+        "dims": MEMORY_EMBEDDING_DIMS,
+        "distance_metric": "cosine",
+        "datatype": "float32",
+    }
+    if algorithm == "hnsw":
+        attrs.update({
+            "m": MEMORY_HNSW_M,
+            "ef_construction": MEMORY_HNSW_EF_CONSTRUCTION,
+            "ef_runtime": MEMORY_HNSW_EF_RUNTIME,
+        })
+    return attrs
+
+def memory_index_name(algorithm: str = MEMORY_INDEX_ALGORITHM) -> str:
+    """Index name for a vector configuration; the flat index keeps the original name"""
+    if algorithm == "flat":
+        return MEMORY_INDEX_NAME
+    return f"{MEMORY_INDEX_NAME}_{algorithm}_m{MEMORY_HNSW_M}_efc{MEMORY_HNSW_EF_CONSTRUCTION}_efr{MEMORY_HNSW_EF_RUNTIME}"
+
+def memory_index_schema(name: str, algorithm: str = MEMORY_INDEX_ALGORITHM,
+                        prefix: str = MEMORY_INDEX_PREFIX) -> Dict[str, Any]:
+    """RedisVL schema for long-term memories"""
+    return {
+        "index": {
+            "name": name,
+            "prefix": prefix,
+            "key_separator": ":",
+            "storage_type": "json",
+        },
+        "fields": [
+            {"name": "content", "type": "text"},
+            {"name": "memory_type", "type": "tag"},
+            {"name": "metadata", "type": "text"},
+            {"name": "created_at", "type": "text"},
+            {"name": "user_id", "type": "tag"},
+            {"name": "memory_id", "type": "tag"},
+            {"name": "thread_id", "type": "tag"},
+            {"name": "confidence_score", "type": "numeric"},
+            {
+                "name": "embedding",
+                "type": "vector",
+                "attrs": memory_vector_attrs(algorithm),
+            },
+        ],
+    }
+
+def list_memory_indexes(redis_client) -> List[str]:
+    """Names of every agent_memories index in Redis"""
+    names = redis_client.execute_command("FT._LIST")
+    names = [name.decode() if isinstance(name, bytes) else name for name in names]
+    return [name for name in names if name == MEMORY_INDEX_NAME or name.startswith(f"{MEMORY_INDEX_NAME}_")]
+
+def memory_index_ready(index) -> bool:
+    """True once Redis has finished back-filling ``index`` (percent_indexed == 1)"""
+    info = index.info()
+    percent = float(info.get('percent_indexed', 1) or 0)
+    return percent >= 1.0 and str(info.get('indexing', 0)) in ('0', 'False')
+
+def drop_previous_memory_indexes(redis_client) -> List[str]:
+    """
+    Drop every agent_memories index other than the configured one (documents are kept).
+    Explicit maintenance step: run it only after all workers serve the configured index;
+    refuses while that index is missing or still back-filling.
+    """
+    target_name = memory_index_name()
+    target = SearchIndex(
+        schema=IndexSchema.from_dict(memory_index_schema(target_name)),
+        redis_client=redis_client
+    )
+    if not target.exists() or not memory_index_ready(target):
+        raise RuntimeError(f"Memory index {target_name} is not fully built; keeping previous indexes")
+
+    dropped = []
+    for name in list_memory_indexes(redis_client):
+        if name != target_name:
+            # drop=False keeps the JSON documents, only the index definition goes
+            SearchIndex.from_existing(name, redis_client=redis_client).delete(drop=False)
+            dropped.append(name)
+            logger.info(f"🗑️ Dropped previous memory index {name}")
+    return dropped
+
 # Memory Management Tools for LLM
 @tool
 def store_memory_tool(content: str, memory_type: MemoryType,
@@ -694,6 +1266,9 @@ class MockAgentMemorySystem:
     def store_memory(self, *args, **kwargs):
         return False
 
+    def enqueue_memory(self, *args, **kwargs):
+        return False
+
     def retrieve_memories(self, *args, **kwargs):
         return []
 
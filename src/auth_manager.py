@@ -10,7 +10,7 @@ from datetime import datetime
 import logging
 from dataclasses import dataclass
 
-from config.database_config import DatabaseManager
+from config.database_config import initialize_database
 from src.user_roles import UserRole, determine_user_role
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ class AuthenticationManager:
 
     def __init__(self):
         """Initialize authentication manager with database connection"""
-        self.db_manager = DatabaseManager()
+        self.db_manager = initialize_database()
         self.active_sessions = {}  # In-memory session store
 
     def authenticate_user(self, email: str, password: str = None) -> Tuple[bool, Optional[UserSession], str]:
@@ -18,7 +18,7 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields as dataclass_fields
 import hashlib
 import redis
 from enum import Enum
@@ -69,6 +69,10 @@ def safe_json_loads(json_str):
         return None
     return json.loads(json_str)
 
+def estimate_tokens(text: Optional[str]) -> float:
+    """Rough token estimate (~1.3 tokens per whitespace-separated word)"""
+    return len(text.split()) * 1.3 if text else 0.0
+
 class MemoryType(Enum):
     BUFFER = "buffer"
     SUMMARY = "summary"
@@ -103,6 +107,13 @@ class SessionState:
     created_at: datetime
     updated_at: datetime
 
+# Session state is a Redis hash (one JSON-encoded field per SessionState attribute) and the
+# conversation summary a hash with a server-side interaction counter. Both use new key
+# prefixes so legacy JSON-string keys under ``session:``/``summary:`` simply expire.
+SESSION_STATE_FIELDS = frozenset(f.name for f in dataclass_fields(SessionState))
+SESSION_STATE_PREFIX = "session_state:"
+SUMMARY_PREFIX = "summary_state:"
+
 class WorldClassMemorySystem:
     """🧠 World-class conversation memory management system"""
 
@@ -176,14 +187,24 @@ class WorldClassMemorySystem:
             turn_id=turn_id
         )
 
-        # Store in all memory types
+        # Queue every layer's writes on one MULTI/EXEC pipeline: a single round trip per turn
+        pipe = self.redis_client.pipeline(transaction=True) if self.redis_client else None
         for memory_type, memory_system in self.memory_types.items():
             try:
-                memory_system.store_turn(session_id, turn)
-                logger.debug(f"✅ Stored turn in {memory_type.value} memory")
+                memory_system.store_turn(session_id, turn, pipe=pipe)
+                logger.debug(f"✅ Queued turn for {memory_type.value} memory")
             except Exception as e:
                 logger.error(f"❌ Failed to store in {memory_type.value} memory: {e}")
 
+        if pipe is not None:
+            try:
+                results = pipe.execute(raise_on_error=False)
+                errors = [result for result in results if isinstance(result, Exception)]
+                if errors:
+                    logger.error(f"❌ {len(errors)} of {len(results)} memory writes failed: {errors[0]}")
+            except Exception as e:
+                logger.error(f"❌ Failed to execute memory write pipeline: {e}")
+
         logger.info(f"🔄 Conversation turn stored: {turn_id}")
         return turn_id
 
@@ -202,6 +223,9 @@ class WorldClassMemorySystem:
         }
 
         try:
+            if self.redis_client:
+                return self._get_conversation_context_pipelined(session_id, context)
+
             # Get buffer memory (recent raw conversations)
             buffer_context = self.memory_types[MemoryType.BUFFER].get_context(session_id, max_turns=5)
             context['buffer_memory'] = buffer_context
@@ -221,7 +245,7 @@ class WorldClassMemorySystem:
             # Calculate rough token count
             # context_str = json.dumps(context)
             context_str = safe_json_dumps(context)
-            context['total_tokens'] = len(context_str.split()) * 1.3  # Rough token estimation
+            context['total_tokens'] = estimate_tokens(context_str)  # Rough token estimation
 
             logger.info(f"🎯 Retrieved conversation context for {session_id}: ~{context['total_tokens']} tokens")
             return context
@@ -230,6 +254,34 @@ class WorldClassMemorySystem:
             logger.error(f"❌ Error retrieving conversation context: {e}")
             return context
 
+    def _get_conversation_context_pipelined(self, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Read the buffer, summary, session and entity layers in a single pipelined round trip.
+        Token counts come from per-turn estimates stored with each buffer entry and from the
+        raw payloads already fetched, so the assembled context is never re-serialised.
+        """
+        layers = [
+            ('buffer_memory', self.memory_types[MemoryType.BUFFER], {'max_turns': 5}),
+            ('summary_memory', self.memory_types[MemoryType.SUMMARY], {}),
+            ('session_state', self.memory_types[MemoryType.SESSION], {}),
+            ('entity_memory', self.memory_types[MemoryType.ENTITY], {}),
+        ]
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for _, memory_system, options in layers:
+            memory_system.queue_context_read(pipe, session_id, **options)
+        results = pipe.execute()
+
+        total_tokens = 0.0
+        for (context_key, memory_system, _), raw in zip(layers, results):
+            layer_context, layer_tokens = memory_system.context_from_raw(session_id, raw)
+            context[context_key] = layer_context
+            total_tokens += layer_tokens
+        context['total_tokens'] = round(total_tokens, 1)
+
+        logger.info(f"🎯 Retrieved conversation context for {session_id}: ~{context['total_tokens']} tokens")
+        return context
+
     def update_session_state(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """📝 Update session state with new information"""
         try:
@@ -336,8 +388,8 @@ class BufferMemory:
         self.redis = redis_client
         self.fallback_storage = {}
 
-    def store_turn(self, session_id: str, turn: ConversationTurn):
-        """Store conversation turn in buffer"""
+    def store_turn(self, session_id: str, turn: ConversationTurn, pipe=None):
+        """Store conversation turn in buffer (queued on ``pipe`` when given)"""
         try:
             key = f"buffer:{session_id}"
             turn_data = {
@@ -348,12 +400,18 @@ class BufferMemory:
                 'intent': turn.intent,
                 'entities': turn.entities
             }
+            # Estimated once at write time so context loads can sum it instead of re-serialising
+            turn_data['token_estimate'] = round(estimate_tokens(
+                f"{turn.user_input} {turn.ai_response} {turn.intent} {safe_json_dumps(turn.entities)}"), 1)
 
             if self.redis:
                 # Store as list with expiration
-                self.redis.lpush(key, safe_json_dumps(turn_data))
-                self.redis.ltrim(key, 0, 9)  # Keep only last 10 turns
-                self.redis.expire(key, 3600)  # Expire in 1 hour
+                writer = pipe if pipe is not None else self.redis.pipeline(transaction=True)
+                writer.lpush(key, safe_json_dumps(turn_data))
+                writer.ltrim(key, 0, 9)  # Keep only last 10 turns
+                writer.expire(key, 3600)  # Expire in 1 hour
+                if pipe is None:
+                    writer.execute()
             else:
                 # Fallback to in-memory storage
                 if session_id not in self.fallback_storage:
@@ -374,17 +432,36 @@ class BufferMemory:
             else:
                 turns = self.fallback_storage.get(session_id, [])[:max_turns]
 
-            return {
-                'recent_turns': turns,
-                'turn_count': len(turns),
-                'last_user_input': turns[0]['user_input'] if turns else None,
-                'last_ai_response': turns[0]['ai_response'] if turns else None,
-                'recent_intents': [turn['intent'] for turn in turns]
-            }
+            return self._build_context(turns)
         except Exception as e:
             logger.error(f"❌ Error getting buffer context: {e}")
             return {'recent_turns': [], 'turn_count': 0}
 
+    def queue_context_read(self, pipe, session_id: str, max_turns: int = 5):
+        """Queue the buffer read on a shared pipeline"""
+        pipe.lrange(f"buffer:{session_id}", 0, max_turns - 1)
+
+    def context_from_raw(self, session_id: str, turns_data: List[str]) -> Tuple[Dict[str, Any], float]:
+        """Buffer context and token estimate from a pipelined LRANGE result"""
+        turns, tokens = [], 0.0
+        for raw in turns_data or []:
+            turn = safe_json_loads(raw)
+            if turn:
+                turns.append(turn)
+                # Entries written before per-turn estimates existed fall back to the raw payload
+                tokens += turn.get('token_estimate') or estimate_tokens(raw)
+        return self._build_context(turns), tokens
+
+    @staticmethod
+    def _build_context(turns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'recent_turns': turns,
+            'turn_count': len(turns),
+            'last_user_input': turns[0]['user_input'] if turns else None,
+            'last_ai_response': turns[0]['ai_response'] if turns else None,
+            'recent_intents': [turn['intent'] for turn in turns]
+        }
+
     def clear_session(self, session_id: str):
         """Clear buffer memory for session"""
         if self.redis:
@@ -399,8 +476,8 @@ class SessionMemory:
         self.redis = redis_client
         self.fallback_storage = {}
 
-    def store_turn(self, session_id: str, turn: ConversationTurn):
-        """Update session state based on conversation turn"""
+    def store_turn(self, session_id: str, turn: ConversationTurn, pipe=None):
+        """Update session state based on conversation turn (queued on ``pipe`` when given)"""
         # Extract session updates from turn
         updates = {
             'last_intent': turn.intent,
@@ -425,11 +502,25 @@ class SessionMemory:
             if 'payment_method' in turn.entities:
                 updates['payment_method'] = turn.entities['payment_method']
 
-        self.update_state(session_id, updates)
+        self.update_state(session_id, updates, pipe=pipe)
 
     def get_context(self, session_id: str) -> Dict[str, Any]:
         """Get current session context"""
-        session_state = self.get_session_state(session_id)
+        return self._build_context(self.get_session_state(session_id))
+
+    def queue_context_read(self, pipe, session_id: str):
+        """Queue the session state read on a shared pipeline"""
+        pipe.hgetall(f"{SESSION_STATE_PREFIX}{session_id}")
+
+    def context_from_raw(self, session_id: str, state_data: Dict[str, str]) -> Tuple[Dict[str, Any], float]:
+        """Session context and token estimate from a pipelined HGETALL result"""
+        if not state_data:
+            return self._build_context(None), 0.0
+        tokens = sum(estimate_tokens(value) for value in state_data.values())
+        return self._build_context(self._decode_state(session_id, state_data)), tokens
+
+    @staticmethod
+    def _build_context(session_state: Optional[SessionState]) -> Dict[str, Any]:
         if not session_state:
             return {'session_exists': False}
 
@@ -447,59 +538,38 @@ class SessionMemory:
             'session_duration': (datetime.now() - session_state.created_at).total_seconds()
         }
 
-    def update_state(self, session_id: str, updates: Dict[str, Any]) -> bool:
-        """Update session state"""
+    def update_state(self, session_id: str, updates: Dict[str, Any], pipe=None) -> bool:
+        """
+        Update session state field by field.
+        The state is a Redis hash with one JSON-encoded field per SessionState attribute,
+        so an update is HSETNX (defaults) + HSET (changes) with no read-modify-write.
+        """
         try:
-            # Get current state or create new
-            current_state = self.get_session_state(session_id)
-            if not current_state:
-                current_state = SessionState(
-                    session_id=session_id,
-                    customer_id=updates.get('customer_id'),
-                    cart_items=[],
-                    checkout_state={},
-                    current_intent='general',
-                    last_product_mentioned=None,
-                    delivery_address=None,
-                    payment_method=None,
-                    conversation_stage='browsing',
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-
-            # Apply updates
-            for key, value in updates.items():
-                if hasattr(current_state, key):
-                    setattr(current_state, key, value)
-
-            current_state.updated_at = datetime.now()
-
-            # Store updated state
-            key = f"session:{session_id}"
-            state_data = asdict(current_state)
-
-            # Convert datetime objects to strings and handle Decimal objects and Enum objects
-            for k, v in state_data.items():
-                if isinstance(v, datetime):
-                    state_data[k] = v.isoformat()
-                elif isinstance(v, Decimal):
-                    state_data[k] = float(v)
-                elif hasattr(v, '__class__') and hasattr(v.__class__, '__bases__'):
-                    # Check if it's an enum by checking if it has a 'value' attribute
-                    if hasattr(v, 'value'):
-                        state_data[k] = v.value
-                    elif hasattr(v, 'name'):
-                        state_data[k] = v.name
-                    # Handle nested dictionaries that might contain enums
-                elif isinstance(v, dict):
-                    state_data[k] = self._convert_enums_in_dict(v)
-                elif isinstance(v, list):
-                    state_data[k] = self._convert_enums_in_list(v)
+            now = datetime.now()
+            fields = {k: v for k, v in updates.items() if k in SESSION_STATE_FIELDS}
+            fields['updated_at'] = now
+            encoded = {k: self._encode_field(v) for k, v in fields.items()}
+            # Only applied when the session does not exist yet
+            defaults = {
+                k: self._encode_field(v)
+                for k, v in self._default_state(session_id, updates.get('customer_id'), now).items()
+                if k not in encoded
+            }
 
             if self.redis:
-                self.redis.setex(key, 7200, safe_json_dumps(state_data))  # 2 hour expiration
+                key = f"{SESSION_STATE_PREFIX}{session_id}"
+                writer = pipe if pipe is not None else self.redis.pipeline(transaction=True)
+                for field, value in defaults.items():
+                    writer.hsetnx(key, field, value)
+                writer.hset(key, mapping=encoded)
+                writer.expire(key, 7200)  # 2 hour expiration
+                if pipe is None:
+                    writer.execute()
             else:
-                self.fallback_storage[session_id] = state_data
+                state_data = self.fallback_storage.setdefault(session_id, {})
+                for field, value in defaults.items():
+                    state_data.setdefault(field, value)
+                state_data.update(encoded)
 
             return True
 
@@ -510,24 +580,13 @@ class SessionMemory:
     def get_session_state(self, session_id: str) -> Optional[SessionState]:
         """Get session state object"""
         try:
-            key = f"session:{session_id}"
-
             if self.redis:
-                state_data = self.redis.get(key)
-                if not state_data:
-                    return None
-                state_data = safe_json_loads(state_data)
+                state_data = self.redis.hgetall(f"{SESSION_STATE_PREFIX}{session_id}")
             else:
                 state_data = self.fallback_storage.get(session_id)
-                if not state_data:
-                    return None
-
-            # Convert string dates back to datetime
-            for date_field in ['created_at', 'updated_at']:
-                if date_field in state_data and isinstance(state_data[date_field], str):
-                    state_data[date_field] = datetime.fromisoformat(state_data[date_field])
-
-            return SessionState(**state_data)
+            if not state_data:
+                return None
+            return self._decode_state(session_id, state_data)
 
         except Exception as e:
             logger.error(f"❌ Error getting session state: {e}")
@@ -536,10 +595,52 @@ class SessionMemory:
     def clear_session(self, session_id: str):
         """Clear session memory"""
         if self.redis:
-            self.redis.delete(f"session:{session_id}")
+            # Legacy JSON-string key included until existing sessions expire
+            self.redis.delete(f"{SESSION_STATE_PREFIX}{session_id}", f"session:{session_id}")
         else:
             self.fallback_storage.pop(session_id, None)
 
+    @staticmethod
+    def _default_state(session_id: str, customer_id: Optional[int], now: datetime) -> Dict[str, Any]:
+        """Field values of a brand new session"""
+        return {
+            'session_id': session_id,
+            'customer_id': customer_id,
+            'cart_items': [],
+            'checkout_state': {},
+            'current_intent': 'general',
+            'last_product_mentioned': None,
+            'delivery_address': None,
+            'payment_method': None,
+            'conversation_stage': 'browsing',
+            'created_at': now,
+            'updated_at': now
+        }
+
+    def _encode_field(self, value: Any) -> str:
+        """JSON-encode one state field (Enum, Decimal and datetime values included)"""
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, dict):
+            value = self._convert_enums_in_dict(dict(value))
+        elif isinstance(value, list):
+            value = self._convert_enums_in_list(value)
+        return safe_json_dumps(value)
+
+    def _decode_state(self, session_id: str, state_data: Dict[str, str]) -> SessionState:
+        """Build a SessionState from stored hash fields"""
+        fields = self._default_state(session_id, None, datetime.now())
+        for field, raw in state_data.items():
+            if field in SESSION_STATE_FIELDS:
+                fields[field] = safe_json_loads(raw)
+
+        # Convert string dates back to datetime
+        for date_field in ['created_at', 'updated_at']:
+            if isinstance(fields[date_field], str):
+                fields[date_field] = datetime.fromisoformat(fields[date_field])
+
+        return SessionState(**fields)
+
     def _convert_enums_in_dict(self, d: Dict[str, Any]) -> Dict[str, Any]:
         """Convert enum values in a dictionary"""
         for k, v in d.items():
@@ -582,36 +683,39 @@ class SummaryMemory:
         self.redis = redis_client
         self.fallback_storage = {}
 
-    def store_turn(self, session_id: str, turn: ConversationTurn):
-        """Store turn and trigger summarization if needed"""
+    def store_turn(self, session_id: str, turn: ConversationTurn, pipe=None):
+        """Store turn and trigger summarization if needed (queued on ``pipe`` when given)"""
         try:
             # For now, just store key information
             # In production, would implement LLM-based summarization
-            key = f"summary:{session_id}"
-
             summary_data = {
                 'last_updated': turn.timestamp.isoformat(),
-                'total_interactions': self._increment_interaction_count(session_id),
                 'key_topics': self._extract_key_topics(turn),
                 'important_entities': self._extract_important_entities(turn)
             }
 
             if self.redis:
-                self.redis.setex(key, 86400, safe_json_dumps(summary_data))  # 24 hour expiration
+                # Hash fields + HINCRBY: the interaction count never has to be read back first
+                key = f"{SUMMARY_PREFIX}{session_id}"
+                writer = pipe if pipe is not None else self.redis.pipeline(transaction=True)
+                writer.hset(key, mapping={k: safe_json_dumps(v) for k, v in summary_data.items()})
+                writer.hincrby(key, 'total_interactions', 1)
+                writer.expire(key, 86400)  # 24 hour expiration
+                if pipe is None:
+                    writer.execute()
             else:
+                summary_data['total_interactions'] = self._increment_interaction_count(session_id)
                 self.fallback_storage[session_id] = summary_data
         except Exception as e:
             logger.error(f"❌ Failed to store in summary memory: {e}")
 
     def get_context(self, session_id: str) -> Dict[str, Any]:
         """Get conversation summary"""
-        key = f"summary:{session_id}"
-
         try:
             if self.redis:
-                summary_data = self.redis.get(key)
+                summary_data = self.redis.hgetall(f"{SUMMARY_PREFIX}{session_id}")
                 if summary_data:
-                    return safe_json_loads(summary_data)
+                    return self._decode_summary(summary_data)
             else:
                 return self.fallback_storage.get(session_id, {})
 
@@ -621,15 +725,27 @@ class SummaryMemory:
             logger.error(f"❌ Error getting summary context: {e}")
             return {'summary_available': False}
 
+    def queue_context_read(self, pipe, session_id: str):
+        """Queue the summary read on a shared pipeline"""
+        pipe.hgetall(f"{SUMMARY_PREFIX}{session_id}")
+
+    def context_from_raw(self, session_id: str, summary_data: Dict[str, str]) -> Tuple[Dict[str, Any], float]:
+        """Summary context and token estimate from a pipelined HGETALL result"""
+        if not summary_data:
+            return {'summary_available': False}, 0.0
+        tokens = sum(estimate_tokens(value) for value in summary_data.values())
+        return self._decode_summary(summary_data), tokens
+
+    @staticmethod
+    def _decode_summary(summary_data: Dict[str, str]) -> Dict[str, Any]:
+        """Decode the JSON-encoded fields of a stored summary hash"""
+        return {k: safe_json_loads(v) for k, v in summary_data.items()}
+
     def _increment_interaction_count(self, session_id: str) -> int:
-        """Increment and return interaction count"""
-        count_key = f"summary_count:{session_id}"
-        if self.redis:
-            return self.redis.incr(count_key)
-        else:
-            current_count = self.fallback_storage.get(f"{session_id}_count", 0)
-            self.fallback_storage[f"{session_id}_count"] = current_count + 1
-            return current_count + 1
+        """Increment and return the in-memory interaction count (Redis uses HINCRBY)"""
+        current_count = self.fallback_storage.get(f"{session_id}_count", 0)
+        self.fallback_storage[f"{session_id}_count"] = current_count + 1
+        return current_count + 1
 
     def _extract_key_topics(self, turn: ConversationTurn) -> List[str]:
         """Extract key topics from conversation turn"""
@@ -664,8 +780,9 @@ class SummaryMemory:
     def clear_session(self, session_id: str):
         """Clear summary memory"""
         if self.redis:
-            self.redis.delete(f"summary:{session_id}")
-            self.redis.delete(f"summary_count:{session_id}")
+            # Legacy JSON-string summary and counter keys included until they expire
+            self.redis.delete(f"{SUMMARY_PREFIX}{session_id}", f"summary:{session_id}",
+                              f"summary_count:{session_id}")
         else:
             self.fallback_storage.pop(session_id, None)
             self.fallback_storage.pop(f"{session_id}_count", None)
@@ -677,8 +794,8 @@ class SemanticMemory:
         self.redis = redis_client
         self.fallback_storage = {}
 
-    def store_turn(self, session_id: str, turn: ConversationTurn):
-        """Store semantic representation of turn"""
+    def store_turn(self, session_id: str, turn: ConversationTurn, pipe=None):
+        """Store semantic representation of turn (queued on ``pipe`` when given)"""
         try:
             # For now, store keyword-based semantic info
             # In production, would use vector embeddings
@@ -692,7 +809,7 @@ class SemanticMemory:
             key = f"semantic:{session_id}:{turn.turn_id}"
 
             if self.redis:
-                self.redis.setex(key, 3600, safe_json_dumps(semantic_data))
+                (pipe if pipe is not None else self.redis).setex(key, 3600, safe_json_dumps(semantic_data))
             else:
                 self.fallback_storage[f"{session_id}:{turn.turn_id}"] = semantic_data
         except Exception as e:
@@ -761,20 +878,28 @@ class SemanticMemory:
 class EntityMemory:
     """🏷️ Tracks entities mentioned in conversations (products, orders, etc.)"""
 
+    ENTITY_TYPES = ('product_info', 'delivery_address', 'payment_method', 'order_info')
+
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
         self.fallback_storage = {}
 
-    def store_turn(self, session_id: str, turn: ConversationTurn):
-        """Store entities from conversation turn"""
+    def store_turn(self, session_id: str, turn: ConversationTurn, pipe=None):
+        """Store entities from conversation turn (queued on ``pipe`` when given)"""
         try:
+            writer = pipe
+            if writer is None and self.redis:
+                writer = self.redis.pipeline(transaction=True)
             for entity_type, entity_data in turn.entities.items():
-                if entity_type in ['product_info', 'delivery_address', 'payment_method', 'order_info']:
-                    self._store_entity(session_id, entity_type, entity_data, turn.timestamp)
+                if entity_type in self.ENTITY_TYPES:
+                    self._store_entity(session_id, entity_type, entity_data, turn.timestamp, pipe=writer)
+            if pipe is None and writer is not None:
+                writer.execute()
         except Exception as e:
             logger.error(f"❌ Failed to store in entity memory: {e}")
 
-    def _store_entity(self, session_id: str, entity_type: str, entity_data: Any, timestamp: datetime):
+    def _store_entity(self, session_id: str, entity_type: str, entity_data: Any, timestamp: datetime,
+                      pipe=None):
         """Store individual entity"""
         try:
             key = f"entity:{session_id}:{entity_type}"
@@ -786,7 +911,8 @@ class EntityMemory:
             }
 
             if self.redis:
-                self.redis.setex(key, 7200, safe_json_dumps(entity_record))  # 2 hour expiration
+                writer = pipe if pipe is not None else self.redis
+                writer.setex(key, 7200, safe_json_dumps(entity_record))  # 2 hour expiration
             else:
                 self.fallback_storage[key] = entity_record
         except Exception as e:
@@ -816,9 +942,8 @@ class EntityMemory:
         """Get entity context"""
         try:
             entities = {}
-            entity_types = ['product_info', 'delivery_address', 'payment_method', 'order_info']
 
-            for entity_type in entity_types:
+            for entity_type in self.ENTITY_TYPES:
                 entity_data = self._get_entity(session_id, entity_type)
                 if entity_data:
                     entities[entity_type] = entity_data
@@ -832,6 +957,20 @@ class EntityMemory:
             logger.error(f"❌ Error getting entity context: {e}")
             return {'entities': {}, 'entity_count': 0}
 
+    def queue_context_read(self, pipe, session_id: str):
+        """Queue one MGET for every tracked entity type on a shared pipeline"""
+        pipe.mget([f"entity:{session_id}:{entity_type}" for entity_type in self.ENTITY_TYPES])
+
+    def context_from_raw(self, session_id: str, records: List[Optional[str]]) -> Tuple[Dict[str, Any], float]:
+        """Entity context and token estimate from a pipelined MGET result"""
+        entities, tokens = {}, 0.0
+        for entity_type, raw in zip(self.ENTITY_TYPES, records or []):
+            record = safe_json_loads(raw)
+            if record and record.get('data'):
+                entities[entity_type] = record['data']
+                tokens += estimate_tokens(raw)
+        return {'entities': entities, 'entity_count': len(entities)}, tokens
+
     def clear_session(self, session_id: str):
         """Clear entity memory"""
         if self.redis:
@@ -0,0 +1,212 @@
+"""
+👤 Customer Profile Cache for Recommendations
+===============================================================================
+
+Avoids rebuilding the same CustomerProfile (customer row + last 50 orders + Counter
+analysis) several times per request and on every recommendation call:
+1. Request scope: within one Flask request (or an explicit profile_request_scope())
+   a profile is built at most once and the same object is handed to every caller
+2. Shared tier: profiles are kept in Redis for a short TTL so all workers reuse them
+   (an in-process TTL map stands in when Redis is unavailable)
+3. Invalidation: OrderManagementSystem.create_order deletes the customer's Redis entry
+   (one DEL through its own client) after commit, so new orders show up in the next
+   recommendation; in-process fallback entries simply expire with the TTL
+"""
+
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+import sys
+from pathlib import Path
+
+try:
+    from flask import g, has_request_context
+    FLASK_AVAILABLE = True
+except ImportError:
+    g = None
+    has_request_context = None
+    FLASK_AVAILABLE = False
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_PROFILE_CACHE_TTL = safe_int_env('CUSTOMER_PROFILE_CACHE_TTL', 120)
+CUSTOMER_PROFILE_LOCAL_SIZE = safe_int_env('CUSTOMER_PROFILE_LOCAL_SIZE', 1024)
+CUSTOMER_PROFILE_PREFIX = "reco:profile:v1:"
+
+_request_profiles: contextvars.ContextVar = contextvars.ContextVar('customer_profiles', default=None)
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _json_object_hook(value: Dict) -> Any:
+    if len(value) == 1 and '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+
+def invalidate_customer_profile(redis_client, customer_id: int, reason: str = "") -> bool:
+    """Drop ``customer_id`` from the shared Redis tier (one DEL) and the current request's memo"""
+    memo = _request_memo()
+    if memo is not None:
+        memo.pop(customer_id, None)
+    if not redis_client:
+        return False
+    try:
+        redis_client.delete(CustomerProfileCache.make_key(customer_id))
+        logger.info(f"🔄 Customer profile {customer_id} invalidated{f' ({reason})' if reason else ''}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Customer profile cache invalidation failed: {e}")
+        return False
+
+
+@contextmanager
+def profile_request_scope():
+    """Memoise profiles for the duration of a unit of work outside a Flask request"""
+    token = _request_profiles.set({})
+    try:
+        yield
+    finally:
+        _request_profiles.reset(token)
+
+
+def _request_memo() -> Optional[Dict[int, Any]]:
+    """Per-request profile dict: flask.g inside a request, else the open profile_request_scope"""
+    if FLASK_AVAILABLE and has_request_context():
+        if not hasattr(g, 'customer_profiles'):
+            g.customer_profiles = {}
+        return g.customer_profiles
+    return _request_profiles.get()
+
+
+class CustomerProfileCache:
+    """Short-TTL CustomerProfile cache with request-scoped memoisation"""
+
+    def __init__(self, profile_type, redis_client=None, ttl: int = CUSTOMER_PROFILE_CACHE_TTL,
+                 max_local_entries: int = CUSTOMER_PROFILE_LOCAL_SIZE):
+        self.profile_type = profile_type
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'request_hits': 0,
+            'hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+            'redis_errors': 0,
+            'decode_errors': 0,
+        }
+
+    @staticmethod
+    def make_key(customer_id: int) -> str:
+        return f"{CUSTOMER_PROFILE_PREFIX}{customer_id}"
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _read_shared(self, customer_id: int):
+        if self.redis_client:
+            try:
+                raw = self.redis_client.get(self.make_key(customer_id))
+            except Exception as e:
+                self._count('redis_errors')
+                logger.warning(f"⚠️ Customer profile cache read failed: {e}")
+                return None
+            if not raw:
+                return None
+            try:
+                return self.profile_type(**json.loads(raw, object_hook=_json_object_hook))
+            except (ValueError, TypeError) as e:
+                # Corrupt entry or one written by an older CustomerProfile layout: rebuild it
+                self._count('decode_errors')
+                logger.warning(f"⚠️ Discarding unreadable cached profile for customer {customer_id}: {e}")
+                try:
+                    self.redis_client.delete(self.make_key(customer_id))
+                except Exception:
+                    self._count('redis_errors')
+                return None
+
+        with self._lock:
+            entry = self._local.get(customer_id)
+            if entry is None:
+                return None
+            expires_at, profile = entry
+            if expires_at < time.monotonic():
+                del self._local[customer_id]
+                return None
+            self._local.move_to_end(customer_id)
+            return profile
+
+    def _write_shared(self, customer_id: int, profile):
+        if self.redis_client:
+            try:
+                self.redis_client.setex(self.make_key(customer_id), self.ttl,
+                                        json.dumps(asdict(profile), default=_json_default))
+            except Exception as e:
+                self._count('redis_errors')
+                logger.warning(f"⚠️ Customer profile cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._local[customer_id] = (time.monotonic() + self.ttl, profile)
+            self._local.move_to_end(customer_id)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def get_or_load(self, customer_id: int, load: Callable[[int], Any]):
+        """Profile for ``customer_id`` from the request memo, the shared tier, or ``load``"""
+        memo = _request_memo()
+        if memo is not None and customer_id in memo:
+            self._count('request_hits')
+            return memo[customer_id]
+
+        profile = self._read_shared(customer_id)
+        if profile is not None:
+            self._count('hits')
+        else:
+            self._count('misses')
+            profile = load(customer_id)
+            self._write_shared(customer_id, profile)
+
+        if memo is not None:
+            memo[customer_id] = profile
+        return profile
+
+    def invalidate(self, customer_id: int, reason: str = ""):
+        """Forget ``customer_id`` everywhere, including the current request's memo"""
+        self._count('invalidations')
+        with self._lock:
+            self._local.pop(customer_id, None)
+        if not invalidate_customer_profile(self.redis_client, customer_id, reason) and self.redis_client:
+            self._count('redis_errors')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        lookups = stats['request_hits'] + stats['hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['request_hits'] + stats['hits']) / lookups, 4) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        stats['backend'] = 'redis' if self.redis_client else 'local'
+        return stats
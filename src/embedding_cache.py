@@ -0,0 +1,173 @@
+"""
+🧮 Embedding Cache for Query and Document Embeddings
+===============================================================================
+
+Content-addressed cache for Google text embeddings so repeated texts skip the API:
+1. Keys are SHA-256 of model + task type + text (stable across workers and restarts)
+2. Vectors are stored as raw float32 bytes (~4x smaller than JSON text)
+3. In-process LRU in front of Redis (shared across gunicorn workers)
+4. Hit/miss counters for monitoring
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_TTL = safe_int_env('EMBEDDING_CACHE_TTL', 7 * 24 * 3600)
+EMBEDDING_CACHE_LRU_SIZE = safe_int_env('EMBEDDING_CACHE_LRU_SIZE', 2048)
+EMBEDDING_CACHE_PREFIX = "emb:v1:"
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + Redis) cache for embedding vectors"""
+
+    def __init__(self, redis_client=None, ttl: int = EMBEDDING_CACHE_TTL,
+                 max_local_entries: int = EMBEDDING_CACHE_LRU_SIZE):
+        # Values are binary, so the client must be created with decode_responses=False
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'redis_errors': 0,
+        }
+
+    @staticmethod
+    def make_key(text: str, model: str, task_type: str = "") -> str:
+        """Content-addressed key; the model and task type change the vector so they are part of it"""
+        digest = hashlib.sha256(f"{model}\0{task_type}\0{text}".encode('utf-8')).hexdigest()
+        return EMBEDDING_CACHE_PREFIX + digest
+
+    def _remember_locally(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the cached embedding for ``key`` or None"""
+        with self._lock:
+            vector = self._local.get(key)
+            if vector is not None:
+                self._local.move_to_end(key)
+                self._stats['local_hits'] += 1
+                return vector.tolist()
+
+        if self.redis_client:
+            try:
+                raw = self.redis_client.get(key)
+            except Exception as e:
+                raw = None
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ Embedding cache Redis read failed: {e}")
+            if raw:
+                vector = np.frombuffer(raw, dtype=np.float32)
+                self._remember_locally(key, vector)
+                with self._lock:
+                    self._stats['redis_hits'] += 1
+                return vector.tolist()
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, embedding: List[float]):
+        """Store an embedding in both tiers"""
+        if not embedding:
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._remember_locally(key, vector)
+        with self._lock:
+            self._stats['stores'] += 1
+        if self.redis_client:
+            try:
+                self.redis_client.setex(key, self.ttl, vector.tobytes())
+            except Exception as e:
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ Embedding cache Redis write failed: {e}")
+
+    def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """Batch lookup: LRU first, then a single MGET for the rest (None for misses)"""
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        remote = []
+        with self._lock:
+            for position, key in enumerate(keys):
+                vector = self._local.get(key)
+                if vector is not None:
+                    self._local.move_to_end(key)
+                    self._stats['local_hits'] += 1
+                    results[position] = vector.tolist()
+                else:
+                    remote.append(position)
+
+        if remote and self.redis_client:
+            try:
+                raw_values = self.redis_client.mget([keys[position] for position in remote])
+            except Exception as e:
+                raw_values = [None] * len(remote)
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ Embedding cache Redis read failed: {e}")
+            for position, raw in zip(remote, raw_values):
+                if raw:
+                    vector = np.frombuffer(raw, dtype=np.float32)
+                    self._remember_locally(keys[position], vector)
+                    results[position] = vector.tolist()
+
+        redis_hits = sum(1 for position in remote if results[position] is not None)
+        with self._lock:
+            self._stats['redis_hits'] += redis_hits
+            self._stats['misses'] += len(remote) - redis_hits
+        return results
+
+    def set_many(self, keys: List[str], embeddings: List[List[float]]):
+        """Store several embeddings with one Redis round trip"""
+        vectors = [(key, np.asarray(embedding, dtype=np.float32))
+                   for key, embedding in zip(keys, embeddings) if embedding]
+        if not vectors:
+            return
+        for key, vector in vectors:
+            self._remember_locally(key, vector)
+        with self._lock:
+            self._stats['stores'] += len(vectors)
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, vector in vectors:
+                    pipe.setex(key, self.ttl, vector.tobytes())
+                pipe.execute()
+            except Exception as e:
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ Embedding cache Redis write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        hits = stats['local_hits'] + stats['redis_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        return stats
@@ -19,7 +19,7 @@ import os
 import json
 import logging
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 import re
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -33,10 +33,16 @@ from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 import decimal
 import time
 
+# Shared keyword index for intent routing (compiled once at import)
+try:
+    from .keyword_index import intent_keyword_index
+except ImportError:
+    from keyword_index import intent_keyword_index
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -255,14 +261,6 @@ class EnhancedDatabaseQuerying:
     }
 
     def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
         # Initialize Groq client
         # Clean the API key to remove any whitespace or newlines
         groq_api_key = os.getenv('GROQ_API_KEY', '').strip()
@@ -356,6 +354,23 @@ class EnhancedDatabaseQuerying:
         # 🔧 CRITICAL FIX: Initialize in-memory store for Redis fallback
         self._memory_store = {}
 
+        # 🗃️ Cache generated SQL so repeat questions skip the LLM round trip
+        try:
+            from .sql_query_cache import SQLQueryCache
+            self.sql_cache = SQLQueryCache(redis_client=self.redis_client)
+            logger.info("🗃️ SQL generation cache initialized")
+        except Exception as e:
+            logger.warning(f"⚠️ SQL generation cache unavailable: {e}")
+            self.sql_cache = None
+
+        # 📐 Pre-validated, parameterised SQL for the highest-traffic intents
+        try:
+            from .sql_templates import sql_template_registry
+            self.sql_templates = sql_template_registry
+        except Exception as e:
+            logger.warning(f"⚠️ SQL template library unavailable: {e}")
+            self.sql_templates = None
+
         logger.info("🚀 Enhanced Database Querying System initialized successfully")
 
     def _schedule_agent_memory_storage(self, user_query: str, session_context: Dict[str, Any], customer_id: int):
@@ -370,14 +385,10 @@ class EnhancedDatabaseQuerying:
 
             # Identify potential memories to store based on query patterns
             memories_to_store = []
-            query_lower = user_query.lower()
+            matched = intent_keyword_index.match(user_query.lower())
 
             # Store preferences mentioned in queries (more selective)
-            preference_patterns = [
-                'i prefer', 'my favorite', 'i always buy', 'i usually get',
-                'i like to order', 'i typically want', 'i love'
-            ]
-            if any(pattern in query_lower for pattern in preference_patterns):
+            if 'memory_preference' in matched:
                 memory_content = f"User preference: {user_query}"
                 memories_to_store.append({
                     'content': memory_content,
@@ -386,12 +397,8 @@ class EnhancedDatabaseQuerying:
                 })
 
             # Store product interests (balanced approach - not too restrictive)
-            interest_patterns = [
-                'want to buy', 'planning to purchase', 'interested in buying',
-                'looking to order', 'need to get urgently', 'i need', 'i want'
-            ]
             # Only store if it's a substantial query (not just "i want" or "i need")
-            if (any(pattern in query_lower for pattern in interest_patterns) and
+            if ('memory_interest' in matched and
                 len(user_query.strip()) > 8):  # At least 8 characters to avoid very short queries
                 memory_content = f"User showed interest: {user_query}"
                 memories_to_store.append({
@@ -401,7 +408,7 @@ class EnhancedDatabaseQuerying:
                 })
 
             # Store delivery preferences
-            if any(word in query_lower for word in ['delivery', 'shipping', 'address', 'location']):
+            if 'memory_delivery' in matched:
                 memory_content = f"User delivery preference/inquiry: {user_query}"
                 memories_to_store.append({
                     'content': memory_content,
@@ -410,7 +417,7 @@ class EnhancedDatabaseQuerying:
                 })
 
             # Store payment preferences
-            if any(word in query_lower for word in ['payment', 'pay', 'card', 'transfer', 'raqibtechpay']):
+            if 'memory_payment' in matched:
                 memory_content = f"User payment preference/inquiry: {user_query}"
                 memories_to_store.append({
                     'content': memory_content,
@@ -418,12 +425,12 @@ class EnhancedDatabaseQuerying:
                     'confidence': 0.8
                 })
 
-            # Store the memories asynchronously
+            # Queue the memories; the ingest worker embeds them in batches and schedules consolidation
             for memory in memories_to_store:
                 from .agent_memory_system import MemoryType
                 memory_type = MemoryType.EPISODIC if memory['type'] == 'episodic' else MemoryType.SEMANTIC
 
-                success = self.agent_memory.store_memory(
+                queued = self.agent_memory.enqueue_memory(
                     content=memory['content'],
                     memory_type=memory_type,
                     user_id=user_id,
@@ -431,12 +438,8 @@ class EnhancedDatabaseQuerying:
                     confidence_score=memory['confidence']
                 )
 
-                if success:
-                    logger.info(f"📝 Stored agent memory for user {user_id}: {memory['content'][:50]}...")
-
-            # Schedule memory consolidation for this user
-            if memories_to_store:
-                self.agent_memory.schedule_memory_consolidation(user_id)
+                if queued:
+                    logger.info(f"📝 Queued agent memory for user {user_id}: {memory['content'][:50]}...")
 
         except Exception as e:
             logger.error(f"❌ Error scheduling agent memory storage: {e}")
@@ -446,6 +449,7 @@ class EnhancedDatabaseQuerying:
         🎯 Enhanced query classification with cart operation detection
         """
         query_lower = user_query.lower()
+        matched = intent_keyword_index.match(query_lower)
 
         # 🔧 CRITICAL FIX: Handle order-related follow-up questions
         if conversation_history:
@@ -453,15 +457,7 @@ class EnhancedDatabaseQuerying:
             last_turn = conversation_history[0]
             if last_turn.get('query_type') == 'ORDER_ANALYTICS' or 'order' in last_turn.get('user_query', '').lower():
                 # Check if current query is asking about contents/items in the order
-                order_content_keywords = [
-                    'what are in', 'what is in', 'what\'s in', 'contents of', 'items in',
-                    'products in', 'food items', 'what did i order', 'what did i buy',
-                    'show me the items', 'list the items', 'what products',
-                    'what are the items', 'what items are', 'which products',
-                    'contents', 'what\'s inside', 'what am i getting'
-                ]
-
-                if any(keyword in query_lower for keyword in order_content_keywords):
+                if 'order_content' in matched:
                     logger.info(f"🎯 ORDER FOLLOW-UP DETECTED: User asking about order contents after order query")
 
                     # Initialize entities
@@ -546,51 +542,25 @@ class EnhancedDatabaseQuerying:
         }
 
         # 💰 REVENUE INSIGHTS KEYWORD-BASED DETECTION
-        revenue_keywords = [
-            'revenue', 'sales', 'profit', 'financial', 'performance',
-            'worst performing month', 'best performing month', 'top selling',
-            'highest sales', 'lowest sales', 'monthly sales'
-        ]
-        if any(keyword in query_lower for keyword in revenue_keywords):
+        if 'revenue_intent' in matched:
             logger.info("💰 Revenue-related keyword detected. Classifying as REVENUE_INSIGHTS.")
             entities['financial_query'] = True
             return QueryType.REVENUE_INSIGHTS, entities
 
         # 🛒 ENHANCED CART OPERATION DETECTION
-        cart_keywords = [
-            'add to cart', 'add to my cart', 'add item to cart',
-            'remove from cart', 'delete from cart', 'clear cart',
-            'view cart', 'show cart', 'cart contents', 'what\'s in my cart',
-            'update cart', 'modify cart', 'change quantity in cart'
-        ]
-
-        if any(keyword in query_lower for keyword in cart_keywords):
+        if 'cart_operation' in matched:
             logger.info(f"🛒 CART OPERATION DETECTED: Query should be handled by OrderAIAssistant, not SQL layer")
             entities['shopping_intent'] = True
             return QueryType.SHOPPING_CART, entities
 
         # 🛍️ Enhanced shopping intent detection
-        shopping_patterns = [
-            'i want to buy', 'i need to purchase', 'i\'d like to order',
-            'can i buy', 'how do i buy', 'purchase', 'order now',
-            'add this to', 'checkout', 'place order', 'buy this'
-        ]
-
-        if any(pattern in query_lower for pattern in shopping_patterns):
+        if 'shopping_intent' in matched:
             logger.info(f"🛍️ SHOPPING INTENT DETECTED: Should be handled by OrderAIAssistant")
             entities['shopping_intent'] = True
             return QueryType.ORDER_PLACEMENT, entities
 
         # 🆕 TIER BENEFIT QUERIES - Handle these specially (no database query needed)
-        tier_benefit_patterns = [
-            'benefits of', 'what are the benefits', 'tier benefits', 'gold tier benefits',
-            'silver tier benefits', 'bronze tier benefits', 'platinum tier benefits',
-            'what benefits', 'membership benefits', 'tier perks', 'account tier benefits',
-            'gold member benefits', 'silver member benefits', 'platinum member benefits',
-            'bronze member benefits', 'what do i get', 'tier advantages', 'membership perks'
-        ]
-
-        if any(pattern in query_lower for pattern in tier_benefit_patterns):
+        if 'tier_benefits' in matched:
             # Extract mentioned tier if any
             mentioned_tier = None
             tier_keywords = ['bronze', 'silver', 'gold', 'platinum']
@@ -607,12 +577,7 @@ class EnhancedDatabaseQuerying:
             }
 
         # 🆕 CUSTOMER SUPPORT CONTACT QUERIES - Handle these specially
-        if any(phrase in query_lower for phrase in [
-            'contact customer support', 'customer support contact', 'support contact',
-            'how to contact support', 'customer service contact', 'support phone',
-            'support email', 'how to reach support', 'customer care contact',
-            'help desk contact', 'technical support contact'
-        ]):
+        if 'support_contact_request' in matched:
             return QueryType.GENERAL_CONVERSATION, {
                 'intent': 'customer_support_contact_request',
                 'contact_type': 'support_team',
@@ -682,8 +647,7 @@ Classify this query and extract relevant entities. Return JSON format:
         # 🔧 CRITICAL FIX: Conversation context extraction for customer support
         if conversation_history:
             # 🆕 ENHANCED CONTEXT EXTRACTION: Check for contextual references first
-            contextual_references = ['their', 'them', 'they', 'those customers', 'these customers', 'the customers', 'those', 'these', 'too', 'also']
-            is_contextual_query = any(ref in query_lower for ref in contextual_references)
+            is_contextual_query = 'contextual_reference' in matched
 
             if is_contextual_query:
                 logger.info(f"🔍 CONTEXTUAL REFERENCE DETECTED in query: {user_query}")
@@ -762,24 +726,24 @@ Classify this query and extract relevant entities. Return JSON format:
             logger.info(f"🔍 Order history query detected - will lookup customer_id for order_id: {entities['order_id']}")
 
         # Classify query type based on keywords - PRIORITIZE CUSTOMER_SUPPORT over CUSTOMER_ANALYSIS
-        if any(keyword in query_lower for keyword in ['order', 'orders', 'purchase', 'transaction', 'history', 'delivery', 'track', 'tracking', 'where is', 'status', 'shipped', 'shipping']):
+        if 'route_order' in matched:
             return QueryType.ORDER_ANALYTICS, entities
 
         # 🆕 NEW: Customer support queries (support agents asking about customer details for support)
-        elif any(keyword in query_lower for keyword in ['name of', 'customer name', 'customer details', 'payment method', 'contact information', 'address', 'phone number', 'email', 'account information', 'customer info', 'profile details', 'who is', 'customer profile', 'this customer', 'what payment', 'which customer', 'customer use', 'account tier', 'tier', 'when did', 'joined', 'products has', 'purchase history', 'buying history', 'my account', 'my tier', 'my spending', 'my profile', 'my details', 'my information', 'my orders', 'how much have i', 'total i spent', 'what i bought', 'my purchases', 'update my', 'change my', 'modify my']):
+        elif 'route_customer_support' in matched:
             return QueryType.CUSTOMER_SUPPORT, entities
 
-        elif any(keyword in query_lower for keyword in ['customer', 'customers', 'profile', 'account']):
+        elif 'route_customer' in matched:
             # Removed business analytics bypass - now handled by RBAC
-            if any(keyword in query_lower for keyword in ['where', 'from', 'in', 'state', 'location']):
+            if 'route_geographic' in matched:
                 return QueryType.GEOGRAPHIC_ANALYSIS, entities
             else:
                 return QueryType.CUSTOMER_ANALYSIS, entities
 
-        elif any(keyword in query_lower for keyword in ['revenue', 'sales', 'money', 'naira', '₦', 'income', 'spent', 'spending', 'spend', 'total spent', 'how much', 'breakdown', 'calculation', 'calculate', 'are you sure', 'verify', 'double check', 'give me the details', 'details', 'confirm']):
+        elif 'route_revenue' in matched:
             return QueryType.REVENUE_INSIGHTS, entities
 
-        elif any(keyword in query_lower for keyword in ['product', 'category', 'item', 'goods']) or entities.get('product_categories') or entities.get('brands') or entities.get('product_keywords'):
+        elif 'route_product' in matched or entities.get('product_categories') or entities.get('brands') or entities.get('product_keywords'):
             # 🆕 Enhanced product query detection
             if entities.get('price_query'):
                 return QueryType.PRODUCT_PERFORMANCE, entities  # Price-related product queries
@@ -788,27 +752,27 @@ Classify this query and extract relevant entities. Return JSON format:
             else:
                 return QueryType.PRODUCT_PERFORMANCE, entities  # General product queries
 
-        elif any(keyword in query_lower for keyword in ['time', 'date', 'period', 'trend', 'monthly', 'weekly']):
+        elif 'route_temporal' in matched:
             return QueryType.TEMPORAL_ANALYSIS, entities
 
         # 🆕 Additional product-specific classifications
-        elif any(keyword in query_lower for keyword in ['phone', 'laptop', 'computer', 'tv', 'electronics']):
+        elif 'category_electronics' in matched:
             entities['product_categories'].append('Electronics')
             return QueryType.PRODUCT_PERFORMANCE, entities
 
-        elif any(keyword in query_lower for keyword in ['dress', 'clothes', 'fashion', 'shoe', 'bag']):
+        elif 'category_fashion' in matched:
             entities['product_categories'].append('Fashion')
             return QueryType.PRODUCT_PERFORMANCE, entities
 
-        elif any(keyword in query_lower for keyword in ['beauty', 'cosmetics', 'makeup', 'cream', 'soap']):
+        elif 'category_beauty' in matched:
             entities['product_categories'].append('Beauty')
             return QueryType.PRODUCT_PERFORMANCE, entities
 
-        elif any(keyword in query_lower for keyword in ['book', 'novel', 'textbook', 'reading']):
+        elif 'category_books' in matched:
             entities['product_categories'].append('Books')
             return QueryType.PRODUCT_PERFORMANCE, entities
 
-        elif any(keyword in query_lower for keyword in ['car', 'auto', 'automotive', 'battery', 'tire', 'tires', 'engine']):
+        elif 'category_automotive' in matched:
             entities['product_categories'].append('Automotive')
             return QueryType.PRODUCT_PERFORMANCE, entities
 
@@ -845,6 +809,15 @@ Classify this query and extract relevant entities. Return JSON format:
                       AND (o.order_status != 'Returned' OR o.order_status IS NULL)
                       GROUP BY c.account_tier;"""
 
+        # 🗃️ Serve repeat questions from the SQL generation cache
+        sql_cache_key = None
+        if self.sql_cache:
+            sql_cache_key = self.sql_cache.make_key(user_query, query_type, entities)
+            cached_sql = self.sql_cache.get(sql_cache_key)
+            if cached_sql:
+                logger.info(f"🗃️ SQL cache hit: {cached_sql}")
+                return cached_sql
+
         # Get current Nigerian time context
         time_context = self.ni_intelligence.get_nigerian_timezone_context()
 
@@ -1239,6 +1212,9 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             # 🔧 CRITICAL: Add SQL syntax validation and correction
             sql_query = self._validate_and_fix_sql_syntax(sql_query, entities)
 
+            if sql_cache_key:
+                self.sql_cache.set(sql_cache_key, sql_query)
+
             logger.info(f"🔍 Generated SQL: {sql_query}")
             return sql_query
 
@@ -1753,10 +1729,10 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             return "SELECT 'Fallback query executed' as message;"
 
     def get_database_connection(self):
-        """Get database connection with comprehensive error handling"""
+        """Get a pooled database connection with comprehensive error handling"""
         try:
-            conn = psycopg2.connect(**self.db_config)
-            app_logger.info("✅ Database connection established")
+            conn = get_pooled_connection()
+            app_logger.debug("✅ Database connection checked out of pool")
             return conn
         except psycopg2.OperationalError as oe:
             app_logger.error(f"❌ Database operational error: {oe}")
@@ -1768,9 +1744,10 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             app_logger.error(f"❌ Unexpected database connection error: {e}")
             raise Exception(f"Database connection error: {e}")
 
-    def execute_sql_query(self, sql_query: str, max_retries: int = 3) -> Tuple[bool, List[Dict], str]:
+    def execute_sql_query(self, sql_query: str, max_retries: int = 3, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, List[Dict], str]:
         """
         Execute SQL query with comprehensive error handling and retry logic
+        Pass ``params`` to bind values for ``%(name)s`` placeholders (SQL templates)
         Returns: (success, results, error_message)
         """
         for attempt in range(max_retries):
@@ -1780,7 +1757,7 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
                         app_logger.info(f"🔍 Executing query: {sql_query}")
 
                         try:
-                            cursor.execute(sql_query)
+                            cursor.execute(sql_query, params)
 
                             # 🔧 CRITICAL FIX: Handle different types of SQL queries
                             if sql_query.strip().upper().startswith(('UPDATE', 'DELETE', 'INSERT')):
@@ -2339,10 +2316,10 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             'empathy_needed': False
         }
 
-        query_lower = user_query.lower()
+        matched = intent_keyword_index.match(user_query.lower())
 
         # Frustrated/Angry indicators
-        if any(word in query_lower for word in ['urgent', 'frustrated', 'angry', 'annoyed', 'terrible', 'awful', 'hate', 'worst', 'stupid', 'ridiculous']):
+        if 'sentiment_frustrated' in matched:
             sentiment_data.update({
                 'emotion': 'frustrated',
                 'intensity': 'high',
@@ -2351,7 +2328,7 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             })
 
         # Worried/Anxious indicators
-        elif any(word in query_lower for word in ['worried', 'anxious', 'concerned', 'scared', 'nervous', 'help me', 'please help', 'urgent']):
+        elif 'sentiment_worried' in matched:
             sentiment_data.update({
                 'emotion': 'worried',
                 'intensity': 'high',
@@ -2360,7 +2337,7 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             })
 
         # Confused indicators
-        elif any(word in query_lower for word in ['confused', 'don\'t understand', 'unclear', 'lost', 'what does', 'how do']):
+        elif 'sentiment_confused' in matched:
             sentiment_data.update({
                 'emotion': 'confused',
                 'intensity': 'medium',
@@ -2369,7 +2346,7 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             })
 
         # Happy/Positive indicators
-        elif any(word in query_lower for word in ['thank', 'thanks', 'great', 'awesome', 'wonderful', 'perfect', 'love', 'amazing']):
+        elif 'sentiment_happy' in matched:
             sentiment_data.update({
                 'emotion': 'happy',
                 'intensity': 'medium',
@@ -2378,7 +2355,7 @@ RESPONSE FORMAT: Return ONLY the SQL query, nothing else."""
             })
 
         # Impatient indicators
-        elif any(word in query_lower for word in ['still waiting', 'taking too long', 'when will', 'hurry', 'asap', 'immediately']):
+        elif 'sentiment_impatient' in matched:
             sentiment_data.update({
                 'emotion': 'impatient',
                 'intensity': 'high',
@@ -2456,8 +2433,13 @@ RESPONSE STYLE:
 - End positively: "Hope this helps! ✨"
 """
 
-    def generate_nigerian_response(self, query_context: QueryContext, conversation_history: List[Dict] = None, session_context: Dict[str, Any] = None) -> str:
-        """🇳🇬 Generate Nigerian-style empathetic response with intelligent recommendations"""
+    def generate_nigerian_response(self, query_context: QueryContext, conversation_history: List[Dict] = None, session_context: Dict[str, Any] = None,
+                                   on_token: Optional[Callable[[str], None]] = None) -> str:
+        """🇳🇬 Generate Nigerian-style empathetic response with intelligent recommendations
+
+        When ``on_token`` is given the completion is streamed and each cleaned chunk is passed
+        to it as soon as it is safe to display; the full response is still returned.
+        """
 
         # 🚨 CRITICAL ERROR HANDLING: Check for processing errors first
         if query_context.error_message:
@@ -2760,15 +2742,19 @@ RESPONSE STYLE:
                         {"role": "user", "content": response_content}
                     ],
                     temperature=0.7,
-                    max_tokens=2000
+                    max_tokens=2000,
+                    stream=on_token is not None
                 )
+                if on_token is not None:
+                    from .response_streaming import relay_completion_stream
+                    ai_response, _ = relay_completion_stream(response, on_token)
+                else:
+                    ai_response = response.choices[0].message.content.strip()
             except Exception as e:
                 logger.error(f"❌ Groq API error in response generation: {e}")
                 # Return a fallback response
                 return self._get_fallback_emotional_response(query_context, sentiment_data)
 
-            ai_response = response.choices[0].message.content.strip()
-
             # 🔧 Strip markdown formatting while keeping emojis
             ai_response = self._strip_markdown_formatting(ai_response)
 
@@ -2779,9 +2765,12 @@ RESPONSE STYLE:
             # This prevents AI from suggesting fake products when no results found
             if (recommendations_data and recommendations_data.get('success') and
                 recommendations_data.get('recommendations') and len(query_context.execution_result) > 0):
+                base_response = ai_response
                 ai_response = self._enhance_response_with_recommendations(ai_response, recommendations_data)
                 # Strip markdown again after enhancement
                 ai_response = self._strip_markdown_formatting(ai_response)
+                if on_token is not None and ai_response.startswith(base_response) and len(ai_response) > len(base_response):
+                    on_token(ai_response[len(base_response):])
 
             return ai_response
 
@@ -3360,84 +3349,17 @@ How can I help you with your raqibtech.com experience today? 🌟"""
         """
         🎯 Determine if the user query is within customer support scope
         Returns True if within scope, False if out of scope
+        Keyword lists live in keyword_index.INTENT_KEYWORDS ('in_scope' / 'out_of_scope')
         """
-        query_lower = user_query.lower()
+        matched = intent_keyword_index.match(user_query.lower())
 
         # 🔥 CUSTOMER SUPPORT KEYWORDS (HIGH PRIORITY - IN SCOPE)
-        high_priority_keywords = [
-            # Order related (ALWAYS in scope)
-            'order', 'orders', 'delivery', 'track', 'tracking', 'shipped', 'shipping',
-            'when', 'where', 'status', 'expected', 'arrive', 'delivered', 'package',
-            'my order', 'order status', 'delivery status', 'order history',
-
-            # Account related (ALWAYS in scope)
-            'account', 'profile', 'login', 'password', 'settings', 'tier',
-            'my account', 'account settings',
-
-            # Payment related (ALWAYS in scope)
-            'payment', 'pay', 'billing', 'card', 'bank transfer', 'refund',
-            'payment method', 'checkout',
-
-            # Platform specific (ALWAYS in scope)
-            'raqibtech', 'raqibtechpay', 'customer service', 'customer support',
-            'help', 'support', 'contact', 'assistance',
-
-            # Shopping related (ALWAYS in scope)
-            'product', 'buy', 'purchase', 'cart', 'shopping', 'recommendation',
-
-            # 🆕 Product catalog related (ALWAYS in scope)
-            'product', 'products', 'item', 'items', 'goods', 'catalog', 'inventory',
-            'price', 'prices', 'cost', 'naira', '₦', 'cheap', 'expensive', 'budget',
-            'stock', 'available', 'availability', 'out of stock', 'in stock',
-            'category', 'categories', 'brand', 'brands',
-
-            # 🆕 Specific product types (ALWAYS in scope)
-            'phone', 'smartphone', 'laptop', 'computer', 'tv', 'electronics',
-            'dress', 'clothes', 'fashion', 'shoe', 'shoes', 'bag', 'bags',
-            'beauty', 'cosmetics', 'makeup', 'cream', 'soap', 'skincare',
-            'book', 'books', 'novel', 'textbook', 'reading',
-            'car', 'auto', 'automotive', 'battery', 'tire', 'tires', 'engine',
-
-            # 🆕 Brand names (ALWAYS in scope)
-            'samsung', 'apple', 'iphone', 'tecno', 'infinix', 'lg', 'sony',
-            'nike', 'adidas', 'zara', 'mac', 'maybelline', 'hp', 'dell'
-        ]
-
-        # Check for high priority keywords first
-        for keyword in high_priority_keywords:
-            if keyword in query_lower:
-                return True
+        if 'in_scope' in matched:
+            return True
 
         # 🚫 CLEARLY OUT-OF-SCOPE PATTERNS (Only reject obvious non-platform queries)
-        obvious_out_of_scope = [
-            # Politics and current affairs
-            'president of nigeria', 'governor of', 'minister of', 'election',
-            'political party', 'government policy',
-
-            # Entertainment
-            'latest movie', 'celebrity news', 'sports score', 'football match',
-            'movie recommendation', 'song lyrics',
-
-            # Academic/Educational (unless related to platform)
-            'homework help', 'solve equation', 'chemistry formula', 'physics problem',
-            'university admission', 'exam questions',
-
-            # Health and medical
-            'medical advice', 'health symptoms', 'disease', 'medication',
-            'doctor recommendation',
-
-            # Financial advice (not payment related)
-            'stock market', 'investment advice', 'cryptocurrency', 'forex trading',
-
-            # Programming (unless platform related)
-            'python tutorial', 'javascript help', 'coding problem',
-            'programming language'
-        ]
-
-        # Only reject if it clearly matches out-of-scope patterns
-        for pattern in obvious_out_of_scope:
-            if pattern in query_lower:
-                return False
+        if 'out_of_scope' in matched:
+            return False
 
         # 🎯 DEFAULT: If in doubt, ALLOW IT (customer-friendly approach)
         # Better to occasionally help with borderline questions than reject valid ones
@@ -3485,10 +3407,12 @@ How can I help you with your raqibtech.com experience today? 🌟"""
         # Strip markdown formatting from the response
         return self._strip_markdown_formatting(response)
 
-    def process_enhanced_query(self, user_query: str, session_context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def process_enhanced_query(self, user_query: str, session_context: Dict[str, Any] = None,
+                               on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         🚀 Main pipeline method that orchestrates the entire enhanced query process
         Returns a comprehensive result dictionary for the Flask API
+        Pass ``on_token`` to receive the generated response chunk by chunk while it streams
         """
         start_time = time.time()
         logger.info(f"👤 USER: {user_query}")
@@ -3509,15 +3433,9 @@ How can I help you with your raqibtech.com experience today? 🌟"""
         try:
             # 🆕 EARLY DETECTION: Customer Support Contact Requests
             user_query_lower = user_query.lower()
-            support_contact_keywords = [
-                'contact customer support', 'customer support contact', 'support contact',
-                'how to contact support', 'customer service contact', 'support phone',
-                'support email', 'how to reach support', 'customer care contact',
-                'help desk contact', 'technical support contact', 'customer support number',
-                'support team contact', 'customer service number', 'support hotline'
-            ]
-
-            if any(keyword in user_query_lower for keyword in support_contact_keywords):
+            matched = intent_keyword_index.match(user_query_lower)
+
+            if 'support_contact' in matched:
                 logger.info(f"🔒 PRIVACY PROTECTION: Customer support contact request detected, bypassing database query")
 
                 response_text = self.generate_customer_support_contact_response(user_query)
@@ -3540,15 +3458,7 @@ How can I help you with your raqibtech.com experience today? 🌟"""
                 }
 
             # 🆕 EARLY DETECTION: Tier Benefit Queries
-            tier_benefit_patterns = [
-                'benefits of', 'what are the benefits', 'tier benefits', 'gold tier benefits',
-                'silver tier benefits', 'bronze tier benefits', 'platinum tier benefits',
-                'what benefits', 'membership benefits', 'tier perks', 'account tier benefits',
-                'gold member benefits', 'silver member benefits', 'platinum member benefits',
-                'bronze member benefits', 'what do i get', 'tier advantages', 'membership perks'
-            ]
-
-            if any(pattern in user_query_lower for pattern in tier_benefit_patterns):
+            if 'tier_benefits' in matched:
                 logger.info(f"🏆 TIER BENEFITS QUERY DETECTED: Providing built-in tier information")
 
                 # Extract mentioned tier if any
@@ -3597,30 +3507,11 @@ How can I help you with your raqibtech.com experience today? 🌟"""
             logger.info(f"🔍 Shopping check: order_ai_assistant_instance_exists={bool(self.order_ai_assistant)}, session_context_provided={bool(session_context)}, user_is_authenticated={session_context.get('user_authenticated') if session_context else False}")
 
             # 🔧 CRITICAL FIX: Check for analytics/cross-customer queries BEFORE shopping intent detection
-            analytics_keywords = [
-                'revenue', 'business analytics', 'top customers', 'top spending',
-                'customer rankings', 'sales data', 'platform statistics', 'total revenue',
-                'business performance', 'analytics', 'top customer', 'highest spending',
-                'revenue report', 'sales report', 'business insights', 'best customers',
-                'worst customers', 'customers from', 'which customers', 'customers in',
-                'customers who', 'customer spending', 'customers with',
-                'most profitable', 'least profitable', 'customer behavior', 'customer segments',
-                'cross customer', 'other customers', 'all customers', 'compare customers',
-                'customer comparison', 'customer analytics', 'customer metrics'
-            ]
-
-            is_analytics_query = any(keyword in user_query.lower() for keyword in analytics_keywords)
+            is_analytics_query = 'analytics' in matched
 
             # 🔧 CRITICAL FIX: Check for spending/financial queries BEFORE shopping intent detection
-            spending_keywords = ['spent', 'spending', 'spend', 'total spent', 'how much', 'breakdown', 'calculation', 'calculate', 'are you sure', 'verify', 'double check', 'give me the details', 'confirm', 'revenue', 'sales', 'money', 'naira', '₦']
-            is_spending_query = any(keyword in user_query.lower() for keyword in spending_keywords)
-
-            # 🔧 CRITICAL FIX: Exclude cart-related queries from spending detection
-            cart_related_words = ['cart', 'shopping', 'checkout', 'order', 'delivery', 'product', 'item']
-            has_cart_context = any(cart_word in user_query.lower() for cart_word in cart_related_words)
-
             # Only treat as spending query if spending keywords found AND no cart context
-            is_spending_query = any(keyword in user_query.lower() for keyword in spending_keywords) and not has_cart_context
+            is_spending_query = 'spending' in matched and 'cart_context' not in matched
 
             if is_spending_query or is_analytics_query:
                 if is_spending_query:
@@ -3649,8 +3540,7 @@ How can I help you with your raqibtech.com experience today? 🌟"""
                     is_potentially_shopping_action = intent_from_parser in shopping_related_intents
 
                     # 🔧 CRITICAL FIX: Exclude queries asking about multiple customers from shopping actions
-                    cross_customer_indicators = ['customers', 'which customers', 'customers from', 'customers in', 'customers who', 'customers with']
-                    is_cross_customer_query = any(indicator in user_query.lower() for indicator in cross_customer_indicators)
+                    is_cross_customer_query = 'cross_customer' in matched
 
                     if is_cross_customer_query:
                         is_potentially_shopping_action = False
@@ -3833,7 +3723,7 @@ How can I help you with your raqibtech.com experience today? 🌟"""
                     user_role = UserRole.GUEST
 
             # 🛡️ RBAC: Block unauthorized access to business analytics (using keywords from earlier detection)
-            # Note: analytics_keywords already defined earlier for pre-shopping detection
+            # Note: is_analytics_query comes from the keyword index match made before shopping detection
 
             if is_analytics_query and not can_access_analytics:
                 logger.warning(f"🚫 RBAC BLOCKED: {user_role.value} attempted to access business analytics")
@@ -3904,9 +3794,19 @@ How can I help you with your raqibtech.com experience today? 🌟"""
 
             logger.info(f"🔐 ACCESS GRANTED: Role '{user_role.value}' authorized for '{query_type.value}' query")
 
-            # Generate and execute SQL query
-            sql_query = self.generate_sql_query(user_query, query_type, entities)
-            success, results, error_message = self.execute_sql_query(sql_query)
+            # Generate and execute SQL query - parameterised templates first, LLM generation otherwise
+            template_match = self.sql_templates.match(user_query, query_type, entities) if self.sql_templates else None
+            if template_match:
+                sql_query, sql_params, template_name = template_match
+                logger.info(f"📐 SQL template '{template_name}' matched for {query_type.value} - skipping LLM generation")
+                success, results, error_message = self.execute_sql_query(sql_query, params=sql_params)
+            else:
+                sql_query = self.generate_sql_query(user_query, query_type, entities)
+                success, results, error_message = self.execute_sql_query(sql_query)
+
+            if not success and not template_match and self.sql_cache:
+                # Never serve SQL that failed to execute to the next asker
+                self.sql_cache.invalidate(self.sql_cache.make_key(user_query, query_type, entities))
 
             if success:
                 # Create query context
@@ -3988,7 +3888,7 @@ How can I help you with your raqibtech.com experience today? 🌟"""
                         logger.warning(f"⚠️ Failed to update session state with product context: {e_session_update}")
 
                 # Generate enhanced response
-                response_text = self.generate_nigerian_response(query_context, conversation_history, session_context)
+                response_text = self.generate_nigerian_response(query_context, conversation_history, session_context, on_token=on_token)
                 query_context.response = response_text
 
                 # Store conversation
@@ -27,6 +27,11 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+try:
+    from .pattern_registry import PatternRegistry
+except ImportError:
+    from pattern_registry import PatternRegistry
+
 logger = logging.getLogger(__name__)
 
 class ShoppingIntent(Enum):
@@ -65,6 +70,7 @@ class EnhancedOrderPatterns:
         # Initialize pattern dictionaries
         self.exact_patterns = self._build_exact_patterns()
         self.regex_patterns = self._build_regex_patterns()
+        self.regex_registry = self._compile_regex_patterns(self.regex_patterns)
         self.context_patterns = self._build_context_patterns()
         self.product_keywords = self._build_product_keywords()
         self.action_verbs = self._build_action_verbs()
@@ -169,6 +175,14 @@ class EnhancedOrderPatterns:
             ]
         }
 
+    def _compile_regex_patterns(self, regex_patterns: Dict[ShoppingIntent, List[str]]) -> PatternRegistry:
+        """Compile the regex patterns once, as a single tier kept in intent order"""
+        registry = PatternRegistry('enhanced_order_patterns', flags=re.IGNORECASE)
+        for intent, patterns in regex_patterns.items():
+            for index, pattern in enumerate(patterns):
+                registry.register('regex', pattern, intent, name=f"{intent.value}[{index}]")
+        return registry
+
     def _build_context_patterns(self) -> Dict[str, ShoppingIntent]:
         """Build context-aware patterns"""
         return {
@@ -292,18 +306,17 @@ class EnhancedOrderPatterns:
 
     def _match_regex_patterns(self, user_message: str) -> PatternMatch:
         """Match regex patterns"""
-        for intent, patterns in self.regex_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, user_message, re.IGNORECASE)
-                if match:
-                    entities = {"regex_groups": match.groups()} if match.groups() else {}
-                    return PatternMatch(
-                        intent=intent,
-                        confidence=0.85,
-                        matched_pattern=pattern,
-                        extracted_entities=entities,
-                        trigger_words=[match.group(0)]
-                    )
+        regex_match = self.regex_registry.search('regex', user_message)
+        if regex_match:
+            registered, match = regex_match
+            entities = {"regex_groups": match.groups()} if match.groups() else {}
+            return PatternMatch(
+                intent=registered.intent,
+                confidence=0.85,
+                matched_pattern=registered.pattern,
+                extracted_entities=entities,
+                trigger_words=[match.group(0)]
+            )
 
         return PatternMatch(
             intent=ShoppingIntent.GENERAL_SHOPPING,
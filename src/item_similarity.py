@@ -0,0 +1,270 @@
+"""
+🤝 Item-Item Similarity Model for Collaborative Filtering
+===============================================================================
+
+Precomputed "customers who bought X also bought Y" neighbours:
+1. Distinct (customer, product) purchases form a sparse binary customer x product matrix
+2. Item-item cosine similarity = co-purchases / sqrt(buyers(i) * buyers(j)), top-K kept per product
+3. The model is saved as .npy arrays and memory-mapped, so every gunicorn worker shares
+   one copy through the page cache; rebuilds publish a new version atomically
+4. A "for you" list sums the neighbour scores of the customer's purchased products
+   (vectorised numpy, no database round trip)
+
+Rebuild periodically with scripts/build_item_similarity.py.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import sys
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    sparse = None
+    SCIPY_AVAILABLE = False
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env, safe_str_env
+
+logger = logging.getLogger(__name__)
+
+ITEM_SIMILARITY_DIR = safe_str_env('ITEM_SIMILARITY_DIR', '.item_similarity')
+ITEM_SIMILARITY_TOP_K = safe_int_env('ITEM_SIMILARITY_TOP_K', 50)
+# Products bought by fewer customers than this get no neighbours (too noisy)
+ITEM_SIMILARITY_MIN_BUYERS = safe_int_env('ITEM_SIMILARITY_MIN_BUYERS', 1)
+# How often a worker checks whether a newer model was published
+ITEM_SIMILARITY_RELOAD_INTERVAL = safe_int_env('ITEM_SIMILARITY_RELOAD_INTERVAL', 60)
+ITEM_SIMILARITY_KEEP_VERSIONS = 2
+
+CURRENT_FILE = "CURRENT"
+_ARRAYS = ('product_ids', 'neighbors', 'scores')
+
+
+def _top_k(candidates: np.ndarray, similarities: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if len(candidates) > top_k:
+        keep = np.argpartition(-similarities, top_k - 1)[:top_k]
+        candidates, similarities = candidates[keep], similarities[keep]
+    order = np.argsort(-similarities, kind='stable')
+    return candidates[order], similarities[order]
+
+
+def compute_item_neighbors(customer_ids: np.ndarray, product_ids: np.ndarray,
+                           top_k: int = ITEM_SIMILARITY_TOP_K,
+                           min_buyers: int = ITEM_SIMILARITY_MIN_BUYERS) -> Dict[str, np.ndarray]:
+    """
+    Top-K cosine neighbours from parallel arrays of purchases (duplicates are ignored).
+    Returns product_ids (sorted), neighbors (row indices into product_ids, -1 = empty)
+    and scores, both shaped (n_products, top_k).
+    """
+    customer_ids = np.asarray(customer_ids, dtype=np.int64)
+    product_ids = np.asarray(product_ids, dtype=np.int64)
+    pairs = np.unique(np.stack([customer_ids, product_ids], axis=1), axis=0) if len(customer_ids) else \
+        np.zeros((0, 2), dtype=np.int64)
+
+    item_ids, item_rows = np.unique(pairs[:, 1], return_inverse=True)
+    _, user_rows = np.unique(pairs[:, 0], return_inverse=True)
+    n_items = len(item_ids)
+    neighbors = np.full((n_items, top_k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, top_k), dtype=np.float32)
+    if not n_items:
+        return {'product_ids': item_ids, 'neighbors': neighbors, 'scores': scores}
+
+    buyers = np.bincount(item_rows, minlength=n_items).astype(np.float32)
+    norms = np.sqrt(buyers)
+
+    if SCIPY_AVAILABLE:
+        matrix = sparse.csr_matrix((np.ones(len(pairs), dtype=np.float32), (user_rows, item_rows)),
+                                   shape=(int(user_rows.max()) + 1, n_items))
+        cooccurrence = (matrix.T @ matrix).tocsr()
+        for item in range(n_items):
+            if buyers[item] < min_buyers:
+                continue
+            start, end = cooccurrence.indptr[item], cooccurrence.indptr[item + 1]
+            candidates = cooccurrence.indices[start:end]
+            counts = cooccurrence.data[start:end]
+            mask = candidates != item
+            candidates, similarities = _top_k(candidates[mask],
+                                              counts[mask] / (norms[item] * norms[candidates[mask]]), top_k)
+            neighbors[item, :len(candidates)] = candidates
+            scores[item, :len(candidates)] = similarities
+    else:
+        # CSR layouts in both directions: item -> buyers and buyer -> items
+        by_item = np.argsort(item_rows, kind='stable')
+        item_users = user_rows[by_item]
+        item_ptr = np.concatenate([[0], np.cumsum(buyers.astype(np.int64))])
+        by_user = np.argsort(user_rows, kind='stable')
+        user_items = item_rows[by_user]
+        user_ptr = np.concatenate([[0], np.cumsum(np.bincount(user_rows))])
+
+        for item in range(n_items):
+            if buyers[item] < min_buyers:
+                continue
+            users = item_users[item_ptr[item]:item_ptr[item + 1]]
+            co_bought = np.concatenate([user_items[user_ptr[user]:user_ptr[user + 1]] for user in users])
+            candidates, counts = np.unique(co_bought[co_bought != item], return_counts=True)
+            candidates, similarities = _top_k(candidates, counts / (norms[item] * norms[candidates]), top_k)
+            neighbors[item, :len(candidates)] = candidates
+            scores[item, :len(candidates)] = similarities
+
+    return {'product_ids': item_ids, 'neighbors': neighbors, 'scores': scores}
+
+
+def build_item_similarity_model(db_manager, model_dir: str = ITEM_SIMILARITY_DIR,
+                                top_k: int = ITEM_SIMILARITY_TOP_K) -> Dict[str, Any]:
+    """Read purchases from PostgreSQL, compute neighbours and publish a new model version"""
+    started = time.perf_counter()
+    with db_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT DISTINCT customer_id, product_id
+                FROM orders
+                WHERE customer_id IS NOT NULL AND product_id IS NOT NULL
+            """)
+            rows = cursor.fetchall()
+
+    purchases = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    model = compute_item_neighbors(purchases[:, 0], purchases[:, 1], top_k=top_k)
+    version = publish_model(model, model_dir, extra={
+        'purchases': int(len(purchases)),
+        'customers': int(len(np.unique(purchases[:, 0]))),
+        'build_seconds': round(time.perf_counter() - started, 3),
+    })
+    logger.info(f"✅ Item similarity model {version}: {len(model['product_ids'])} products, "
+                f"{len(purchases)} purchases in {time.perf_counter() - started:.2f}s")
+    return read_meta(model_dir, version)
+
+
+def publish_model(model: Dict[str, np.ndarray], model_dir: str = ITEM_SIMILARITY_DIR,
+                  extra: Optional[Dict[str, Any]] = None) -> str:
+    """Write the arrays into a fresh version directory, then switch CURRENT to it atomically"""
+    version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    for name in _ARRAYS:
+        np.save(os.path.join(version_dir, f"{name}.npy"), model[name])
+    meta = {
+        'version': version,
+        'built_at': datetime.now().isoformat(),
+        'products': int(len(model['product_ids'])),
+        'top_k': int(model['neighbors'].shape[1]),
+        'backend': 'scipy' if SCIPY_AVAILABLE else 'numpy',
+        **(extra or {}),
+    }
+    with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    tmp_path = os.path.join(model_dir, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(model_dir, CURRENT_FILE))
+
+    # Workers that still map an older version keep their pages until they reload (unlink is safe)
+    versions = sorted(entry for entry in os.listdir(model_dir)
+                      if os.path.isdir(os.path.join(model_dir, entry)))
+    for old in versions[:-ITEM_SIMILARITY_KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(model_dir, old), ignore_errors=True)
+    return version
+
+
+def read_meta(model_dir: str, version: str) -> Dict[str, Any]:
+    with open(os.path.join(model_dir, version, 'meta.json')) as f:
+        return json.load(f)
+
+
+class ItemSimilarityModel:
+    """Memory-mapped item neighbours, reloaded when a newer version is published"""
+
+    def __init__(self, model_dir: str = ITEM_SIMILARITY_DIR,
+                 reload_interval: int = ITEM_SIMILARITY_RELOAD_INTERVAL):
+        self.model_dir = model_dir
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._meta: Dict[str, Any] = {}
+        self._version: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._stats = {'lookups': 0, 'reloads': 0, 'load_errors': 0}
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.model_dir, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            version = self._current_version()
+            if version is None or version == self._version:
+                return
+            try:
+                version_dir = os.path.join(self.model_dir, version)
+                arrays = {name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode='r')
+                          for name in _ARRAYS}
+                self._meta = read_meta(self.model_dir, version)
+            except Exception as e:
+                self._stats['load_errors'] += 1
+                logger.warning(f"⚠️ Could not load item similarity model {version}: {e}")
+                return
+            self._arrays, self._version = arrays, version
+            self._stats['reloads'] += 1
+            logger.info(f"📦 Item similarity model {version} mapped ({self._meta.get('products')} products)")
+
+    def is_ready(self) -> bool:
+        self._maybe_reload()
+        return self._arrays is not None
+
+    def recommend(self, purchased_product_ids: Sequence[int], limit: int = 10,
+                  exclude: Sequence[int] = ()) -> List[Tuple[int, float]]:
+        """(product_id, score) pairs ranked by summed similarity to the purchased products"""
+        self._maybe_reload()
+        arrays = self._arrays
+        if arrays is None or not len(arrays['product_ids']) or not purchased_product_ids:
+            return []
+        with self._lock:
+            self._stats['lookups'] += 1
+
+        product_ids = arrays['product_ids']
+        purchased = np.unique(np.asarray(purchased_product_ids, dtype=np.int64))
+        positions = np.minimum(np.searchsorted(product_ids, purchased), len(product_ids) - 1)
+        rows = positions[product_ids[positions] == purchased]  # products unknown to the model drop out
+        if not len(rows):
+            return []
+
+        neighbors = np.asarray(arrays['neighbors'][rows]).ravel()
+        scores = np.asarray(arrays['scores'][rows]).ravel()
+        valid = neighbors >= 0
+        candidates, inverse = np.unique(neighbors[valid], return_inverse=True)
+        totals = np.bincount(inverse, weights=scores[valid])
+
+        candidate_ids = product_ids[candidates]
+        keep = ~np.isin(candidate_ids, np.concatenate([purchased, np.asarray(exclude, dtype=np.int64)]))
+        candidate_ids, totals = candidate_ids[keep], totals[keep]
+        order = np.argsort(-totals, kind='stable')[:limit]
+        return [(int(candidate_ids[i]), float(totals[i])) for i in order]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['loaded'] = self._arrays is not None
+        stats['version'] = self._version
+        stats['meta'] = dict(self._meta)
+        stats['model_dir'] = self.model_dir
+        return stats
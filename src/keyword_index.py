@@ -0,0 +1,225 @@
+"""
+🔎 Compiled Keyword Index for Intent Routing
+===============================================================================
+
+Replaces chains of ``any(kw in query_lower for kw in [...])`` with a single pass:
+1. Every routing keyword list is compiled once, at import, into one trie-shaped regex
+2. ``match(text)`` returns every keyword category present in the text
+3. Results are identical to plain substring checks (overlapping keywords included)
+4. The most recent queries are memoised, so the several routing stages of one
+   request share a single scan
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex alternation factored by common prefixes (longest match preferred)"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: a longer keyword wins over a terminal prefix
+        return body + '?' if terminal else body
+
+    return render(trie)
+
+
+class KeywordIndex:
+    """Precompiled multi-pattern matcher mapping keywords to routing categories"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], cache_size: int = 256):
+        self.categories: Dict[str, List[str]] = {name: list(words) for name, words in categories.items()}
+
+        keyword_categories: Dict[str, Set[str]] = {}
+        for name, words in self.categories.items():
+            for word in words:
+                keyword_categories.setdefault(word.lower(), set()).add(name)
+
+        # At each position the regex reports only the longest keyword, so every match also
+        # carries the categories of all keywords contained in it (they are present too)
+        keywords = list(keyword_categories)
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        for keyword in keywords:
+            implied = set()
+            for other in keywords:
+                if other in keyword:
+                    implied |= keyword_categories[other]
+            self._implied[keyword] = frozenset(implied)
+
+        self._pattern = re.compile('(?=(' + _trie_pattern(keywords) + '))') if keywords else None
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, text: str) -> FrozenSet[str]:
+        if not text or self._pattern is None:
+            return frozenset()
+        found: Set[str] = set()
+        for keyword in set(self._pattern.findall(text)):
+            found |= self._implied[keyword]
+        return frozenset(found)
+
+
+# Keyword lists used by EnhancedDatabaseQuerying routing, one category per former ``any()`` list
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    # process_enhanced_query
+    'support_contact': [
+        'contact customer support', 'customer support contact', 'support contact',
+        'how to contact support', 'customer service contact', 'support phone',
+        'support email', 'how to reach support', 'customer care contact',
+        'help desk contact', 'technical support contact', 'customer support number',
+        'support team contact', 'customer service number', 'support hotline'
+    ],
+    'tier_benefits': [
+        'benefits of', 'what are the benefits', 'tier benefits', 'gold tier benefits',
+        'silver tier benefits', 'bronze tier benefits', 'platinum tier benefits',
+        'what benefits', 'membership benefits', 'tier perks', 'account tier benefits',
+        'gold member benefits', 'silver member benefits', 'platinum member benefits',
+        'bronze member benefits', 'what do i get', 'tier advantages', 'membership perks'
+    ],
+    'analytics': [
+        'revenue', 'business analytics', 'top customers', 'top spending',
+        'customer rankings', 'sales data', 'platform statistics', 'total revenue',
+        'business performance', 'analytics', 'top customer', 'highest spending',
+        'revenue report', 'sales report', 'business insights', 'best customers',
+        'worst customers', 'customers from', 'which customers', 'customers in',
+        'customers who', 'customer spending', 'customers with',
+        'most profitable', 'least profitable', 'customer behavior', 'customer segments',
+        'cross customer', 'other customers', 'all customers', 'compare customers',
+        'customer comparison', 'customer analytics', 'customer metrics'
+    ],
+    'spending': [
+        'spent', 'spending', 'spend', 'total spent', 'how much', 'breakdown', 'calculation',
+        'calculate', 'are you sure', 'verify', 'double check', 'give me the details', 'confirm',
+        'revenue', 'sales', 'money', 'naira', '₦'
+    ],
+    'cart_context': ['cart', 'shopping', 'checkout', 'order', 'delivery', 'product', 'item'],
+    'cross_customer': ['customers', 'which customers', 'customers from', 'customers in', 'customers who', 'customers with'],
+
+    # classify_query_intent
+    'order_content': [
+        'what are in', 'what is in', 'what\'s in', 'contents of', 'items in',
+        'products in', 'food items', 'what did i order', 'what did i buy',
+        'show me the items', 'list the items', 'what products',
+        'what are the items', 'what items are', 'which products',
+        'contents', 'what\'s inside', 'what am i getting'
+    ],
+    'revenue_intent': [
+        'revenue', 'sales', 'profit', 'financial', 'performance',
+        'worst performing month', 'best performing month', 'top selling',
+        'highest sales', 'lowest sales', 'monthly sales'
+    ],
+    'cart_operation': [
+        'add to cart', 'add to my cart', 'add item to cart',
+        'remove from cart', 'delete from cart', 'clear cart',
+        'view cart', 'show cart', 'cart contents', 'what\'s in my cart',
+        'update cart', 'modify cart', 'change quantity in cart'
+    ],
+    'shopping_intent': [
+        'i want to buy', 'i need to purchase', 'i\'d like to order',
+        'can i buy', 'how do i buy', 'purchase', 'order now',
+        'add this to', 'checkout', 'place order', 'buy this'
+    ],
+    'support_contact_request': [
+        'contact customer support', 'customer support contact', 'support contact',
+        'how to contact support', 'customer service contact', 'support phone',
+        'support email', 'how to reach support', 'customer care contact',
+        'help desk contact', 'technical support contact'
+    ],
+    'contextual_reference': ['their', 'them', 'they', 'those customers', 'these customers', 'the customers', 'those', 'these', 'too', 'also'],
+    'route_order': ['order', 'orders', 'purchase', 'transaction', 'history', 'delivery', 'track', 'tracking', 'where is', 'status', 'shipped', 'shipping'],
+    'route_customer_support': [
+        'name of', 'customer name', 'customer details', 'payment method', 'contact information', 'address',
+        'phone number', 'email', 'account information', 'customer info', 'profile details', 'who is',
+        'customer profile', 'this customer', 'what payment', 'which customer', 'customer use', 'account tier',
+        'tier', 'when did', 'joined', 'products has', 'purchase history', 'buying history', 'my account',
+        'my tier', 'my spending', 'my profile', 'my details', 'my information', 'my orders', 'how much have i',
+        'total i spent', 'what i bought', 'my purchases', 'update my', 'change my', 'modify my'
+    ],
+    'route_customer': ['customer', 'customers', 'profile', 'account'],
+    'route_geographic': ['where', 'from', 'in', 'state', 'location'],
+    'route_revenue': [
+        'revenue', 'sales', 'money', 'naira', '₦', 'income', 'spent', 'spending', 'spend', 'total spent',
+        'how much', 'breakdown', 'calculation', 'calculate', 'are you sure', 'verify', 'double check',
+        'give me the details', 'details', 'confirm'
+    ],
+    'route_product': ['product', 'category', 'item', 'goods'],
+    'route_temporal': ['time', 'date', 'period', 'trend', 'monthly', 'weekly'],
+    'category_electronics': ['phone', 'laptop', 'computer', 'tv', 'electronics'],
+    'category_fashion': ['dress', 'clothes', 'fashion', 'shoe', 'bag'],
+    'category_beauty': ['beauty', 'cosmetics', 'makeup', 'cream', 'soap'],
+    'category_books': ['book', 'novel', 'textbook', 'reading'],
+    'category_automotive': ['car', 'auto', 'automotive', 'battery', 'tire', 'tires', 'engine'],
+
+    # is_query_within_scope
+    'in_scope': [
+        'order', 'orders', 'delivery', 'track', 'tracking', 'shipped', 'shipping',
+        'when', 'where', 'status', 'expected', 'arrive', 'delivered', 'package',
+        'my order', 'order status', 'delivery status', 'order history',
+        'account', 'profile', 'login', 'password', 'settings', 'tier',
+        'my account', 'account settings',
+        'payment', 'pay', 'billing', 'card', 'bank transfer', 'refund',
+        'payment method', 'checkout',
+        'raqibtech', 'raqibtechpay', 'customer service', 'customer support',
+        'help', 'support', 'contact', 'assistance',
+        'product', 'buy', 'purchase', 'cart', 'shopping', 'recommendation',
+        'products', 'item', 'items', 'goods', 'catalog', 'inventory',
+        'price', 'prices', 'cost', 'naira', '₦', 'cheap', 'expensive', 'budget',
+        'stock', 'available', 'availability', 'out of stock', 'in stock',
+        'category', 'categories', 'brand', 'brands',
+        'phone', 'smartphone', 'laptop', 'computer', 'tv', 'electronics',
+        'dress', 'clothes', 'fashion', 'shoe', 'shoes', 'bag', 'bags',
+        'beauty', 'cosmetics', 'makeup', 'cream', 'soap', 'skincare',
+        'book', 'books', 'novel', 'textbook', 'reading',
+        'car', 'auto', 'automotive', 'battery', 'tire', 'tires', 'engine',
+        'samsung', 'apple', 'iphone', 'tecno', 'infinix', 'lg', 'sony',
+        'nike', 'adidas', 'zara', 'mac', 'maybelline', 'hp', 'dell'
+    ],
+    'out_of_scope': [
+        'president of nigeria', 'governor of', 'minister of', 'election',
+        'political party', 'government policy',
+        'latest movie', 'celebrity news', 'sports score', 'football match',
+        'movie recommendation', 'song lyrics',
+        'homework help', 'solve equation', 'chemistry formula', 'physics problem',
+        'university admission', 'exam questions',
+        'medical advice', 'health symptoms', 'disease', 'medication',
+        'doctor recommendation',
+        'stock market', 'investment advice', 'cryptocurrency', 'forex trading',
+        'python tutorial', 'javascript help', 'coding problem',
+        'programming language'
+    ],
+
+    # detect_user_sentiment
+    'sentiment_frustrated': ['urgent', 'frustrated', 'angry', 'annoyed', 'terrible', 'awful', 'hate', 'worst', 'stupid', 'ridiculous'],
+    'sentiment_worried': ['worried', 'anxious', 'concerned', 'scared', 'nervous', 'help me', 'please help', 'urgent'],
+    'sentiment_confused': ['confused', 'don\'t understand', 'unclear', 'lost', 'what does', 'how do'],
+    'sentiment_happy': ['thank', 'thanks', 'great', 'awesome', 'wonderful', 'perfect', 'love', 'amazing'],
+    'sentiment_impatient': ['still waiting', 'taking too long', 'when will', 'hurry', 'asap', 'immediately'],
+
+    # _schedule_agent_memory_storage
+    'memory_preference': [
+        'i prefer', 'my favorite', 'i always buy', 'i usually get',
+        'i like to order', 'i typically want', 'i love'
+    ],
+    'memory_interest': [
+        'want to buy', 'planning to purchase', 'interested in buying',
+        'looking to order', 'need to get urgently', 'i need', 'i want'
+    ],
+    'memory_delivery': ['delivery', 'shipping', 'address', 'location'],
+    'memory_payment': ['payment', 'pay', 'card', 'transfer', 'raqibtechpay'],
+}
+
+# Shared index, compiled once at import
+intent_keyword_index = KeywordIndex(INTENT_KEYWORDS)
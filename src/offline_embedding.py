@@ -0,0 +1,105 @@
+"""
+🧭 Offline Embedding Backend
+===============================================================================
+
+Network-free text embeddings for degraded mode and tests:
+1. Word unigrams, word bigrams and character trigrams are hashed into a fixed bucket space
+2. Bucket weights are sublinear term frequencies with signed hashing (collisions cancel out)
+3. A fixed, seeded Gaussian projection maps the sparse buckets to a dense vector
+4. Vectors are L2-normalised, so cosine search behaves like it does for API embeddings
+
+Identical text always gives an identical vector (in every process), and texts sharing
+words or word fragments land close together. Token hashes and whole vectors are memoised.
+"""
+
+import re
+import zlib
+import threading
+from functools import lru_cache
+from typing import List
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env
+
+OFFLINE_EMBEDDING_DIMS = safe_int_env('OFFLINE_EMBEDDING_DIMS', 384)
+OFFLINE_EMBEDDING_BUCKETS = 1 << 12
+OFFLINE_EMBEDDING_SEED = 20250101
+OFFLINE_EMBEDDING_CACHE_SIZE = safe_int_env('OFFLINE_EMBEDDING_CACHE_SIZE', 4096)
+
+# Whole words carry the most meaning; fragments make misspellings and inflections still match
+FEATURE_WEIGHTS = {'w': 1.0, 'b': 0.7, 'c': 0.35}
+
+_TOKEN_RE = re.compile(r"[a-z0-9₦]+")
+_projection = None
+_projection_lock = threading.Lock()
+
+
+def _get_projection() -> np.ndarray:
+    """Seeded (buckets x dims) Gaussian matrix, built once per process (~6 MB)"""
+    global _projection
+    if _projection is None:
+        with _projection_lock:
+            if _projection is None:
+                rng = np.random.default_rng(OFFLINE_EMBEDDING_SEED)
+                matrix = rng.standard_normal((OFFLINE_EMBEDDING_BUCKETS, OFFLINE_EMBEDDING_DIMS), dtype=np.float32)
+                _projection = matrix / np.sqrt(OFFLINE_EMBEDDING_DIMS, dtype=np.float32)
+    return _projection
+
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token: str) -> tuple:
+    """crc32 of a word and its character trigrams (vocabulary repeats, so this is memoised)"""
+    padded = f"<{token}>"
+    return (zlib.crc32(f"w:{token}".encode('utf-8')),) + tuple(
+        zlib.crc32(f"c:{padded[i:i + 3]}".encode('utf-8')) for i in range(len(padded) - 2))
+
+
+def _hashed_features(text: str):
+    tokens = _TOKEN_RE.findall(text.lower())
+    hashes, weights = [], []
+    for token in tokens:
+        token_hashes = _token_hashes(token)
+        hashes.extend(token_hashes)
+        weights.append(FEATURE_WEIGHTS['w'])
+        weights.extend([FEATURE_WEIGHTS['c']] * (len(token_hashes) - 1))
+    for first, second in zip(tokens, tokens[1:]):
+        hashes.append(zlib.crc32(f"b:{first} {second}".encode('utf-8')))
+        weights.append(FEATURE_WEIGHTS['b'])
+    return np.array(hashes, dtype=np.uint32), np.array(weights, dtype=np.float32)
+
+
+@lru_cache(maxsize=OFFLINE_EMBEDDING_CACHE_SIZE)
+def _embed_cached(text: str) -> np.ndarray:
+    hashes, weights = _hashed_features(text)
+    if not len(hashes):
+        return np.zeros(OFFLINE_EMBEDDING_DIMS, dtype=np.float32)
+
+    # crc32 is stable across processes (unlike hash()); low bits pick the bucket, the top bit the sign
+    signed = np.where(hashes >> 31, -weights, weights)
+    buckets, inverse = np.unique(hashes & (OFFLINE_EMBEDDING_BUCKETS - 1), return_inverse=True)
+    counts = np.bincount(inverse, weights=signed).astype(np.float32)
+    counts = np.sign(counts) * np.log1p(np.abs(counts))
+
+    vector = counts @ _get_projection()[buckets]
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    vector.setflags(write=False)
+    return vector
+
+
+def offline_embedding(text: str) -> List[float]:
+    """Deterministic OFFLINE_EMBEDDING_DIMS-d unit vector for ``text`` (no network)"""
+    return _embed_cached(text or "").tolist()
+
+
+def offline_embeddings(texts: List[str]) -> np.ndarray:
+    """Stacked offline embeddings, shape (len(texts), OFFLINE_EMBEDDING_DIMS)"""
+    if not texts:
+        return np.zeros((0, OFFLINE_EMBEDDING_DIMS), dtype=np.float32)
+    return np.vstack([_embed_cached(text or "") for text in texts])
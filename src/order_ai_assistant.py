@@ -28,7 +28,7 @@ from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 import uuid
 import re
 from psycopg2.extras import RealDictCursor
@@ -145,6 +145,77 @@ except ImportError as e1:
             PAY_ON_DELIVERY = "Pay on Delivery"
             RAQIB_TECH_PAY = "RaqibTechPay"
 
+# 🧩 Intent regexes for parse_order_intent, compiled once and grouped by priority tier.
+# Entries are (pattern, intent[, entity_group]); tiers are checked in the order parse_order_intent needs them.
+try:
+    from .pattern_registry import PatternRegistry
+except ImportError:
+    from pattern_registry import PatternRegistry
+
+ORDER_INTENT_PATTERNS = PatternRegistry('order_ai_assistant')
+
+# 1. HIGHEST PRIORITY: Payment method selection (must come before general "want")
+ORDER_INTENT_PATTERNS.register_many('payment', [
+    (r'payment method.*(is|set to|choose|select)\s*(.+)', 'payment_method_selection', 2),
+    (r'pay\s*(with|using)\s*(.+)', 'payment_method_selection', 2),
+    (r'(use|choose|select|want\s*to\s*use)\s*(raqibpay|raqibtechpay|pay\s*on\s*delivery|card\s*payment|bank\s*transfer|verve|mastercard|visa)', 'payment_method_selection', 2),
+    (r'(verve|mastercard|visa|atm)\s*card', 'payment_method_selection', 0), # Card types
+    (r'i\s*want\s*to\s*use\s*(.+)', 'payment_method_selection', 1), # Keep this for flexibility
+    (r'payment\s*(option|preference)\s*is\s*(.+)', 'payment_method_selection', 2),
+    (r'(raqibpay|raqibtechpay|pay\s*on\s*delivery|card\s*payment|bank\s*transfer)', 'payment_method_selection', 0) # Direct mention
+])
+
+# 2. HIGH PRIORITY: Delivery address (only consulted when no delivery-policy exclusion matched)
+ORDER_INTENT_PATTERNS.register_many('delivery_address', [
+    (r'(delivery|shipping)\s*address\s*(is|set to|for|:)\s*(.+)', 'set_delivery_address', 3),
+    (r'my\s*address\s*(is|:)\s*(.+)', 'set_delivery_address', 2),
+    (r'deliver\s*to\s*(.+)', 'set_delivery_address', 1),
+    (r'send\s*to\s*(.+)', 'set_delivery_address', 1),
+    (r'ship\s*to\s*(.+)', 'set_delivery_address', 1),
+    (r'use\s*address\s*(.+)', 'set_delivery_address', 1), # For confirming saved address
+    # Common Nigerian locations as implicit address - BUT ONLY if NOT asking about rates/costs
+    (r'(?<!shipping rates to )(?<!delivery cost to )(?<!shipping cost to )(?<!delivery fee to )\b(lugbe|abuja|lagos|ikeja|lekki|victoria island|ilorin|kano|kaduna|port harcourt|ibadan|benin city|onitsha|aba|enugu|jos|maiduguri|zaria|warri|uyo|calabar|owerri|akure|abeokuta|osogbo|minna|sokoto|bauchi|gombe|yola|jalingo|damaturu|dutse|lafia|makurdi|awka|asaba|yenagoa|abakaliki|Ado Ekiti)\b', 'set_delivery_address', 0)
+])
+
+# 3. HIGH PRIORITY: Place order / checkout (with typo tolerance)
+ORDER_INTENT_PATTERNS.register_many('place_order', [
+    (r'place\s*(my|the)?\s*order', 'place_order'),
+    (r'confirm\s*(my|the)?\s*order', 'place_order'),
+    (r'complete\s*(my|the)?\s*order', 'place_order'),
+    (r'proceed\s*to\s*(order|ordering)', 'place_order'),
+    (r'proceed\s*with\s*(my|the)?\s*order', 'place_order'),
+    (r'proceed\s*to\s*che[ck]*out', 'checkout'),  # Handles "chekout", "checkout", "cheout" etc.
+    (r'go\s*to\s*che[ck]*out', 'checkout'),
+    (r'che[ck]*out\s*now', 'checkout'),
+    (r'che[ck]*out', 'checkout')  # Broad checkout with typo tolerance
+])
+
+# 4. BROWSING INTENT: Show products when user expresses buying interest
+ORDER_INTENT_PATTERNS.register_many('browse', [
+    (r'i\s*want\s*to\s*buy\s+(.+)', 'browse_products_by_interest', 1),
+    (r'i\s*need\s+(.+)', 'browse_products_by_interest', 1),
+    (r'looking\s*for\s+(.+)', 'browse_products_by_interest', 1),
+    (r'show\s*me\s+(.+?)\s*(products|items)', 'browse_products_by_interest', 1),
+    (r'what\s+(.+?)\s*do\s*you\s*have', 'browse_products_by_interest', 1),
+    (r'available\s+(.+)', 'browse_products_by_interest', 1)
+])
+
+# 5. EXPLICIT ADD TO CART: Only direct cart addition commands
+ORDER_INTENT_PATTERNS.register_many('add_to_cart', [
+    (r'add\s+(.+?)\s+to\s+(my|the)?\s*cart', 'add_to_cart', 1),
+    (r'put\s+(.+?)\s+in\s+(my|the)?\s*cart', 'add_to_cart', 1),
+    (r'add\s+(.+?)\s+to\s*my\s*order', 'add_to_cart', 1),
+    (r'cart\s+(.+)', 'add_to_cart', 1),
+    # Handle "add to cart" without product name if context is available
+    (r'^\s*add\s+to\s+cart\s*$', 'add_to_cart_contextual'),
+    # Only very specific immediate purchase patterns
+    (r'buy\s+(.+?)\s*(now|immediately)', 'add_to_cart', 1),
+    (r'^(order|i want to order)\s+(?:\d+\s+)?(.+)', 'add_to_cart', 1)
+])
+
+BROWSE_TRAILING_RE = re.compile(r'\s*(products|items|to\s+buy|please)$', re.IGNORECASE)
+CART_TRAILING_RE = re.compile(r'\s*(to\s+(my|the)?\s*cart|for\s+me|please)$', re.IGNORECASE)
+
 @dataclass
 class CartItem:
     """Shopping cart item"""
@@ -188,23 +259,6 @@ class OrderAIAssistant:
 
         self.active_carts = {}  # In-memory cart storage (use Redis in production)
 
-        try:
-            from config.database_config import DATABASE_CONFIG
-            self.db_config = DATABASE_CONFIG
-            logger.info("✅ Database configuration loaded successfully")
-        except ImportError:
-            # Fallback database configuration
-            self.db_config = {
-                'host': safe_str_env('DB_HOST', 'localhost'),
-                'port': safe_int_env('DB_PORT', 5432),
-                'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-                'user': safe_str_env('DB_USER', 'postgres'),
-                'password': safe_str_env('DB_PASSWORD', 'oracle'),
-                'sslmode': safe_str_env('DB_SSLMODE', 'prefer'),
-                'connect_timeout': safe_int_env('DB_CONNECT_TIMEOUT', 10),
-            }
-            logger.warning("⚠️ Using fallback database configuration")
-
         # Handle memory system - create a mock one if None is passed
         if memory_system is not None:
             self.memory_system = memory_system
@@ -220,7 +274,7 @@ class OrderAIAssistant:
     def get_database_connection(self):
         """🔧 CRITICAL FIX: Get database connection for product searches"""
         try:
-            conn = psycopg2.connect(**self.db_config)
+            conn = get_pooled_connection()
             return conn
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
@@ -279,26 +333,17 @@ class OrderAIAssistant:
             }
 
         # 1. HIGHEST PRIORITY: Payment method selection (must come before general "want")
-        payment_patterns = [
-            (r'payment method.*(is|set to|choose|select)\s*(.+)', 'payment_method_selection', 2),
-            (r'pay\s*(with|using)\s*(.+)', 'payment_method_selection', 2),
-            (r'(use|choose|select|want\s*to\s*use)\s*(raqibpay|raqibtechpay|pay\s*on\s*delivery|card\s*payment|bank\s*transfer|verve|mastercard|visa)', 'payment_method_selection', 2),
-            (r'(verve|mastercard|visa|atm)\s*card', 'payment_method_selection', 0), # Card types
-            (r'i\s*want\s*to\s*use\s*(.+)', 'payment_method_selection', 1), # Keep this for flexibility
-            (r'payment\s*(option|preference)\s*is\s*(.+)', 'payment_method_selection', 2),
-            (r'(raqibpay|raqibtechpay|pay\s*on\s*delivery|card\s*payment|bank\s*transfer)', 'payment_method_selection', 0) # Direct mention
-        ]
-        for pattern, intent, group_idx in payment_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                entity = match.group(group_idx).strip() if group_idx > 0 and len(match.groups()) >= group_idx else match.group(0).strip()
-                # Normalize payment method names
-                if "raqib" in entity: entity = "RaqibTechPay"
-                elif "delivery" in entity: entity = "Pay on Delivery"
-                elif any(card_type in entity for card_type in ["card", "verve", "mastercard", "visa", "atm"]): entity = "Card"
-                elif "bank" in entity: entity = "Bank Transfer"
-                logger.info(f"🎯 Intent parsed: {intent} (confidence: 0.95, pattern: '{pattern}') - Entity: {entity}")
-                return {'intent': intent, 'entities': {'payment_method': entity}, 'confidence': 0.95}
+        payment_match = ORDER_INTENT_PATTERNS.search('payment', message_lower)
+        if payment_match:
+            registered, match = payment_match
+            entity = registered.entity(match)
+            # Normalize payment method names
+            if "raqib" in entity: entity = "RaqibTechPay"
+            elif "delivery" in entity: entity = "Pay on Delivery"
+            elif any(card_type in entity for card_type in ["card", "verve", "mastercard", "visa", "atm"]): entity = "Card"
+            elif "bank" in entity: entity = "Bank Transfer"
+            logger.info(f"🎯 Intent parsed: {registered.intent} (confidence: 0.95, pattern: '{registered.pattern}') - Entity: {entity}")
+            return {'intent': registered.intent, 'entities': {'payment_method': entity}, 'confidence': 0.95}
 
         # Check for shipping rate inquiries BEFORE delivery address patterns
         shipping_rate_patterns = [
@@ -329,92 +374,43 @@ class OrderAIAssistant:
 
         # Only process delivery address patterns if it's NOT a delivery policy question
         if not any(exclusion in message_lower for exclusion in delivery_exclusions):
-            delivery_patterns = [
-                (r'(delivery|shipping)\s*address\s*(is|set to|for|:)\s*(.+)', 'set_delivery_address', 3),
-                (r'my\s*address\s*(is|:)\s*(.+)', 'set_delivery_address', 2),
-                (r'deliver\s*to\s*(.+)', 'set_delivery_address', 1),
-                (r'send\s*to\s*(.+)', 'set_delivery_address', 1),
-                (r'ship\s*to\s*(.+)', 'set_delivery_address', 1),
-                (r'use\s*address\s*(.+)', 'set_delivery_address', 1), # For confirming saved address
-                 # Common Nigerian locations as implicit address - BUT ONLY if NOT asking about rates/costs
-                (r'(?<!shipping rates to )(?<!delivery cost to )(?<!shipping cost to )(?<!delivery fee to )\b(lugbe|abuja|lagos|ikeja|lekki|victoria island|ilorin|kano|kaduna|port harcourt|ibadan|benin city|onitsha|aba|enugu|jos|maiduguri|zaria|warri|uyo|calabar|owerri|akure|abeokuta|osogbo|minna|sokoto|bauchi|gombe|yola|jalingo|damaturu|dutse|lafia|makurdi|awka|asaba|yenagoa|abakaliki|Ado Ekiti)\b', 'set_delivery_address', 0)
-            ]
-        else:
-            # Skip delivery address patterns for policy questions
-            delivery_patterns = []
-        for pattern, intent, group_idx in delivery_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                address_text = match.group(group_idx).strip() if group_idx > 0 and len(match.groups()) >= group_idx else match.group(0).strip()
+            delivery_match = ORDER_INTENT_PATTERNS.search('delivery_address', message_lower)
+            if delivery_match:
+                registered, match = delivery_match
+                address_text = registered.entity(match)
                 full_address, city, state = self._parse_nigerian_address(address_text)
-                logger.info(f"🎯 Intent parsed: {intent} (confidence: 0.9, pattern: '{pattern}') - Address: {full_address}")
-                return {'intent': intent, 'entities': {'delivery_address': {'full_address': full_address, 'city': city, 'state': state, 'raw': address_text}}, 'confidence': 0.9}
+                logger.info(f"🎯 Intent parsed: {registered.intent} (confidence: 0.9, pattern: '{registered.pattern}') - Address: {full_address}")
+                return {'intent': registered.intent, 'entities': {'delivery_address': {'full_address': full_address, 'city': city, 'state': state, 'raw': address_text}}, 'confidence': 0.9}
 
         # 3. HIGH PRIORITY: Place order / checkout (with typo tolerance)
-        order_patterns = [
-            (r'place\s*(my|the)?\s*order', 'place_order'),
-            (r'confirm\s*(my|the)?\s*order', 'place_order'),
-            (r'complete\s*(my|the)?\s*order', 'place_order'),
-            (r'proceed\s*to\s*(order|ordering)', 'place_order'),  # Added this pattern
-            (r'proceed\s*with\s*(my|the)?\s*order', 'place_order'),  # Added this pattern
-            (r'proceed\s*to\s*che[ck]*out', 'checkout'),  # Handles "chekout", "checkout", "cheout" etc.
-            (r'go\s*to\s*che[ck]*out', 'checkout'),
-            (r'che[ck]*out\s*now', 'checkout'),
-            (r'che[ck]*out', 'checkout')  # Broad checkout with typo tolerance
-        ]
-        for pattern, intent in order_patterns:
-            if re.search(pattern, message_lower):
-                logger.info(f"🎯 Intent parsed: {intent} (confidence: 0.9, pattern: '{pattern}')")
-                return {'intent': intent, 'entities': {}, 'confidence': 0.9}
+        order_match = ORDER_INTENT_PATTERNS.search('place_order', message_lower)
+        if order_match:
+            registered, _ = order_match
+            logger.info(f"🎯 Intent parsed: {registered.intent} (confidence: 0.9, pattern: '{registered.pattern}')")
+            return {'intent': registered.intent, 'entities': {}, 'confidence': 0.9}
 
         # 4. BROWSING INTENT: Show products when user expresses buying interest
-        browse_patterns = [
-            (r'i\s*want\s*to\s*buy\s+(.+)', 'browse_products_by_interest'),
-            (r'i\s*need\s+(.+)', 'browse_products_by_interest'),
-            (r'looking\s*for\s+(.+)', 'browse_products_by_interest'),
-            (r'show\s*me\s+(.+?)\s*(products|items)', 'browse_products_by_interest'),
-            (r'what\s+(.+?)\s*do\s*you\s*have', 'browse_products_by_interest'),
-            (r'available\s+(.+)', 'browse_products_by_interest')
-        ]
-        for pattern, intent in browse_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                product_name = match.group(1).strip()
-                # Clean up common trailing phrases
-                product_name = re.sub(r'\s*(products|items|to\s+buy|please)$', '', product_name, flags=re.IGNORECASE).strip()
-                logger.info(f"🎯 Intent parsed: {intent} (confidence: 0.85, pattern: '{pattern}') - Product: {product_name}")
-                return {'intent': intent, 'entities': {'product_name': product_name}, 'confidence': 0.85}
+        browse_match = ORDER_INTENT_PATTERNS.search('browse', message_lower)
+        if browse_match:
+            registered, match = browse_match
+            # Clean up common trailing phrases
+            product_name = BROWSE_TRAILING_RE.sub('', registered.entity(match)).strip()
+            logger.info(f"🎯 Intent parsed: {registered.intent} (confidence: 0.85, pattern: '{registered.pattern}') - Product: {product_name}")
+            return {'intent': registered.intent, 'entities': {'product_name': product_name}, 'confidence': 0.85}
 
         # 5. EXPLICIT ADD TO CART: Only direct cart addition commands
-        cart_patterns = [
-            (r'add\s+(.+?)\s+to\s+(my|the)?\s*cart', 'add_to_cart'),
-            (r'put\s+(.+?)\s+in\s+(my|the)?\s*cart', 'add_to_cart'),
-            (r'add\s+(.+?)\s+to\s*my\s*order', 'add_to_cart'),
-            (r'cart\s+(.+)', 'add_to_cart'),
-            # Handle "add to cart" without product name if context is available
-            (r'^\s*add\s+to\s+cart\s*$', 'add_to_cart_contextual'),
-            # Only very specific immediate purchase patterns
-            (r'buy\s+(.+?)\s*(now|immediately)', 'add_to_cart'),
-            (r'^(order|i want to order)\s+(?:\d+\s+)?(.+)', 'add_to_cart')
-        ]
-        for pattern, intent in cart_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                # Handle special case for "add to cart" without product name
-                if intent == 'add_to_cart_contextual':
-                    return {'intent': 'add_to_cart', 'entities': {'product_name': 'contextual'}, 'confidence': 0.85}
-
-                # Extract product name from the appropriate group
-                if r'get\s+(me\s+)' in pattern:
-                    product_name = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
-                else:
-                    product_name = match.group(1).strip()
-
-                # Clean up common trailing phrases that might have been captured
-                product_name = re.sub(r'\s*(to\s+(my|the)?\s*cart|for\s+me|please)$', '', product_name, flags=re.IGNORECASE).strip()
-
-                logger.info(f"🎯 Intent parsed: {intent} (confidence: 0.85, pattern: '{pattern}') - Product: {product_name}")
-                return {'intent': intent, 'entities': {'product_name': product_name}, 'confidence': 0.85}
+        cart_match = ORDER_INTENT_PATTERNS.search('add_to_cart', message_lower)
+        if cart_match:
+            registered, match = cart_match
+            # Handle special case for "add to cart" without product name
+            if registered.intent == 'add_to_cart_contextual':
+                return {'intent': 'add_to_cart', 'entities': {'product_name': 'contextual'}, 'confidence': 0.85}
+
+            # Clean up common trailing phrases that might have been captured
+            product_name = CART_TRAILING_RE.sub('', registered.entity(match)).strip()
+
+            logger.info(f"🎯 Intent parsed: {registered.intent} (confidence: 0.85, pattern: '{registered.pattern}') - Product: {product_name}")
+            return {'intent': registered.intent, 'entities': {'product_name': product_name}, 'confidence': 0.85}
 
         # 6. CHECKOUT FLOW PATTERNS (HIGH PRIORITY)
         checkout_patterns = [
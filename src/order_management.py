@@ -40,7 +40,14 @@ from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
+
+try:
+    from .popularity_cache import invalidate_popularity_cache
+    from .customer_profile_cache import invalidate_customer_profile
+except ImportError:
+    from popularity_cache import invalidate_popularity_cache
+    from customer_profile_cache import invalidate_customer_profile
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -196,14 +203,6 @@ class OrderManagementSystem:
     """🛒 Advanced Order Management System"""
 
     def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
         # Initialize Redis for order caching
         try:
             # Safe Redis port parsing - handle secret names and invalid values
@@ -226,17 +225,25 @@ class OrderManagementSystem:
                 decode_responses=True
             )
             self.redis_client.ping()
+            # Recommendation caches live in db 1 (ProductRecommendationEngine); new orders invalidate them there
+            self.recommendation_redis_client = redis.Redis(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=redis_port,
+                db=1,
+                decode_responses=True
+            )
             logger.info("✅ Redis order cache initialized")
         except Exception as e:
             logger.warning(f"⚠️ Redis unavailable for orders: {e}")
             self.redis_client = None
+            self.recommendation_redis_client = None
 
         self.delivery_calculator = NigerianDeliveryCalculator()
 
     def get_database_connection(self):
-        """Get database connection"""
+        """Get a connection from the shared process-wide pool"""
         try:
-            conn = psycopg2.connect(**self.db_config)
+            conn = get_pooled_connection()
             return conn
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
@@ -510,6 +517,11 @@ class OrderManagementSystem:
 
                     logger.info(f"✅ Order {formatted_order_id} (ID: {order_id}) created successfully for customer {customer_id}")
 
+                    # New order changes product popularity and the customer's profile; both are rebuilt on next read
+                    invalidate_popularity_cache(self.recommendation_redis_client, f"order {formatted_order_id}")
+                    invalidate_customer_profile(self.recommendation_redis_client, customer_id,
+                                                f"order {formatted_order_id}")
+
                     # Cache order for quick retrieval
                     if self.redis_client:
                         self.redis_client.setex(
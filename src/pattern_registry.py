@@ -0,0 +1,170 @@
+"""
+🧩 Precompiled Regex Registry for Shopping Intent Detection
+===============================================================================
+
+Central home for the intent regexes used by OrderAIAssistant and EnhancedOrderPatterns:
+1. Every pattern is compiled once, when it is registered
+2. Patterns are grouped into priority tiers and evaluated in registration order
+3. Each tier also gets one combined alternation, so a message that matches nothing
+   in the tier is rejected with a single scan
+4. Per-pattern evaluation/hit/timing statistics to find slow or dead patterns
+"""
+
+import re
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Every registry created in the process, for admin monitoring
+_registries: Dict[str, "PatternRegistry"] = {}
+_registries_lock = threading.Lock()
+
+
+@dataclass
+class RegisteredPattern:
+    """A compiled intent regex and its usage counters"""
+    name: str
+    tier: str
+    pattern: str
+    regex: "re.Pattern"
+    intent: Any
+    group: int = 0
+    evaluations: int = 0
+    hits: int = 0
+    total_ns: int = 0
+
+    def entity(self, match: "re.Match") -> str:
+        """Text captured by the configured group (whole match for group 0 or missing groups)"""
+        if self.group > 0 and len(match.groups()) >= self.group and match.group(self.group) is not None:
+            return match.group(self.group).strip()
+        return match.group(0).strip()
+
+
+class PatternRegistry:
+    """Compile-once regex registry with priority tiers and hit statistics"""
+
+    def __init__(self, name: str, flags: int = 0):
+        self.name = name
+        self.flags = flags
+        self._tiers: Dict[str, List[RegisteredPattern]] = {}
+        self._tier_priority: Dict[str, int] = {}
+        self._combined: Dict[str, "re.Pattern"] = {}
+        self._tier_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        with _registries_lock:
+            _registries[name] = self
+
+    def register(self, tier: str, pattern: str, intent: Any, group: int = 0,
+                 name: Optional[str] = None, priority: Optional[int] = None) -> RegisteredPattern:
+        """Compile ``pattern`` into ``tier``; tiers are ordered by ``priority`` (lower first)"""
+        bucket = self._tiers.setdefault(tier, [])
+        if tier not in self._tier_priority:
+            self._tier_priority[tier] = priority if priority is not None else len(self._tier_priority)
+            self._tier_stats[tier] = {'scans': 0, 'skipped': 0}
+        registered = RegisteredPattern(
+            name=name or f"{tier}[{len(bucket)}]",
+            tier=tier,
+            pattern=pattern,
+            regex=re.compile(pattern, self.flags),
+            intent=intent,
+            group=group,
+        )
+        bucket.append(registered)
+        self._combined.pop(tier, None)
+        return registered
+
+    def register_many(self, tier: str, patterns: List[Tuple], priority: Optional[int] = None):
+        """Register ``(pattern, intent[, group])`` tuples in order"""
+        for entry in patterns:
+            pattern, intent = entry[0], entry[1]
+            group = entry[2] if len(entry) > 2 else 0
+            self.register(tier, pattern, intent, group=group, priority=priority)
+
+    def tiers(self) -> List[str]:
+        """Tier names in priority order"""
+        return sorted(self._tiers, key=lambda tier: self._tier_priority[tier])
+
+    def _combined_regex(self, tier: str) -> "re.Pattern":
+        combined = self._combined.get(tier)
+        if combined is None:
+            alternation = '|'.join(f'(?:{p.pattern})' for p in self._tiers[tier])
+            combined = re.compile(alternation, self.flags)
+            self._combined[tier] = combined
+        return combined
+
+    def search(self, tier: str, text: str) -> Optional[Tuple[RegisteredPattern, "re.Match"]]:
+        """
+        First pattern of ``tier`` (in registration order) that matches ``text``.
+        The combined alternation rejects non-matching text in one pass; only on a hit are
+        the individual patterns walked to honour their priority order.
+        """
+        patterns = self._tiers.get(tier)
+        if not patterns:
+            return None
+
+        with self._lock:
+            self._tier_stats[tier]['scans'] += 1
+        if not self._combined_regex(tier).search(text):
+            with self._lock:
+                self._tier_stats[tier]['skipped'] += 1
+            return None
+
+        timings = []
+        result = None
+        for registered in patterns:
+            started = time.perf_counter_ns()
+            match = registered.regex.search(text)
+            timings.append((registered, time.perf_counter_ns() - started, match is not None))
+            if match:
+                result = (registered, match)
+                break
+
+        with self._lock:
+            for registered, elapsed_ns, hit in timings:
+                registered.evaluations += 1
+                registered.total_ns += elapsed_ns
+                if hit:
+                    registered.hits += 1
+        return result
+
+    def search_tiers(self, text: str) -> Optional[Tuple[RegisteredPattern, "re.Match"]]:
+        """First match across all tiers in priority order"""
+        for tier in self.tiers():
+            result = self.search(tier, text)
+            if result:
+                return result
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tier scan counts and per-pattern evaluations, hits and average cost"""
+        with self._lock:
+            tiers = {}
+            for tier in self.tiers():
+                patterns = []
+                for p in self._tiers[tier]:
+                    patterns.append({
+                        'name': p.name,
+                        'pattern': p.pattern,
+                        'intent': getattr(p.intent, 'value', p.intent),
+                        'evaluations': p.evaluations,
+                        'hits': p.hits,
+                        'hit_rate': round(p.hits / p.evaluations, 4) if p.evaluations else 0.0,
+                        'avg_us': round(p.total_ns / p.evaluations / 1000, 2) if p.evaluations else 0.0,
+                    })
+                tiers[tier] = {**self._tier_stats[tier], 'patterns': patterns}
+        return {'registry': self.name, 'tiers': tiers}
+
+    def dead_patterns(self, min_evaluations: int = 100) -> List[str]:
+        """Patterns evaluated at least ``min_evaluations`` times without a single hit"""
+        with self._lock:
+            return [p.name for tier in self.tiers() for p in self._tiers[tier]
+                    if p.evaluations >= min_evaluations and p.hits == 0]
+
+
+def get_pattern_registry_stats() -> Dict[str, Any]:
+    """Statistics for every registry in the process"""
+    with _registries_lock:
+        registries = list(_registries.values())
+    return {registry.name: registry.get_stats() for registry in registries}
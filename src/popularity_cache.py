@@ -0,0 +1,235 @@
+"""
+🔥 Stampede-safe Popularity Cache for Product Recommendations
+===============================================================================
+
+Caches the popular-products aggregate (products LEFT JOIN orders GROUP BY) in Redis:
+1. Entries are keyed by (category, state, limit) and carry the cache generation they were built for
+2. Single-flight recomputation: one worker holds a Redis lock and rebuilds, the rest
+   serve the previous value (or wait briefly when there is none)
+3. Refresh-ahead: entries close to expiry are rebuilt in the background while still served
+4. Order creation bumps the generation once in Redis (OrderManagementSystem owns the client),
+   so every worker sees new popularity on its next read
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env
+
+logger = logging.getLogger(__name__)
+
+POPULARITY_CACHE_TTL = safe_int_env('POPULARITY_CACHE_TTL', 900)
+# Entries younger than TTL minus this are fresh; older ones are served and rebuilt in the background
+POPULARITY_CACHE_REFRESH_AHEAD = safe_int_env('POPULARITY_CACHE_REFRESH_AHEAD', 180)
+POPULARITY_CACHE_LOCK_TIMEOUT = safe_int_env('POPULARITY_CACHE_LOCK_TIMEOUT', 30)
+# How long a request without any cached value waits for another worker's rebuild
+POPULARITY_CACHE_WAIT_MS = safe_int_env('POPULARITY_CACHE_WAIT_MS', 2000)
+POPULARITY_CACHE_PREFIX = "reco:popular:v1:"
+POPULARITY_GENERATION_KEY = "reco:popular:generation"
+
+# Compare-and-delete so a worker never releases a lock that expired and was re-acquired by another
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def invalidate_popularity_cache(redis_client, reason: str = "") -> bool:
+    """Mark every cached popularity entry stale with a single generation bump in Redis"""
+    if not redis_client:
+        return False
+    try:
+        redis_client.incr(POPULARITY_GENERATION_KEY)
+        logger.info(f"🔄 Popularity cache invalidated{f' ({reason})' if reason else ''}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Popularity cache invalidation failed: {e}")
+        return False
+
+
+class PopularityCache:
+    """Redis cache for popular-product rows with single-flight and refresh-ahead"""
+
+    def __init__(self, redis_client=None, ttl: int = POPULARITY_CACHE_TTL,
+                 refresh_ahead: int = POPULARITY_CACHE_REFRESH_AHEAD):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, max(ttl - 1, 0))
+        self._local_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="popularity-refresh")
+        self._stats = {
+            'hits': 0,
+            'stale_served': 0,
+            'misses': 0,
+            'recomputes': 0,
+            'background_refreshes': 0,
+            'waits': 0,
+            'invalidations': 0,
+            'redis_errors': 0,
+        }
+        self._release_lock = redis_client.register_script(_RELEASE_LOCK_SCRIPT) if redis_client else None
+
+    @staticmethod
+    def make_key(category: Optional[str], state: Optional[str], limit: int) -> str:
+        return f"{POPULARITY_CACHE_PREFIX}{(category or '*').lower()}:{state or '*'}:{limit}"
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._locks_guard:
+            self._stats[stat] += amount
+
+    def _local_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._local_locks.setdefault(key, threading.Lock())
+
+    def _read(self, key: str):
+        """One round trip for the entry and the current generation"""
+        raw, generation = self.redis_client.mget([key, POPULARITY_GENERATION_KEY])
+        return (json.loads(raw) if raw else None), int(generation or 0)
+
+    def _store(self, key: str, rows: List[Dict], generation: int):
+        entry = {'generation': generation, 'computed_at': time.time(), 'rows': rows}
+        self.redis_client.setex(key, self.ttl, json.dumps(entry, default=_json_default))
+
+    def _recompute(self, key: str, compute: Callable[[], List[Dict]], generation: int) -> List[Dict]:
+        # Round-trip through JSON so a fresh result looks exactly like a cached one
+        rows = json.loads(json.dumps(compute(), default=_json_default))
+        self._count('recomputes')
+        try:
+            self._store(key, rows, generation)
+        except Exception as e:
+            self._count('redis_errors')
+            logger.warning(f"⚠️ Popularity cache write failed: {e}")
+        return rows
+
+    def _try_lock(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.redis_client.set(f"{key}:lock", token, nx=True, ex=POPULARITY_CACHE_LOCK_TIMEOUT):
+            return token
+        return None
+
+    def _unlock(self, key: str, token: str):
+        try:
+            self._release_lock(keys=[f"{key}:lock"], args=[token])
+        except Exception as e:
+            logger.warning(f"⚠️ Popularity cache unlock failed: {e}")
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], List[Dict]], generation: int):
+        with self._locks_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                token = self._try_lock(key)
+                if token is None:
+                    return  # another worker is already rebuilding this entry
+                try:
+                    self._recompute(key, compute, generation)
+                    self._count('background_refreshes')
+                finally:
+                    self._unlock(key, token)
+            except Exception as e:
+                logger.warning(f"⚠️ Background popularity refresh failed for {key}: {e}")
+            finally:
+                with self._locks_guard:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def get_or_compute(self, category: Optional[str], state: Optional[str], limit: int,
+                       compute: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return cached rows for (category, state, limit), rebuilding them at most once at a time"""
+        if not self.redis_client:
+            return compute()
+
+        key = self.make_key(category, state, limit)
+        try:
+            entry, generation = self._read(key)
+        except Exception as e:
+            self._count('redis_errors')
+            logger.warning(f"⚠️ Popularity cache read failed: {e}")
+            return compute()
+
+        if entry and entry.get('generation') == generation:
+            age = time.time() - entry.get('computed_at', 0)
+            if age >= self.ttl - self.refresh_ahead:
+                self._refresh_in_background(key, compute, generation)
+            self._count('hits')
+            return entry['rows']
+
+        # Missing or built before the last invalidation: single-flight rebuild
+        with self._local_lock(key):
+            # Another thread in this process may have rebuilt it while we waited
+            try:
+                latest, generation = self._read(key)
+                if latest and latest.get('generation') == generation:
+                    self._count('hits')
+                    return latest['rows']
+                entry = latest or entry
+            except Exception:
+                pass
+
+            token = self._try_lock(key)
+            if token is not None:
+                try:
+                    self._count('misses')
+                    return self._recompute(key, compute, generation)
+                finally:
+                    self._unlock(key, token)
+
+            if entry:
+                # Another worker is rebuilding; the previous generation is good enough meanwhile
+                self._count('stale_served')
+                return entry['rows']
+
+            self._count('waits')
+            deadline = time.monotonic() + POPULARITY_CACHE_WAIT_MS / 1000.0
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    latest, generation = self._read(key)
+                except Exception:
+                    break
+                if latest and latest.get('generation') == generation:
+                    self._count('hits')
+                    return latest['rows']
+
+            # The other rebuild is slow or died; compute without caching rather than fail
+            self._count('misses')
+            return compute()
+
+    def invalidate(self, reason: str = ""):
+        """Mark every cached entry stale (entries are rebuilt lazily, one worker at a time)"""
+        self._count('invalidations')
+        if self.redis_client and not invalidate_popularity_cache(self.redis_client, reason):
+            self._count('redis_errors')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._locks_guard:
+            stats = dict(self._stats)
+            stats['refreshing'] = len(self._refreshing)
+        lookups = stats['hits'] + stats['stale_served'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_served']) / lookups, 4) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        stats['refresh_ahead'] = self.refresh_ahead
+        return stats
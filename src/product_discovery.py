@@ -15,7 +15,7 @@ import json
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -24,13 +24,6 @@ class ProductDiscoveryEngine:
     """Dynamically discovers and categorizes products from database"""
 
     def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'database': safe_str_env('DB_NAME', 'customer_support_agent'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', ''),
-            'port': safe_int_env('DB_PORT', 5432)
-        }
         self.product_map = {}
         self.category_map = {}
         self._discover_products()
@@ -38,7 +31,7 @@ class ProductDiscoveryEngine:
     def _discover_products(self):
         """Scan database to discover all available products and create smart mappings"""
         try:
-            conn = psycopg2.connect(**self.db_config)
+            conn = get_pooled_connection()
             cursor = conn.cursor(cursor_factory=RealDictCursor)
 
             # Get all products with their categories
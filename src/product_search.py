@@ -0,0 +1,129 @@
+"""
+🔎 Product Search Backend
+===============================================================================
+
+SQL for ProductRecommendationEngine.search_products:
+1. Full-text match on products.search_vector (weighted tsvector, GIN indexed, see
+   database/product_search.sql) OR a trigram word match on product_name
+   (idx_products_name_gin), so both whole words and typos/partial names hit an index
+2. Text rank = ts_rank_cd + trigram word_similarity, used after personal relevance
+3. Personalisation (favourite categories/brands) is passed as bound array parameters
+4. Falls back to the ILIKE scan when the search_vector column is not installed
+"""
+
+import time
+import logging
+import threading
+from typing import List, Optional, Sequence, Tuple
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_str_env
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_SEARCH_MODE = safe_str_env('PRODUCT_SEARCH_MODE', 'fulltext')  # 'fulltext' or 'ilike'
+SEARCH_RECHECK_INTERVAL = 300  # seconds between checks while search_vector is missing
+
+# Must match the text search config of products.search_vector in database/product_search.sql
+_SEARCH_TSQUERY = "websearch_to_tsquery('english'::regconfig, %s)"
+
+_PRODUCT_COLUMNS = """p.product_id, p.product_name, p.category, p.brand,
+                   p.price, p.description, p.stock_quantity, p.in_stock"""
+
+# Favourite category beats favourite brand beats everything else
+_RELEVANCE_SQL = """CASE
+                           WHEN p.category = ANY(%s) THEN 3.0
+                           WHEN p.brand = ANY(%s) THEN 2.0
+                           ELSE 1.0
+                       END"""
+
+
+class ProductSearchBackend:
+    """Builds the search_products query for the best index set available"""
+
+    def __init__(self, get_connection):
+        self.get_connection = get_connection
+        self._ready = False
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def fulltext_available(self) -> bool:
+        """True when products.search_vector exists (re-checked every few minutes if not)"""
+        if PRODUCT_SEARCH_MODE != 'fulltext':
+            return False
+        if self._ready or (self._checked_at is not None and
+                           time.monotonic() - self._checked_at < SEARCH_RECHECK_INTERVAL):
+            return self._ready
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                with self.get_connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("""
+                            SELECT EXISTS (
+                                SELECT 1 FROM information_schema.columns
+                                WHERE table_name = 'products' AND column_name = 'search_vector'
+                            )
+                        """)
+                        self._ready = bool(cursor.fetchone()[0])
+            except Exception as e:
+                logger.warning(f"⚠️ Could not check product search index: {e}")
+                self._ready = False
+            if not self._ready:
+                logger.info("ℹ️ products.search_vector not installed, product search uses ILIKE")
+        return self._ready
+
+    def build_query(self, query: Optional[str], category: Optional[str] = None,
+                    max_price: Optional[float] = None, limit: int = 20,
+                    favorite_categories: Sequence[str] = (), favorite_brands: Sequence[str] = (),
+                    popularity_join: str = "", popularity_expr: str = "0",
+                    fulltext: Optional[bool] = None) -> Tuple[str, List]:
+        """
+        SQL and parameters returning product columns plus popularity, relevance_score and text_rank.
+        ``fulltext`` forces the index set (benchmarks); by default it is detected.
+        """
+        query = (query or "").strip()
+        if fulltext is None:
+            fulltext = bool(query) and self.fulltext_available()
+        select_params: List = [list(favorite_categories), list(favorite_brands)]
+        conditions = ["p.in_stock = true", "p.stock_quantity > 0"]
+        params: List = []
+        text_rank = "0"
+
+        if query and fulltext:
+            text_rank = f"ts_rank_cd(p.search_vector, {_SEARCH_TSQUERY}) + word_similarity(%s, p.product_name)"
+            select_params.extend([query, query])
+            conditions.append(f"""(p.search_vector @@ {_SEARCH_TSQUERY}
+                             OR %s <%% p.product_name)""")
+            params.extend([query, query])
+        elif query:
+            conditions.append("""(p.product_name ILIKE %s OR p.description ILIKE %s
+                             OR p.brand ILIKE %s OR p.category ILIKE %s)""")
+            search_term = f"%{query}%"
+            params.extend([search_term, search_term, search_term, search_term])
+
+        # Category filter with flexible matching
+        if category:
+            conditions.append("(p.category ILIKE %s OR p.product_name ILIKE %s)")
+            params.extend([f"%{category}%", f"%{category}%"])
+
+        if max_price:
+            conditions.append("p.price <= %s")
+            params.append(max_price)
+
+        sql = f"""
+            SELECT {_PRODUCT_COLUMNS},
+                   {popularity_expr} as popularity,
+                   ({_RELEVANCE_SQL}) as relevance_score,
+                   ({text_rank}) as text_rank
+            FROM products p
+            {popularity_join}
+            WHERE {" AND ".join(conditions)}
+            GROUP BY p.product_id
+            ORDER BY relevance_score DESC, text_rank DESC, popularity DESC, p.price ASC
+            LIMIT %s
+        """
+        return sql, select_params + params + [limit]
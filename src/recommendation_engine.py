@@ -35,17 +35,43 @@ from psycopg2.extras import RealDictCursor
 import redis
 from collections import defaultdict, Counter
 import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection, safe_int_env, safe_str_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fan-out of the independent strategies in get_comprehensive_recommendations
+# ("concurrent" runs them on a shared thread pool, "sequential" keeps the old one-by-one order)
+RECOMMENDATION_FANOUT_MODE = safe_str_env('RECOMMENDATION_FANOUT_MODE', 'concurrent').lower()
+# Each worker holds at most one pooled DB connection, so keep this well below DB_POOL_MAX
+RECOMMENDATION_FANOUT_WORKERS = safe_int_env('RECOMMENDATION_FANOUT_WORKERS', 6)
+RECOMMENDATION_STRATEGY_TIMEOUT_MS = safe_int_env('RECOMMENDATION_STRATEGY_TIMEOUT_MS', 3000)
+
+# Read popularity/co-purchase counts from the rollup tables (database/recommendation_rollups.sql)
+# instead of aggregating orders per request; falls back automatically when they are not installed
+RECOMMENDATION_USE_ROLLUPS = safe_str_env('RECOMMENDATION_USE_ROLLUPS', 'true').lower() == 'true'
+ROLLUP_RECHECK_INTERVAL = 300  # seconds between checks while the rollup tables are missing
+
+try:
+    from .popularity_cache import PopularityCache
+    from .item_similarity import ItemSimilarityModel
+    from .customer_profile_cache import CustomerProfileCache
+    from .product_search import ProductSearchBackend
+except ImportError:
+    from popularity_cache import PopularityCache
+    from item_similarity import ItemSimilarityModel
+    from customer_profile_cache import CustomerProfileCache
+    from product_search import ProductSearchBackend
+
 class RecommendationType(Enum):
     """Types of recommendations we can generate"""
     COLLABORATIVE_FILTERING = "collaborative_filtering"
@@ -178,14 +204,6 @@ class ProductRecommendationEngine:
     """🎯 Advanced Product Recommendation Engine"""
 
     def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
-
         # Initialize Redis for caching recommendations
         try:
             # Safe Redis port parsing - handle secret names and invalid values
@@ -215,20 +233,109 @@ class ProductRecommendationEngine:
 
         self.market_intelligence = NigerianMarketIntelligence()
 
+        # Popular/regional products are the same for every customer, so they are shared via Redis
+        self.popularity_cache = PopularityCache(redis_client=self.redis_client)
+
+        # Profiles are reused within a request and for a short TTL across workers
+        self.profile_cache = CustomerProfileCache(CustomerProfile, redis_client=self.redis_client)
+
+        # Full-text/trigram search SQL for search_products
+        self.search_backend = ProductSearchBackend(self.get_database_connection)
+
+        # Precomputed item-item neighbours (memory-mapped, see scripts/build_item_similarity.py)
+        self.item_similarity = ItemSimilarityModel()
+
+        # Rollup table availability (checked lazily, see _rollups_available)
+        self._rollups_ready = False
+        self._rollups_checked_at = None
+
         # Cache for browsing behavior
         self.browsing_cache = {}
 
+        # Shared pool for concurrent strategy fan-out (created on first use)
+        self._fanout_executor = None
+        self._fanout_lock = threading.Lock()
+        # Deadline of the strategy running on the current fan-out thread (see get_database_connection)
+        self._strategy_scope = threading.local()
+        self._fanout_stats = {
+            'requests': 0,
+            'timeouts': defaultdict(int),
+            'errors': defaultdict(int),
+            'total_ms': defaultdict(float),
+            'completed': defaultdict(int),
+        }
+
     def get_database_connection(self):
-        """Get database connection"""
+        """
+        Get a connection from the shared process-wide pool. Inside a concurrent strategy the
+        transaction gets a statement_timeout for the time left before the fan-out deadline,
+        so a strategy that timed out is cancelled by PostgreSQL instead of holding its
+        worker thread and connection.
+        """
         try:
-            conn = psycopg2.connect(**self.db_config)
+            deadline = getattr(self._strategy_scope, 'deadline', None)
+            if deadline is None:
+                return get_pooled_connection()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("recommendation strategy deadline passed")
+            conn = get_pooled_connection(timeout=remaining)
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(remaining * 1000)),))
+            except Exception:
+                conn.close()
+                raise
             return conn
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
             raise Exception(f"Database connection failed: {e}")
 
+    def _rollups_available(self) -> bool:
+        """True when product_popularity/product_copurchase exist (re-checked every few minutes if not)"""
+        if not RECOMMENDATION_USE_ROLLUPS:
+            return False
+        if self._rollups_ready or (self._rollups_checked_at is not None and
+                                   time.monotonic() - self._rollups_checked_at < ROLLUP_RECHECK_INTERVAL):
+            return self._rollups_ready
+        self._rollups_checked_at = time.monotonic()
+        try:
+            with self.get_database_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT to_regclass('product_popularity') IS NOT NULL
+                           AND to_regclass('product_copurchase') IS NOT NULL
+                    """)
+                    self._rollups_ready = bool(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not check recommendation rollup tables: {e}")
+            self._rollups_ready = False
+        if not self._rollups_ready:
+            logger.info("ℹ️ Recommendation rollup tables not installed, aggregating orders per request")
+        return self._rollups_ready
+
+    def _popularity_source(self, recent: bool = False) -> Tuple[str, str]:
+        """
+        (JOIN clause, aggregate expression) for a per-product order count, used inside
+        queries grouped by product: an indexed rollup lookup, or the live orders aggregate.
+        Call it before checking out the query's connection: the first rollup check uses its own.
+        """
+        if self._rollups_available():
+            column = 'last_30d_count' if recent else 'order_count'
+            return ("LEFT JOIN product_popularity pp ON pp.product_id = p.product_id AND pp.state = 'ALL'",
+                    f"COALESCE(MAX(pp.{column}), 0)")
+        join = "LEFT JOIN orders o ON p.product_id = o.product_id"
+        if recent:
+            join += " AND o.created_at >= CURRENT_DATE - INTERVAL '30 days'"
+        return join, "COUNT(o.order_id)"
+
     def get_customer_profile(self, customer_id: int) -> CustomerProfile:
-        """🔍 Build comprehensive customer profile for recommendations"""
+        """🔍 Customer profile for recommendations (cached, see customer_profile_cache)"""
+        return self.profile_cache.get_or_load(customer_id, self._build_customer_profile)
+
+    def _build_customer_profile(self, customer_id: int) -> CustomerProfile:
+        """Build comprehensive customer profile for recommendations"""
         try:
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
@@ -245,7 +352,7 @@ class ProductRecommendationEngine:
 
                     # Get order history with product details
                     cursor.execute("""
-                        SELECT o.order_id, o.total_amount, o.created_at, o.product_category,
+                        SELECT o.order_id, o.product_id, o.total_amount, o.created_at, o.product_category,
                                p.product_name, p.category, p.brand, p.price
                         FROM orders o
                         LEFT JOIN products p ON o.product_id = p.product_id
@@ -293,72 +400,114 @@ class ProductRecommendationEngine:
             logger.error(f"❌ Error building customer profile: {e}")
             raise
 
+    def _query_popular_products(self, limit: int, category: str = None,
+                                state: str = None) -> List[Dict]:
+        """Popular-products aggregate straight from PostgreSQL (see popularity_cache)"""
+        if self._rollups_available():
+            return self._query_popular_products_rollup(limit, category=category, state=state)
+
+        with self.get_database_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Build dynamic query
+                base_query = """
+                    SELECT p.product_id, p.product_name, p.category, p.brand,
+                           p.price, p.description, p.stock_quantity, p.in_stock,
+                           COUNT(o.order_id) as order_count,
+                           AVG(o.total_amount) as avg_order_value
+                    FROM products p
+                    LEFT JOIN orders o ON p.product_id = o.product_id
+                    WHERE p.in_stock = true AND p.stock_quantity > 0
+                """
+
+                params = []
+
+                if category:
+                    base_query += " AND (p.category ILIKE %s OR p.product_name ILIKE %s)"
+                    params.extend([f"%{category}%", f"%{category}%"])
+
+                if state:
+                    # Add regional filtering through customer location
+                    base_query += """
+                        AND EXISTS (
+                            SELECT 1 FROM orders o2
+                            JOIN customers c ON o2.customer_id = c.customer_id
+                            WHERE o2.product_id = p.product_id AND c.state = %s
+                        )
+                    """
+                    params.append(state)
+
+                base_query += """
+                    GROUP BY p.product_id, p.product_name, p.category, p.brand,
+                             p.price, p.description, p.stock_quantity, p.in_stock
+                    ORDER BY order_count DESC, p.price ASC
+                    LIMIT %s
+                """
+                params.append(limit)
+
+                cursor.execute(base_query, params)
+                return [dict(row) for row in cursor.fetchall()]
+
+    def _query_popular_products_rollup(self, limit: int, category: str = None,
+                                       state: str = None) -> List[Dict]:
+        """Popular products from product_popularity (index scan on (state, order_count DESC))"""
+        # A state filter keeps only products ordered from that state, like the EXISTS in the live query
+        join = "JOIN" if state else "LEFT JOIN"
+        query = f"""
+            SELECT p.product_id, p.product_name, p.category, p.brand,
+                   p.price, p.description, p.stock_quantity, p.in_stock,
+                   COALESCE(pp.order_count, 0) as order_count,
+                   NULL::numeric as avg_order_value
+            FROM products p
+            {join} product_popularity pp ON pp.product_id = p.product_id AND pp.state = %s
+            WHERE p.in_stock = true AND p.stock_quantity > 0
+        """
+        params = [state or 'ALL']
+
+        if category:
+            query += " AND (p.category ILIKE %s OR p.product_name ILIKE %s)"
+            params.extend([f"%{category}%", f"%{category}%"])
+
+        query += """
+            ORDER BY order_count DESC, p.price ASC
+            LIMIT %s
+        """
+        params.append(limit)
+
+        with self.get_database_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                return [dict(row) for row in cursor.fetchall()]
+
     def get_popular_products(self, limit: int = 20, category: str = None,
                            state: str = None) -> List[RecommendationResult]:
         """📈 Get popular products with regional and category filtering"""
         try:
-            with self.get_database_connection() as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    # Build dynamic query
-                    base_query = """
-                        SELECT p.product_id, p.product_name, p.category, p.brand,
-                               p.price, p.description, p.stock_quantity, p.in_stock,
-                               COUNT(o.order_id) as order_count,
-                               AVG(o.total_amount) as avg_order_value
-                        FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
-                        WHERE p.in_stock = true AND p.stock_quantity > 0
-                    """
-
-                    params = []
-
-                    if category:
-                        base_query += " AND (p.category ILIKE %s OR p.product_name ILIKE %s)"
-                        params.extend([f"%{category}%", f"%{category}%"])
-
-                    if state:
-                        # Add regional filtering through customer location
-                        base_query += """
-                            AND EXISTS (
-                                SELECT 1 FROM orders o2
-                                JOIN customers c ON o2.customer_id = c.customer_id
-                                WHERE o2.product_id = p.product_id AND c.state = %s
-                            )
-                        """
-                        params.append(state)
-
-                    base_query += """
-                        GROUP BY p.product_id, p.product_name, p.category, p.brand,
-                                 p.price, p.description, p.stock_quantity, p.in_stock
-                        ORDER BY order_count DESC, p.price ASC
-                        LIMIT %s
-                    """
-                    params.append(limit)
-
-                    cursor.execute(base_query, params)
-                    products = cursor.fetchall()
-
-                    recommendations = []
-                    for product in products:
-                        stock_status = self._get_stock_status(product['stock_quantity'])
+            products = self.popularity_cache.get_or_compute(
+                category, state, limit,
+                lambda: self._query_popular_products(limit, category=category, state=state)
+            )
 
-                        recommendations.append(RecommendationResult(
-                            product_id=product['product_id'],
-                            product_name=product['product_name'],
-                            category=product['category'],
-                            brand=product['brand'],
-                            price=float(product['price']),
-                            price_formatted=self._format_naira(product['price']),
-                            description=product['description'] or "",
-                            stock_quantity=product['stock_quantity'],
-                            stock_status=stock_status,
-                            recommendation_score=float(product['order_count'] or 0),
-                            recommendation_reason=f"Popular choice • {product['order_count'] or 0} orders",
-                            recommendation_type=RecommendationType.POPULAR_PRODUCTS,
-                            regional_popularity=product['order_count'] or 0
-                        ))
+            recommendations = []
+            for product in products:
+                stock_status = self._get_stock_status(product['stock_quantity'])
+
+                recommendations.append(RecommendationResult(
+                    product_id=product['product_id'],
+                    product_name=product['product_name'],
+                    category=product['category'],
+                    brand=product['brand'],
+                    price=float(product['price']),
+                    price_formatted=self._format_naira(product['price']),
+                    description=product['description'] or "",
+                    stock_quantity=product['stock_quantity'],
+                    stock_status=stock_status,
+                    recommendation_score=float(product['order_count'] or 0),
+                    recommendation_reason=f"Popular choice • {product['order_count'] or 0} orders",
+                    recommendation_type=RecommendationType.POPULAR_PRODUCTS,
+                    regional_popularity=product['order_count'] or 0
+                ))
 
-                    return recommendations
+            return recommendations
 
         except Exception as e:
             logger.error(f"❌ Error getting popular products: {e}")
@@ -371,6 +520,7 @@ class ProductRecommendationEngine:
             if not customer_profile.order_history:
                 return []
 
+            use_rollups = self._rollups_available()
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     # Get products bought by similar customers
@@ -380,38 +530,75 @@ class ProductRecommendationEngine:
                     if not customer_product_ids:
                         return []
 
-                    # Find customers who bought similar products
-                    cursor.execute("""
-                        WITH similar_customers AS (
-                            SELECT o.customer_id, COUNT(*) as shared_products
-                            FROM orders o
-                            WHERE o.product_id = ANY(%s)
-                            AND o.customer_id != %s
-                            GROUP BY o.customer_id
-                            HAVING COUNT(*) >= 1
-                            ORDER BY shared_products DESC
-                            LIMIT 20
-                        ),
-                        recommended_products AS (
+                    products = None
+                    if self.item_similarity.is_ready():
+                        # Neighbours are ranked in-process; only the shortlist's details come from the database
+                        ranked = self.item_similarity.recommend(customer_product_ids, limit=limit * 2)
+                        if ranked:
+                            cursor.execute("""
+                                SELECT p.product_id, p.product_name, p.category, p.brand,
+                                       p.price, p.description, p.stock_quantity, p.in_stock
+                                FROM products p
+                                WHERE p.product_id = ANY(%s)
+                                AND p.in_stock = true AND p.stock_quantity > 0
+                            """, ([product_id for product_id, _ in ranked],))
+                            details = {row['product_id']: row for row in cursor.fetchall()}
+                            # All neighbours out of stock or delisted: fall through to the SQL strategies
+                            products = [dict(details[product_id], recommendation_score=score)
+                                        for product_id, score in ranked if product_id in details][:limit] or None
+
+                    if products is None and use_rollups:
+                        # Customers who bought X also bought Y, straight from the co-purchase rollup
+                        cursor.execute("""
                             SELECT p.product_id, p.product_name, p.category, p.brand,
                                    p.price, p.description, p.stock_quantity, p.in_stock,
-                                   COUNT(o.order_id) as recommendation_score,
-                                   sc.shared_products
-                            FROM similar_customers sc
-                            JOIN orders o ON sc.customer_id = o.customer_id
-                            JOIN products p ON o.product_id = p.product_id
-                            WHERE p.product_id != ALL(%s)  -- Exclude already purchased
+                                   SUM(pc.weight) as recommendation_score,
+                                   COUNT(*) as shared_products
+                            FROM product_copurchase pc
+                            JOIN products p ON p.product_id = pc.product_b
+                            WHERE pc.product_a = ANY(%s)
+                            AND pc.product_b != ALL(%s)  -- Exclude already purchased
                             AND p.in_stock = true AND p.stock_quantity > 0
                             GROUP BY p.product_id, p.product_name, p.category, p.brand,
-                                     p.price, p.description, p.stock_quantity, p.in_stock, sc.shared_products
-                            ORDER BY recommendation_score DESC, sc.shared_products DESC
+                                     p.price, p.description, p.stock_quantity, p.in_stock
+                            ORDER BY recommendation_score DESC, shared_products DESC
                             LIMIT %s
-                        )
-                        SELECT * FROM recommended_products
-                    """, (customer_product_ids, customer_profile.customer_id,
-                          customer_product_ids, limit))
+                        """, (customer_product_ids, customer_product_ids, limit))
+                        products = cursor.fetchall()
 
-                    products = cursor.fetchall()
+                    # Find customers who bought similar products
+                    if products is None:
+                        cursor.execute("""
+                            WITH similar_customers AS (
+                                SELECT o.customer_id, COUNT(*) as shared_products
+                                FROM orders o
+                                WHERE o.product_id = ANY(%s)
+                                AND o.customer_id != %s
+                                GROUP BY o.customer_id
+                                HAVING COUNT(*) >= 1
+                                ORDER BY shared_products DESC
+                                LIMIT 20
+                            ),
+                            recommended_products AS (
+                                SELECT p.product_id, p.product_name, p.category, p.brand,
+                                       p.price, p.description, p.stock_quantity, p.in_stock,
+                                       COUNT(o.order_id) as recommendation_score,
+                                       sc.shared_products
+                                FROM similar_customers sc
+                                JOIN orders o ON sc.customer_id = o.customer_id
+                                JOIN products p ON o.product_id = p.product_id
+                                WHERE p.product_id != ALL(%s)  -- Exclude already purchased
+                                AND p.in_stock = true AND p.stock_quantity > 0
+                                GROUP BY p.product_id, p.product_name, p.category, p.brand,
+                                         p.price, p.description, p.stock_quantity, p.in_stock, sc.shared_products
+                                ORDER BY recommendation_score DESC, sc.shared_products DESC
+                                LIMIT %s
+                            )
+                            SELECT * FROM recommended_products
+                        """, (customer_product_ids, customer_profile.customer_id,
+                              customer_product_ids, limit))
+
+                        products = cursor.fetchall()
 
                     recommendations = []
                     for product in products:
@@ -445,6 +632,7 @@ class ProductRecommendationEngine:
             if not customer_profile.favorite_categories and not customer_profile.favorite_brands:
                 return []
 
+            popularity_join, popularity_expr = self._popularity_source()
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     # Get customer's purchased product IDs to exclude
@@ -488,9 +676,9 @@ class ProductRecommendationEngine:
                                    WHEN p.brand = ANY(%s) THEN 1.5
                                    ELSE 1.0
                                END as content_score,
-                               COUNT(o.order_id) as popularity_score
+                               {popularity_expr} as popularity_score
                         FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
+                        {popularity_join}
                         WHERE ({where_clause})
                         AND p.in_stock = true AND p.stock_quantity > 0
                         {exclude_clause}
@@ -606,6 +794,7 @@ class ProductRecommendationEngine:
 
             trending_categories = list(seasonal_boost.keys())
 
+            popularity_join, popularity_expr = self._popularity_source(recent=True)
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     placeholders = ','.join(['%s'] * len(trending_categories))
@@ -613,10 +802,9 @@ class ProductRecommendationEngine:
                     cursor.execute(f"""
                         SELECT p.product_id, p.product_name, p.category, p.brand,
                                p.price, p.description, p.stock_quantity, p.in_stock,
-                               COUNT(o.order_id) as recent_orders
+                               {popularity_expr} as recent_orders
                         FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
-                            AND o.created_at >= CURRENT_DATE - INTERVAL '30 days'
+                        {popularity_join}
                         WHERE p.category IN ({placeholders})
                         AND p.in_stock = true AND p.stock_quantity > 0
                         GROUP BY p.product_id, p.product_name, p.category, p.brand,
@@ -656,40 +844,127 @@ class ProductRecommendationEngine:
             logger.error(f"❌ Error in seasonal recommendations: {e}")
             return []
 
+    def _get_fanout_executor(self) -> ThreadPoolExecutor:
+        if self._fanout_executor is None:
+            with self._fanout_lock:
+                if self._fanout_executor is None:
+                    self._fanout_executor = ThreadPoolExecutor(
+                        max_workers=max(1, RECOMMENDATION_FANOUT_WORKERS),
+                        thread_name_prefix="recommendation-fanout"
+                    )
+        return self._fanout_executor
+
+    def _timed_strategy(self, name: str, deadline: Optional[float], strategy,
+                        *args, **kwargs) -> List[RecommendationResult]:
+        started = time.perf_counter()
+        self._strategy_scope.deadline = deadline
+        try:
+            return strategy(*args, **kwargs)
+        finally:
+            self._strategy_scope.deadline = None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._fanout_lock:
+                self._fanout_stats['completed'][name] += 1
+                self._fanout_stats['total_ms'][name] += elapsed_ms
+
+    def _run_strategies(self, strategies: Dict[str, tuple], concurrent: bool,
+                        timeout_s: float) -> Dict[str, List[RecommendationResult]]:
+        """
+        Run ``{name: (callable, args, kwargs)}`` and return ``{name: results}``.
+        In concurrent mode a strategy that misses the deadline contributes [] (partial results)
+        """
+        if not concurrent:
+            return {name: self._timed_strategy(name, None, strategy, *args, **kwargs)
+                    for name, (strategy, args, kwargs) in strategies.items()}
+
+        executor = self._get_fanout_executor()
+        deadline = time.monotonic() + timeout_s
+        futures = {
+            executor.submit(self._timed_strategy, name, deadline, strategy, *args, **kwargs): name
+            for name, (strategy, args, kwargs) in strategies.items()
+        }
+        done, not_done = wait(futures, timeout=timeout_s)
+
+        results = {}
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"❌ Recommendation strategy '{name}' failed: {e}")
+                with self._fanout_lock:
+                    self._fanout_stats['errors'][name] += 1
+                results[name] = []
+        for future in not_done:
+            name = futures[future]
+            # Queued strategies are dropped; running ones are stopped by their statement_timeout
+            future.cancel()
+            logger.warning(f"⚠️ Recommendation strategy '{name}' timed out after {timeout_s:.1f}s")
+            with self._fanout_lock:
+                self._fanout_stats['timeouts'][name] += 1
+            results[name] = []
+        return results
+
+    def get_fanout_stats(self) -> Dict[str, Any]:
+        """Per-strategy completion counts, average latency, timeouts and errors"""
+        with self._fanout_lock:
+            completed = dict(self._fanout_stats['completed'])
+            return {
+                'mode': RECOMMENDATION_FANOUT_MODE,
+                'workers': RECOMMENDATION_FANOUT_WORKERS,
+                'timeout_ms': RECOMMENDATION_STRATEGY_TIMEOUT_MS,
+                'requests': self._fanout_stats['requests'],
+                'completed': completed,
+                'avg_ms': {name: round(self._fanout_stats['total_ms'][name] / count, 2)
+                           for name, count in completed.items() if count},
+                'timeouts': dict(self._fanout_stats['timeouts']),
+                'errors': dict(self._fanout_stats['errors']),
+            }
+
     def get_comprehensive_recommendations(self, customer_id: int,
-                                        limit: int = 20) -> Dict[str, List[RecommendationResult]]:
-        """🎯 Get comprehensive recommendations using all algorithms"""
+                                        limit: int = 20, concurrent: bool = None,
+                                        timeout: float = None) -> Dict[str, List[RecommendationResult]]:
+        """
+        🎯 Get comprehensive recommendations using all algorithms
+
+        The strategies are independent, so by default they run in parallel on pooled
+        connections; latency is bounded by the slowest one (or ``timeout`` seconds, after
+        which late strategies return no results instead of blocking the response).
+        """
         try:
             # Build customer profile
             customer_profile = self.get_customer_profile(customer_id)
 
+            if concurrent is None:
+                concurrent = RECOMMENDATION_FANOUT_MODE == 'concurrent'
+            if timeout is None:
+                timeout = RECOMMENDATION_STRATEGY_TIMEOUT_MS / 1000.0
+            with self._fanout_lock:
+                self._fanout_stats['requests'] += 1
+
+            strategy_results = self._run_strategies({
+                # Collaborative filtering + content based (personalized)
+                'collaborative': (self.get_collaborative_recommendations, (customer_profile,), {'limit': 5}),
+                'content_based': (self.get_content_based_recommendations, (customer_profile,), {'limit': 5}),
+                # Popular products
+                'popular': (self.get_popular_products, (), {'limit': 6}),
+                # Seasonal trending
+                'seasonal': (self.get_seasonal_recommendations, (customer_profile,), {'limit': 6}),
+                # Tier progression
+                'tier_progression': (self.get_tier_progression_recommendations, (customer_profile,), {'limit': 4}),
+                # Regional favorites
+                'regional': (self.get_popular_products, (), {'limit': 6, 'state': customer_profile.state}),
+            }, concurrent=concurrent, timeout_s=timeout)
+
             # Get different types of recommendations
             recommendations = {
-                "for_you": [],
-                "popular": [],
-                "trending": [],
-                "upgrade_tier": [],
-                "regional_favorites": []
+                "for_you": strategy_results['collaborative'] + strategy_results['content_based'],
+                "popular": strategy_results['popular'],
+                "trending": strategy_results['seasonal'],
+                "upgrade_tier": strategy_results['tier_progression'],
+                "regional_favorites": strategy_results['regional']
             }
 
-            # Collaborative filtering (personalized)
-            collab_recs = self.get_collaborative_recommendations(customer_profile, limit=5)
-            content_recs = self.get_content_based_recommendations(customer_profile, limit=5)
-            recommendations["for_you"] = collab_recs + content_recs
-
-            # Popular products
-            recommendations["popular"] = self.get_popular_products(limit=6)
-
-            # Seasonal trending
-            recommendations["trending"] = self.get_seasonal_recommendations(customer_profile, limit=6)
-
-            # Tier progression
-            recommendations["upgrade_tier"] = self.get_tier_progression_recommendations(customer_profile, limit=4)
-
-            # Regional favorites
-            recommendations["regional_favorites"] = self.get_popular_products(
-                limit=6, state=customer_profile.state)
-
             # Sort all recommendations by score
             for category in recommendations:
                 recommendations[category] = sorted(
@@ -716,65 +991,26 @@ class ProductRecommendationEngine:
                        limit: int = 20) -> List[RecommendationResult]:
         """🔍 Smart Product Search with personalization"""
         try:
+            # Profile and index checks may take their own pooled connections, so they run first
+            # Personalisation boosts are bound as parameters, not interpolated into the SQL
+            favorite_categories, favorite_brands = [], []
+            if customer_id:
+                try:
+                    customer_profile = self.get_customer_profile(customer_id)
+                    favorite_categories = customer_profile.favorite_categories
+                    favorite_brands = customer_profile.favorite_brands
+                except Exception:
+                    pass  # Use default relevance if profile fails
+
+            popularity_join, popularity_expr = self._popularity_source()
+            sql, params = self.search_backend.build_query(
+                query, category=category, max_price=max_price, limit=limit,
+                favorite_categories=favorite_categories, favorite_brands=favorite_brands,
+                popularity_join=popularity_join, popularity_expr=popularity_expr
+            )
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    # Build search query
-                    search_conditions = ["p.in_stock = true", "p.stock_quantity > 0"]
-                    params = []
-
-                    # Text search
-                    if query:
-                        search_conditions.append("""
-                            (p.product_name ILIKE %s OR p.description ILIKE %s
-                             OR p.brand ILIKE %s OR p.category ILIKE %s)
-                        """)
-                        search_term = f"%{query}%"
-                        params.extend([search_term, search_term, search_term, search_term])
-
-                    # Category filter with flexible matching
-                    if category:
-                        search_conditions.append("(p.category ILIKE %s OR p.product_name ILIKE %s)")
-                        params.extend([f"%{category}%", f"%{category}%"])
-
-                    # Price filter
-                    if max_price:
-                        search_conditions.append("p.price <= %s")
-                        params.append(max_price)
-
-                    where_clause = " AND ".join(search_conditions)
-
-                    # Get customer profile for personalization
-                    relevance_score = "1.0"
-                    if customer_id:
-                        try:
-                            customer_profile = self.get_customer_profile(customer_id)
-                            # Boost score for favorite categories and brands
-                            favorite_categories = "', '".join(customer_profile.favorite_categories)
-                            favorite_brands = "', '".join(customer_profile.favorite_brands)
-
-                            relevance_score = f"""
-                                CASE
-                                    WHEN p.category IN ('{favorite_categories}') THEN 3.0
-                                    WHEN p.brand IN ('{favorite_brands}') THEN 2.0
-                                    ELSE 1.0
-                                END
-                            """
-                        except:
-                            pass  # Use default relevance if profile fails
-
-                    cursor.execute(f"""
-                        SELECT p.product_id, p.product_name, p.category, p.brand,
-                               p.price, p.description, p.stock_quantity, p.in_stock,
-                               COUNT(o.order_id) as popularity,
-                               ({relevance_score}) as relevance_score
-                        FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
-                        WHERE {where_clause}
-                        GROUP BY p.product_id, p.product_name, p.category, p.brand,
-                                 p.price, p.description, p.stock_quantity, p.in_stock
-                        ORDER BY relevance_score DESC, popularity DESC, p.price ASC
-                        LIMIT %s
-                    """, params + [limit])
+                    cursor.execute(sql, params)
 
                     products = cursor.fetchall()
 
@@ -1091,6 +1327,7 @@ class ProductRecommendationEngine:
                                            price_filter: str = "any", limit: int = 8) -> List[RecommendationResult]:
         """🔄 Similar products recommendations"""
         try:
+            popularity_join, popularity_expr = self._popularity_source()
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
@@ -1121,7 +1358,7 @@ class ProductRecommendationEngine:
                     cursor.execute(f"""
                         SELECT p.product_id, p.product_name, p.category, p.brand,
                                p.price, p.description, p.stock_quantity, p.in_stock,
-                               COUNT(o.order_id) as popularity,
+                               {popularity_expr} as popularity,
                                CASE
                                    WHEN p.category = %s AND p.brand = %s THEN 3.0
                                    WHEN p.category = %s THEN 2.0
@@ -1129,7 +1366,7 @@ class ProductRecommendationEngine:
                                    ELSE 1.0
                                END as similarity_score
                         FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
+                        {popularity_join}
                         WHERE p.product_id != %s
                         AND p.in_stock = true AND p.stock_quantity > 0
                         {price_condition}
@@ -1285,20 +1522,20 @@ class ProductRecommendationEngine:
     def _get_highly_rated_products(self, category: str, limit: int) -> List[RecommendationResult]:
         """⭐ Get highly-rated products in a category"""
         try:
+            popularity_join, popularity_expr = self._popularity_source()
             with self.get_database_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-
-                    cursor.execute("""
+                    cursor.execute(f"""
                         SELECT p.product_id, p.product_name, p.category, p.brand,
                                p.price, p.description, p.stock_quantity, p.in_stock,
-                               COUNT(o.order_id) as order_count
+                               {popularity_expr} as order_count
                         FROM products p
-                        LEFT JOIN orders o ON p.product_id = o.product_id
+                        {popularity_join}
                         WHERE (p.category ILIKE %s OR p.product_name ILIKE %s)
                         AND p.in_stock = true AND p.stock_quantity > 0
                         GROUP BY p.product_id, p.product_name, p.category, p.brand,
                                  p.price, p.description, p.stock_quantity, p.in_stock
-                        HAVING COUNT(o.order_id) >= 3  -- At least 3 orders (indicates reliability)
+                        HAVING {popularity_expr} >= 3  -- At least 3 orders (indicates reliability)
                         ORDER BY order_count DESC
                         LIMIT %s
                     """, (f"%{category}%", f"%{category}%", limit))
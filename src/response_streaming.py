@@ -0,0 +1,166 @@
+"""
+📡 Streaming Response Helpers
+===============================================================================
+
+Support for forwarding Groq completion deltas to the web client as they arrive:
+1. IncrementalMarkdownStripper - applies the ``_strip_markdown_formatting`` rules
+   chunk by chunk, holding back only the text that could still change
+2. relay_completion_stream - drives a ``stream=True`` Groq completion
+3. format_sse - Server-Sent Events framing
+"""
+
+import re
+import json
+from typing import Any, Callable, Optional, Tuple
+
+# Same rules, in the same order, as EnhancedDatabaseQuerying._strip_markdown_formatting
+CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+BLOCKQUOTE_RE = re.compile(r'^>\s+(.+)$', re.MULTILINE)
+BULLET_RE = re.compile(r'^[-*+]\s+(.+)$', re.MULTILINE)
+NUMBERED_RE = re.compile(r'^\d+\.\s+(.+)$', re.MULTILINE)
+EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+SPACES_RE = re.compile(r'[ \t]+')
+
+# Text that a later delta could still turn into a link
+UNFINISHED_LINK_RE = re.compile(r'\[[^\]]*\Z|\[[^\]]+\]\Z|\[[^\]]+\]\([^)]*\Z')
+# A last line that a later delta could still turn into a blockquote or list item
+UNDECIDED_QUOTE_RE = re.compile(r'^>\s*\Z', re.MULTILINE)
+UNDECIDED_LIST_RE = re.compile(r'^(?:[-*+]|\d+\.?)\s*\Z', re.MULTILINE)
+
+# Marks a segment that starts in the middle of a line, so ^ does not match there
+MID_LINE = "\x00"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Frame ``data`` (JSON encoded) as a single Server-Sent Event"""
+    payload = json.dumps(data, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def relay_completion_stream(stream, on_token: Callable[[str], None]) -> Tuple[str, int]:
+    """
+    Forward streamed completion deltas to ``on_token`` after incremental markdown stripping.
+    Returns the raw completion text and the total tokens reported by Groq (0 if absent).
+    """
+    stripper = IncrementalMarkdownStripper()
+    raw_parts = []
+    total_tokens = 0
+    for chunk in stream:
+        # Groq reports usage on the final chunk under x_groq
+        usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None) or getattr(chunk, 'usage', None)
+        if usage is not None:
+            total_tokens = getattr(usage, 'total_tokens', 0) or total_tokens
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        raw_parts.append(delta)
+        cleaned = stripper.feed(delta)
+        if cleaned:
+            on_token(cleaned)
+    remainder = stripper.flush()
+    if remainder:
+        on_token(remainder)
+    return "".join(raw_parts).strip(), total_tokens
+
+
+class IncrementalMarkdownStripper:
+    """
+    Strip markdown from a token stream without waiting for the full completion.
+
+    Raw text is released only up to a cut point where none of the rules can still match
+    across the cut (closed code fences and inline code, no half-written link, no line that
+    may still become a list item or blockquote, no trailing backticks or spaces). The
+    released segment goes through exactly the same substitutions as the full text would,
+    so the concatenated output equals ``_strip_markdown_formatting`` of the whole completion.
+    Newline collapsing and the final strip() are applied on the way out.
+    """
+
+    def __init__(self):
+        self._pending = ""          # raw text not yet released
+        self._mid_line = False      # _pending starts in the middle of a line
+        self._held_space = ""       # trailing whitespace of the output, resolved by the next text
+        self._emitted_any = False
+
+    def feed(self, delta: Optional[str]) -> str:
+        """Add a completion delta and return the cleaned text that is now safe to display"""
+        if not delta:
+            return ""
+        self._pending += delta
+        cut = self._safe_cut()
+        if not cut:
+            return ""
+        segment, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._emit(self._convert(segment))
+
+    def flush(self) -> str:
+        """Emit whatever is still held back once the stream has ended"""
+        out = self._emit(self._convert(self._pending)) if self._pending else ""
+        self._pending = ""
+        self._held_space = ""  # trailing whitespace is stripped from the full response
+        return out
+
+    def _convert(self, segment: str) -> str:
+        """The per-segment substitutions of _strip_markdown_formatting (all but newlines/strip)"""
+        text = (MID_LINE if self._mid_line else "") + segment
+        text = CODE_BLOCK_RE.sub("", text)
+        text = INLINE_CODE_RE.sub(r"\1", text)
+        text = LINK_RE.sub(r"\1", text)
+        starts_mid_line = self._mid_line
+        # Line anchors see the text after code and link removal (a link may span lines)
+        if text.lstrip(MID_LINE):
+            self._mid_line = not text.endswith("\n")
+        text = BLOCKQUOTE_RE.sub(r"\1", text)
+        text = BULLET_RE.sub(r"• \1", text)
+        text = NUMBERED_RE.sub(r"• \1", text)
+        text = SPACES_RE.sub(" ", text)
+        return text[1:] if starts_mid_line else text
+
+    def _is_safe_cut(self, segment: str) -> bool:
+        """True when no rule applied to the whole text could match across the end of ``segment``"""
+        if not segment or segment[-1] in " \t`":
+            return False
+        text = (MID_LINE if self._mid_line else "") + segment
+        text = CODE_BLOCK_RE.sub("", text)
+        if "```" in text:
+            return False
+        text = INLINE_CODE_RE.sub(r"\1", text)
+        if "`" in text:
+            return False
+        if UNFINISHED_LINK_RE.search(text):
+            return False
+        text = LINK_RE.sub(r"\1", text)
+        if UNDECIDED_QUOTE_RE.search(text):
+            return False
+        text = BLOCKQUOTE_RE.sub(r"\1", text)
+        return not UNDECIDED_LIST_RE.search(text)
+
+    def _safe_cut(self) -> int:
+        """Longest prefix of the pending text that can be released now (0 = wait)"""
+        text = self._pending
+        candidates = {
+            len(text),
+            text.rfind("`"),
+            text.rfind("["),
+            text.rfind("\n") + 1,
+        }
+        for cut in sorted(candidates, reverse=True):
+            cut = len(text[:max(cut, 0)].rstrip(" \t`")) if cut > 0 and text[cut - 1] != "\n" else max(cut, 0)
+            if cut and self._is_safe_cut(text[:cut]):
+                return cut
+        return 0
+
+    def _emit(self, text: str) -> str:
+        """Collapse space and newline runs and strip leading/trailing whitespace across segments"""
+        text = SPACES_RE.sub(" ", self._held_space + text)
+        body = text.rstrip()
+        self._held_space = text[len(body):]
+        if not body:
+            return ""
+        if not self._emitted_any:
+            body = body.lstrip()
+            self._emitted_any = True
+        return EXTRA_NEWLINES_RE.sub("\n\n", body)
@@ -17,7 +17,7 @@ import logging
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 
 logger = logging.getLogger(__name__)
 
@@ -48,19 +48,10 @@ class UserSession:
     session_data: Dict[str, Any]
 
 class SessionManager:
-    def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle')
-        }
-
     def get_connection(self):
-        """Get database connection with error handling"""
+        """Get a pooled database connection with error handling"""
         try:
-            return psycopg2.connect(**self.db_config)
+            return get_pooled_connection()
         except psycopg2.OperationalError as e:
             print(f"❌ Database connection failed: {e}")
             raise
@@ -516,8 +507,8 @@ class SessionManager:
             if session and session.user_identifier:
                 # Validate that the user_identifier (email) exists in customers table
                 try:
-                    from config.database_config import CustomerRepository, DatabaseManager
-                    db_manager = DatabaseManager()
+                    from config.database_config import CustomerRepository, initialize_database
+                    db_manager = initialize_database()
                     customer_repo = CustomerRepository(db_manager)
                     customer = customer_repo.get_customer_by_email(session.user_identifier)
 
@@ -0,0 +1,158 @@
+"""
+🗃️ SQL Generation Cache for Enhanced Database Querying
+===============================================================================
+
+Caches LLM-generated SQL so repeat questions skip the Groq round trip:
+1. Keys combine the normalised user query, QueryType, entity set and RBAC scope
+2. In-process LRU in front of Redis (shared across gunicorn workers)
+3. Hit/miss counters for monitoring
+"""
+
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Any
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env
+
+logger = logging.getLogger(__name__)
+
+SQL_CACHE_TTL = safe_int_env('SQL_CACHE_TTL', 3600)
+SQL_CACHE_LRU_SIZE = safe_int_env('SQL_CACHE_LRU_SIZE', 512)
+SQL_CACHE_PREFIX = "sqlgen:v1:"
+
+# Entity keys that never influence the generated SQL (per-request bookkeeping)
+VOLATILE_ENTITY_KEYS = {'session_id', 'customer_name', 'customer_email', 'user_query', 'timestamp'}
+
+# Query types whose SQL depends on "today" (the prompt embeds the current WAT time)
+DATE_SENSITIVE_QUERY_TYPES = {'temporal_analysis', 'revenue_insights'}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(user_query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    normalized = _WHITESPACE_RE.sub(" ", (user_query or "").strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", normalized)
+
+
+class SQLQueryCache:
+    """Two-tier (LRU + Redis) cache for generated SQL queries"""
+
+    def __init__(self, redis_client=None, ttl: int = SQL_CACHE_TTL, max_local_entries: int = SQL_CACHE_LRU_SIZE):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'invalidations': 0,
+            'redis_errors': 0,
+        }
+
+    @staticmethod
+    def rbac_scope(entities: Dict[str, Any]) -> str:
+        """Describe the caller's data-access scope so results never leak across roles/customers"""
+        return "|".join(str(entities.get(key)) for key in (
+            'user_role', 'can_access_analytics', 'rbac_customer_filter',
+            'rbac_restrict_to_own', 'rbac_guest_mode', 'user_authenticated', 'customer_verified'
+        ))
+
+    def make_key(self, user_query: str, query_type, entities: Dict[str, Any]) -> str:
+        """Build a stable cache key from the normalised query, QueryType, entities and RBAC scope"""
+        entities = entities or {}
+        query_type_value = getattr(query_type, 'value', str(query_type))
+        entity_set = {k: v for k, v in entities.items() if k not in VOLATILE_ENTITY_KEYS}
+        payload = {
+            'q': normalize_query(user_query),
+            't': query_type_value,
+            'e': entity_set,
+            'r': self.rbac_scope(entities),
+        }
+        if query_type_value in DATE_SENSITIVE_QUERY_TYPES:
+            payload['d'] = datetime.now().strftime('%Y-%m-%d')
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return SQL_CACHE_PREFIX + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _remember_locally(self, key: str, sql_query: str):
+        with self._lock:
+            self._local[key] = sql_query
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached SQL for ``key`` or None"""
+        with self._lock:
+            sql_query = self._local.get(key)
+            if sql_query is not None:
+                self._local.move_to_end(key)
+                self._stats['local_hits'] += 1
+                return sql_query
+
+        if self.redis_client:
+            try:
+                sql_query = self.redis_client.get(key)
+            except Exception as e:
+                sql_query = None
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ SQL cache Redis read failed: {e}")
+            if sql_query:
+                self._remember_locally(key, sql_query)
+                with self._lock:
+                    self._stats['redis_hits'] += 1
+                return sql_query
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, sql_query: str):
+        """Store generated SQL in both tiers"""
+        if not sql_query:
+            return
+        self._remember_locally(key, sql_query)
+        with self._lock:
+            self._stats['stores'] += 1
+        if self.redis_client:
+            try:
+                self.redis_client.setex(key, self.ttl, sql_query)
+            except Exception as e:
+                with self._lock:
+                    self._stats['redis_errors'] += 1
+                logger.warning(f"⚠️ SQL cache Redis write failed: {e}")
+
+    def invalidate(self, key: str):
+        """Drop a cached entry, e.g. after the SQL failed to execute"""
+        with self._lock:
+            self._local.pop(key, None)
+            self._stats['invalidations'] += 1
+        if self.redis_client:
+            try:
+                self.redis_client.delete(key)
+            except Exception as e:
+                logger.warning(f"⚠️ SQL cache Redis delete failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        hits = stats['local_hits'] + stats['redis_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,333 @@
+"""
+📐 Parameterised SQL Template Library for Enhanced Database Querying
+===============================================================================
+
+Hand-written, pre-validated SQL for the highest-traffic QueryType buckets:
+1. Order status (single order or the customer's recent orders)
+2. Spending totals
+3. Account tier information
+4. Product search
+
+Templates are matched from the extracted entities and executed with bound
+parameters, so the common questions never reach the LLM SQL generator or the
+regex post-processing in ``_apply_critical_sql_fixes``.
+"""
+
+import re
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAFF_ROLES = {'support_agent', 'admin', 'super_admin'}
+
+# Synonym expansion used by the product search template
+PRODUCT_SYNONYMS = {
+    'phone': ['smartphone', 'mobile', 'iphone', 'samsung'],
+    'phones': ['smartphone', 'mobile', 'iphone', 'samsung', 'cell phone'],
+    'ios': ['iphone', 'ipad', 'apple'],
+    'apple': ['iphone', 'ipad', 'macbook'],
+    'ipads': ['ipad'],
+    'tablet': ['ipad', 'samsung tab'],
+    'laptop': ['macbook', 'hp', 'dell', 'lenovo'],
+    'computer': ['laptop', 'macbook', 'hp', 'dell'],
+    'android': ['samsung', 'tecno', 'infinix']
+}
+
+ORDER_ID_RE = re.compile(r'\border\s*(?:id\s*|number\s*|no\.?\s*|#\s*)?#?(\d{3,})\b')
+_PLACEHOLDER_RE = re.compile(r'%\((\w+)\)s')
+
+
+@dataclass
+class SQLTemplate:
+    """A parameterised SELECT statement plus the rule that decides when it applies"""
+    name: str
+    query_types: Tuple[str, ...]
+    sql: str
+    matcher: Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]
+    priority: int = 100
+    params: Tuple[str, ...] = field(default=(), init=False)
+
+    def __post_init__(self):
+        self.sql = " ".join(self.sql.split())
+        self.params = tuple(dict.fromkeys(_PLACEHOLDER_RE.findall(self.sql)))
+        self._validate()
+
+    def _validate(self):
+        """Reject anything that is not a single read-only statement with named placeholders"""
+        statement = self.sql.rstrip(';').strip()
+        if not statement.upper().startswith(('SELECT', 'WITH')):
+            raise ValueError(f"SQL template '{self.name}' must be a SELECT statement")
+        if ';' in statement:
+            raise ValueError(f"SQL template '{self.name}' must contain a single statement")
+        if '%' in _PLACEHOLDER_RE.sub('', statement).replace('%%', ''):
+            raise ValueError(f"SQL template '{self.name}' contains a bare '%'; escape it as '%%'")
+
+
+def resolve_customer_scope(entities: Dict[str, Any]) -> Optional[int]:
+    """
+    Customer whose data a template may read, honouring RBAC:
+    staff use the customer under discussion, customers only ever see themselves,
+    guests get nothing.
+    """
+    user_role = entities.get('user_role', 'guest')
+    if user_role in STAFF_ROLES:
+        if entities.get('context_customer_ids'):
+            return None  # multi-customer follow-ups are left to the LLM
+        return entities.get('context_customer_id')
+
+    if entities.get('rbac_guest_mode') or not entities.get('user_authenticated') or not entities.get('customer_verified'):
+        return None
+    return entities.get('rbac_customer_filter') or entities.get('customer_id')
+
+
+def _extract_order_id(query_lower: str, entities: Dict[str, Any]) -> Optional[int]:
+    match = ORDER_ID_RE.search(query_lower)
+    if match:
+        return int(match.group(1))
+    order_id = entities.get('order_id')
+    if order_id is not None and str(order_id).isdigit():
+        return int(order_id)
+    return None
+
+
+ORDER_STATUS_PHRASES = ('order status', 'status of my order', 'status of order', 'track my order', 'track order',
+                        'where is my order', 'my orders', 'my order', 'order history', 'tracking')
+SPENDING_PHRASES = ('how much have i spent', 'how much did i spend', 'how much i have spent', 'total spent',
+                    'total spending', 'my spending', 'total i spent', 'how much has this customer spent')
+SPENDING_EXCLUSIONS = ('breakdown', 'category', 'categories', 'month', 'per ', ' by ', 'platinum', 'how much more')
+TIER_PHRASES = ('my tier', 'account tier', 'what tier', 'which tier', 'current tier', 'tier am i', 'my account level')
+TIER_EXCLUSIONS = ('benefit', 'perk', 'how much more', 'upgrade', 'next tier', 'their')
+PRODUCT_SEARCH_EXCLUSIONS = ('most', 'best selling', 'best-selling', 'top ', 'popular', 'performance', 'revenue', 'sales')
+
+
+def _match_order_by_id_for_customer(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if entities.get('user_role', 'guest') in STAFF_ROLES or entities.get('needs_customer_lookup'):
+        return None
+    order_id = _extract_order_id(query_lower, entities)
+    customer_id = resolve_customer_scope(entities)
+    if order_id is None or customer_id is None:
+        return None
+    return {'order_id': order_id, 'customer_id': customer_id}
+
+
+def _match_order_by_id_for_staff(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if entities.get('user_role') not in STAFF_ROLES or entities.get('needs_customer_lookup'):
+        return None
+    order_id = _extract_order_id(query_lower, entities)
+    return {'order_id': order_id} if order_id is not None else None
+
+
+def _match_customer_orders(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not any(phrase in query_lower for phrase in ORDER_STATUS_PHRASES):
+        return None
+    if _extract_order_id(query_lower, entities) is not None:
+        return None
+    customer_id = resolve_customer_scope(entities)
+    return {'customer_id': customer_id} if customer_id is not None else None
+
+
+def _match_total_spending(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not any(phrase in query_lower for phrase in SPENDING_PHRASES):
+        return None
+    if any(word in query_lower for word in SPENDING_EXCLUSIONS):
+        return None
+    customer_id = resolve_customer_scope(entities)
+    return {'customer_id': customer_id} if customer_id is not None else None
+
+
+def _match_account_tier(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not any(phrase in query_lower for phrase in TIER_PHRASES):
+        return None
+    if any(word in query_lower for word in TIER_EXCLUSIONS):
+        return None
+    customer_id = resolve_customer_scope(entities)
+    return {'customer_id': customer_id} if customer_id is not None else None
+
+
+def _match_product_search(query_lower: str, entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if any(word in query_lower for word in PRODUCT_SEARCH_EXCLUSIONS):
+        return None
+
+    terms: List[str] = []
+    terms.extend(entities.get('product_keywords') or [])
+    terms.extend(entities.get('brands') or [])
+    # Only trust categories the user actually named (classification also infers them)
+    terms.extend(c for c in (entities.get('product_categories') or []) if c.lower() in query_lower)
+    terms = [t.strip() for t in terms if isinstance(t, str) and t.strip()][:3]
+    if not terms:
+        return None
+
+    expanded: List[str] = []
+    for term in terms:
+        expanded.append(term)
+        expanded.extend(PRODUCT_SYNONYMS.get(term.lower(), []))
+    patterns = [f"%{term}%" for term in dict.fromkeys(expanded)]
+
+    return {
+        'patterns': patterns,
+        'primary_pattern': patterns[0],
+        'max_budget': entities.get('max_budget'),
+    }
+
+
+class SQLTemplateRegistry:
+    """Registry of SQL templates grouped by QueryType and tried in priority order"""
+
+    def __init__(self):
+        self._templates: Dict[str, List[SQLTemplate]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {'matches': 0, 'misses': 0}
+        self._template_hits: Dict[str, int] = {}
+
+    def register(self, template: SQLTemplate):
+        for query_type in template.query_types:
+            bucket = self._templates.setdefault(query_type, [])
+            bucket.append(template)
+            bucket.sort(key=lambda t: t.priority)
+        self._template_hits.setdefault(template.name, 0)
+
+    def match(self, user_query: str, query_type, entities: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any], str]]:
+        """Return ``(sql, params, template_name)`` for the first matching template, or None"""
+        query_type_value = getattr(query_type, 'value', str(query_type))
+        query_lower = (user_query or '').lower()
+        entities = entities or {}
+
+        for template in self._templates.get(query_type_value, []):
+            try:
+                params = template.matcher(query_lower, entities)
+            except Exception as e:
+                logger.warning(f"⚠️ SQL template '{template.name}' matcher failed: {e}")
+                continue
+            if params is None:
+                continue
+            missing = [name for name in template.params if name not in params]
+            if missing:
+                logger.warning(f"⚠️ SQL template '{template.name}' missing params {missing}")
+                continue
+            with self._lock:
+                self._stats['matches'] += 1
+                self._template_hits[template.name] += 1
+            return template.sql, {name: params[name] for name in template.params}, template.name
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'templates': dict(self._template_hits)}
+
+
+ORDER_COLUMNS = """o.order_id, o.order_status, o.payment_method, o.total_amount,
+                   o.delivery_date, o.created_at, o.product_category"""
+
+STOCK_STATUS_CASE = """CASE
+                           WHEN p.stock_quantity = 0 THEN 'Out of Stock'
+                           WHEN p.stock_quantity <= 5 THEN 'Low Stock'
+                           WHEN p.stock_quantity <= 15 THEN 'Limited Stock'
+                           ELSE 'In Stock'
+                       END as stock_status"""
+
+
+def build_default_registry() -> SQLTemplateRegistry:
+    """Templates for the top intents, mirroring the hand-written fallback queries"""
+    registry = SQLTemplateRegistry()
+
+    registry.register(SQLTemplate(
+        name='order_by_id_customer',
+        query_types=('order_analytics', 'customer_support'),
+        priority=10,
+        matcher=_match_order_by_id_for_customer,
+        sql=f"""
+            SELECT {ORDER_COLUMNS}, c.name as customer_name
+            FROM orders o
+            JOIN customers c ON o.customer_id = c.customer_id
+            WHERE o.order_id = %(order_id)s AND o.customer_id = %(customer_id)s;
+        """,
+    ))
+
+    registry.register(SQLTemplate(
+        name='order_by_id_staff',
+        query_types=('order_analytics', 'customer_support'),
+        priority=10,
+        matcher=_match_order_by_id_for_staff,
+        sql=f"""
+            SELECT {ORDER_COLUMNS}, c.customer_id, c.name as customer_name, c.email
+            FROM orders o
+            JOIN customers c ON o.customer_id = c.customer_id
+            WHERE o.order_id = %(order_id)s;
+        """,
+    ))
+
+    registry.register(SQLTemplate(
+        name='customer_orders',
+        query_types=('order_analytics', 'customer_support'),
+        priority=20,
+        matcher=_match_customer_orders,
+        sql=f"""
+            SELECT {ORDER_COLUMNS}, c.name as customer_name, c.address, c.state, c.lga
+            FROM orders o
+            JOIN customers c ON o.customer_id = c.customer_id
+            WHERE o.customer_id = %(customer_id)s
+            ORDER BY o.created_at DESC
+            LIMIT 20;
+        """,
+    ))
+
+    registry.register(SQLTemplate(
+        name='customer_total_spending',
+        query_types=('customer_support', 'revenue_insights'),
+        priority=30,
+        matcher=_match_total_spending,
+        sql="""
+            SELECT COALESCE(SUM(total_amount), 0) AS total_spent,
+                   COUNT(*) AS total_orders,
+                   COALESCE(AVG(total_amount), 0) AS avg_order_value
+            FROM orders
+            WHERE customer_id = %(customer_id)s
+              AND (order_status != 'Returned' OR order_status IS NULL);
+        """,
+    ))
+
+    registry.register(SQLTemplate(
+        name='customer_account_tier',
+        query_types=('customer_support', 'customer_analysis'),
+        priority=40,
+        matcher=_match_account_tier,
+        sql="""
+            SELECT customer_id, name, account_tier, created_at
+            FROM customers
+            WHERE customer_id = %(customer_id)s;
+        """,
+    ))
+
+    registry.register(SQLTemplate(
+        name='product_search',
+        query_types=('product_info_general', 'product_performance', 'stock_check', 'price_inquiry'),
+        priority=50,
+        matcher=_match_product_search,
+        sql=f"""
+            SELECT p.product_id, p.product_name, p.category, p.brand, p.description,
+                   p.price, p.currency, p.in_stock, p.stock_quantity,
+                   {STOCK_STATUS_CASE}
+            FROM products p
+            WHERE (p.product_name ILIKE ANY(%(patterns)s)
+                   OR p.brand ILIKE ANY(%(patterns)s)
+                   OR p.category ILIKE ANY(%(patterns)s))
+              AND p.in_stock = TRUE
+              AND (%(max_budget)s IS NULL OR p.price <= %(max_budget)s)
+            ORDER BY (p.product_name ILIKE %(primary_pattern)s) DESC,
+                     p.stock_quantity DESC,
+                     p.price ASC
+            LIMIT 10;
+        """,
+    ))
+
+    return registry
+
+
+# Global registry shared by every EnhancedDatabaseQuerying instance
+sql_template_registry = build_default_registry()
@@ -0,0 +1,315 @@
+"""
+📥 Bulk Vector Indexer for the Qdrant customer_data Collection
+===============================================================================
+
+Populates the collection that search_vector_database queries:
+1. Streams customers, products and orders from PostgreSQL with server-side cursors
+2. Embeds each batch with one batch request, skipping texts already in the EmbeddingCache
+3. Upserts into Qdrant in batches with deterministic point ids (re-runs are idempotent)
+4. Records a per-source checkpoint after every upserted batch so runs can resume
+"""
+
+import os
+import json
+import uuid
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+import sys
+from pathlib import Path
+
+import google.generativeai as genai
+from psycopg2.extras import RealDictCursor
+from qdrant_client.models import Distance, VectorParams, PointStruct
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from config.database_config import safe_int_env, safe_str_env
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_TASK_TYPE = "retrieval_document"
+VECTOR_COLLECTION_NAME = "customer_data"
+# batchEmbedContents accepts at most 100 texts per request
+EMBEDDING_REQUEST_LIMIT = 100
+VECTOR_INDEX_BATCH_SIZE = safe_int_env('VECTOR_INDEX_BATCH_SIZE', 100)
+VECTOR_INDEX_FETCH_SIZE = safe_int_env('VECTOR_INDEX_FETCH_SIZE', 2000)
+VECTOR_INDEX_EMBED_CONCURRENCY = safe_int_env('VECTOR_INDEX_EMBED_CONCURRENCY', 4)
+VECTOR_INDEX_CHECKPOINT_FILE = safe_str_env('VECTOR_INDEX_CHECKPOINT_FILE', '.vector_index_checkpoint.json')
+
+# Namespace for deterministic Qdrant point ids ("<source>:<primary key>")
+POINT_ID_NAMESPACE = uuid.UUID('6f1c2a8e-4b7d-4e59-9a3c-2d8f0b1e7c45')
+
+
+def embed_texts(texts: List[str], cache=None, model: str = EMBEDDING_MODEL,
+                task_type: str = EMBEDDING_TASK_TYPE) -> List[List[float]]:
+    """Embed texts with one batch request per EMBEDDING_REQUEST_LIMIT texts, serving cached vectors first"""
+    if not texts:
+        return []
+
+    keys = [cache.make_key(text, model, task_type) for text in texts] if cache else []
+    embeddings = cache.get_many(keys) if cache else [None] * len(texts)
+    missing = [position for position, embedding in enumerate(embeddings) if embedding is None]
+
+    for start in range(0, len(missing), EMBEDDING_REQUEST_LIMIT):
+        positions = missing[start:start + EMBEDDING_REQUEST_LIMIT]
+        result = genai.embed_content(
+            model=model,
+            content=[texts[position] for position in positions],
+            task_type=task_type
+        )
+        for position, embedding in zip(positions, result['embedding']):
+            embeddings[position] = embedding
+        if cache:
+            cache.set_many([keys[position] for position in positions], result['embedding'])
+
+    return embeddings
+
+
+def _json_safe(value: Any) -> Any:
+    """Payload values must be JSON serialisable (NUMERIC, DATE, JSONB columns)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+@dataclass
+class IndexSource:
+    """A table streamed into the collection"""
+    name: str
+    id_column: str
+    query: str  # must select ``id_column`` and accept a single ``> %s`` keyset parameter
+    to_text: Callable[[Dict[str, Any]], str]
+    payload_fields: tuple
+
+
+def _customer_text(row: Dict[str, Any]) -> str:
+    preferences = row.get('preferences') or {}
+    if not isinstance(preferences, str):
+        preferences = json.dumps(preferences, default=str)
+    return (f"Customer {row['name']} ({row['account_tier']} tier) from {row['lga']}, {row['state']}. "
+            f"Preferences: {preferences}")
+
+
+def _product_text(row: Dict[str, Any]) -> str:
+    stock = "in stock" if row.get('in_stock') else "out of stock"
+    return (f"Product {row['product_name']} by {row.get('brand') or 'unbranded'} in {row['category']}, "
+            f"₦{float(row['price']):,.2f}, {stock}. {row.get('description') or ''}").strip()
+
+
+def _order_text(row: Dict[str, Any]) -> str:
+    return (f"Order #{row['order_id']} for customer {row['customer_id']}: {row['order_status']}, "
+            f"{row['product_category'] or 'general'} items, ₦{float(row['total_amount']):,.2f} "
+            f"paid by {row['payment_method']}, placed {row['created_at']:%Y-%m-%d}, "
+            f"delivery {row['delivery_date'] or 'not scheduled'}")
+
+
+# Contact details (email, phone, address) are deliberately not indexed: search results are
+# added to chat context, so only non-contact profile fields go into the vectors and payloads
+INDEX_SOURCES = {
+    'customers': IndexSource(
+        name='customers',
+        id_column='customer_id',
+        query="""
+            SELECT customer_id, name, state, lga, account_tier::text AS account_tier, preferences
+            FROM customers WHERE customer_id > %s ORDER BY customer_id
+        """,
+        to_text=_customer_text,
+        payload_fields=('customer_id', 'name', 'state', 'lga', 'account_tier'),
+    ),
+    'products': IndexSource(
+        name='products',
+        id_column='product_id',
+        query="""
+            SELECT product_id, product_name, category, brand, description, price, currency, in_stock
+            FROM products WHERE product_id > %s ORDER BY product_id
+        """,
+        to_text=_product_text,
+        payload_fields=('product_id', 'product_name', 'category', 'brand', 'price', 'currency', 'in_stock'),
+    ),
+    'orders': IndexSource(
+        name='orders',
+        id_column='order_id',
+        query="""
+            SELECT order_id, customer_id, order_status::text AS order_status,
+                   payment_method::text AS payment_method, total_amount, delivery_date,
+                   product_category, created_at
+            FROM orders WHERE order_id > %s ORDER BY order_id
+        """,
+        to_text=_order_text,
+        payload_fields=('order_id', 'customer_id', 'order_status', 'payment_method',
+                        'total_amount', 'delivery_date', 'product_category', 'created_at'),
+    ),
+}
+
+
+class VectorIndexer:
+    """Streams PostgreSQL rows into Qdrant with batched embeddings and resumable checkpoints"""
+
+    def __init__(self, db_manager, qdrant_client, embedding_cache=None,
+                 collection_name: str = VECTOR_COLLECTION_NAME,
+                 checkpoint_file: str = VECTOR_INDEX_CHECKPOINT_FILE,
+                 batch_size: int = VECTOR_INDEX_BATCH_SIZE,
+                 fetch_size: int = VECTOR_INDEX_FETCH_SIZE,
+                 embed_concurrency: int = VECTOR_INDEX_EMBED_CONCURRENCY,
+                 embed_fn: Callable[..., List[List[float]]] = embed_texts):
+        self.db_manager = db_manager
+        self.qdrant_client = qdrant_client
+        self.embedding_cache = embedding_cache
+        self.collection_name = collection_name
+        self.checkpoint_file = checkpoint_file
+        self.batch_size = max(1, batch_size)
+        self.fetch_size = max(self.batch_size, fetch_size)
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.embed_fn = embed_fn
+        self.checkpoints = self._load_checkpoints()
+        self._collection_ready = False
+
+    # ------------------------------------------------------------------ checkpoints
+
+    def _load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoints = json.load(f)
+            # Checkpoints only make sense for the collection they were written for
+            return checkpoints.get(self.collection_name, {})
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read vector index checkpoint {self.checkpoint_file}: {e}")
+            return {}
+
+    def _save_checkpoint(self, source: str, last_id: int, indexed: int):
+        self.checkpoints[source] = {
+            'last_id': last_id,
+            'indexed': indexed,
+            'updated_at': datetime.now().isoformat(),
+        }
+        if not self.checkpoint_file:
+            return
+        try:
+            existing = {}
+            if os.path.exists(self.checkpoint_file):
+                with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+            existing[self.collection_name] = self.checkpoints
+            # Write then rename so an interrupted run never leaves a truncated checkpoint
+            tmp_path = f"{self.checkpoint_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(existing, f, indent=2)
+            os.replace(tmp_path, self.checkpoint_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write vector index checkpoint: {e}")
+
+    def reset_checkpoints(self, sources: Optional[List[str]] = None):
+        """Forget progress so the next run re-indexes from the start"""
+        for source in sources or list(self.checkpoints):
+            self.checkpoints.pop(source, None)
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            existing[self.collection_name] = self.checkpoints
+            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
+                json.dump(existing, f, indent=2)
+
+    # ------------------------------------------------------------------ pipeline
+
+    def _ensure_collection(self, vector_size: int):
+        if self._collection_ready:
+            return
+        existing = {collection.name for collection in self.qdrant_client.get_collections().collections}
+        if self.collection_name not in existing:
+            self.qdrant_client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+            )
+            logger.info(f"✅ Created collection '{self.collection_name}' with {vector_size} dimensions")
+        self._collection_ready = True
+
+    def _stream_batches(self, source: IndexSource, after_id: int):
+        """Yield row batches from a named (server-side) cursor, resuming after ``after_id``"""
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor(name=f"vector_index_{source.name}", cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = self.fetch_size
+                cursor.execute(source.query, (after_id,))
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+
+    def _embed_batch(self, source: IndexSource, rows: List[Dict[str, Any]]):
+        texts = [source.to_text(row) for row in rows]
+        return rows, texts, self.embed_fn(texts, cache=self.embedding_cache)
+
+    def _upsert_batch(self, source: IndexSource, rows, texts, embeddings) -> int:
+        points = []
+        for row, text, embedding in zip(rows, texts, embeddings):
+            if not embedding:
+                continue
+            payload = {field: _json_safe(row.get(field)) for field in source.payload_fields}
+            payload.update({'source': source.name, 'text': text})
+            points.append(PointStruct(
+                id=str(uuid.uuid5(POINT_ID_NAMESPACE, f"{source.name}:{row[source.id_column]}")),
+                vector=embedding,
+                payload=payload
+            ))
+        if points:
+            self._ensure_collection(len(points[0].vector))
+            self.qdrant_client.upsert(collection_name=self.collection_name, points=points, wait=True)
+        return len(points)
+
+    def index_source(self, name: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Index one table; embeddings run ``embed_concurrency`` batches ahead of the upserts"""
+        source = INDEX_SOURCES[name]
+        checkpoint = self.checkpoints.get(name, {})
+        last_id = checkpoint.get('last_id', 0)
+        indexed = checkpoint.get('indexed', 0)
+        started = datetime.now()
+        processed = 0
+        logger.info(f"📥 Indexing {name} into '{self.collection_name}' after {source.id_column} {last_id}")
+
+        def drain(pending: deque):
+            # Upsert strictly in stream order so the checkpoint never skips an unwritten batch
+            nonlocal last_id, indexed
+            rows, texts, embeddings = pending.popleft().result()
+            indexed += self._upsert_batch(source, rows, texts, embeddings)
+            last_id = rows[-1][source.id_column]
+            self._save_checkpoint(name, last_id, indexed)
+
+        with ThreadPoolExecutor(max_workers=self.embed_concurrency,
+                                thread_name_prefix=f"embed-{name}") as executor:
+            pending = deque()
+            for rows in self._stream_batches(source, last_id):
+                if limit is not None and processed >= limit:
+                    break
+                if limit is not None:
+                    rows = rows[:limit - processed]
+                processed += len(rows)
+                pending.append(executor.submit(self._embed_batch, source, rows))
+                if len(pending) >= self.embed_concurrency:
+                    drain(pending)
+            while pending:
+                drain(pending)
+
+        elapsed = (datetime.now() - started).total_seconds()
+        rate = processed / elapsed if elapsed else 0.0
+        logger.info(f"✅ Indexed {processed} {name} rows in {elapsed:.1f}s ({rate:.0f} rows/s)")
+        return {
+            'source': name,
+            'processed': processed,
+            'indexed_total': indexed,
+            'last_id': last_id,
+            'elapsed_s': round(elapsed, 2),
+        }
+
+    def index_all(self, sources: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Index every configured source (customers, products, orders by default)"""
+        return [self.index_source(name, limit=limit) for name in (sources or list(INDEX_SOURCES))]
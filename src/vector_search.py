@@ -0,0 +1,101 @@
+"""
+🔍 Qdrant Collection Registry for Vector Search
+===============================================================================
+
+Keeps vector lookups to one Qdrant round trip:
+1. Collection names are listed once at startup and cached in-process
+2. The registry is refreshed only when a search fails (collection dropped/recreated)
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+from qdrant_client.models import Distance, VectorParams
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionRegistry:
+    """In-process view of which Qdrant collections exist"""
+
+    def __init__(self, qdrant_client):
+        self.qdrant_client = qdrant_client
+        self._collections: set = set()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stats = {
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'created': 0,
+            'last_refresh': None,
+        }
+
+    def refresh(self) -> set:
+        """List collections from Qdrant (startup verification and error recovery)"""
+        try:
+            names = {collection.name for collection in self.qdrant_client.get_collections().collections}
+        except Exception:
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+            raise
+        with self._lock:
+            self._collections = names
+            self._loaded = True
+            self._stats['refreshes'] += 1
+            self._stats['last_refresh'] = datetime.now().isoformat()
+        return names
+
+    def exists(self, collection_name: str) -> bool:
+        """Cached existence check; lists collections only if startup verification never succeeded"""
+        if not self._loaded:
+            self.refresh()
+        with self._lock:
+            return collection_name in self._collections
+
+    def ensure(self, collection_name: str, vector_size: int) -> bool:
+        """Create ``collection_name`` if missing; returns True when it was just created"""
+        if self.exists(collection_name):
+            return False
+        with self._lock:
+            if collection_name in self._collections:
+                return False
+            try:
+                self.qdrant_client.create_collection(
+                    collection_name=collection_name,
+                    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+                )
+            except Exception:
+                # Another worker may have created it since the registry was loaded
+                names = {collection.name for collection in self.qdrant_client.get_collections().collections}
+                self._collections = names
+                if collection_name in names:
+                    return False
+                raise
+            self._collections.add(collection_name)
+            self._stats['created'] += 1
+        logger.info(f"✅ Created collection '{collection_name}' with {vector_size} dimensions")
+        return True
+
+    def handle_search_error(self, collection_name: str, error: Exception):
+        """A failed search may mean the collection was dropped; re-list before the next search"""
+        logger.warning(f"⚠️ Search on '{collection_name}' failed ({error}), refreshing collection registry")
+        try:
+            self.refresh()
+        except Exception as refresh_error:
+            with self._lock:
+                self._collections.discard(collection_name)
+            logger.warning(f"⚠️ Collection registry refresh failed: {refresh_error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['collections'] = sorted(self._collections)
+            stats['loaded'] = self._loaded
+        return stats
+
+
+def format_hits(hits) -> List[Dict]:
+    return [{"id": hit.id, "score": hit.score, "payload": hit.payload} for hit in hits]
+
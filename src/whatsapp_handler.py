@@ -25,7 +25,7 @@ from dataclasses import dataclass
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 
 load_dotenv(override=True)
 
@@ -95,7 +95,6 @@ class WhatsAppConfig:
     verify_token: str
     access_token: str
     phone_number_id: str
-    db_config: Dict[str, str]
 
     def __init__(self):
         from config.appconfig import (
@@ -110,14 +109,6 @@ class WhatsAppConfig:
         self.api_base_url = WHATSAPP_API_BASE_URL
         self.developer_number = DEVELOPER_WHATSAPP_NUMBER
         self.verify_token = WHATSAPP_WEBHOOK_VERIFY_TOKEN  # Use the same token
-        # Database configuration
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle'),
-        }
 
     def is_configured(self) -> bool:
         """Check if all required configuration is available"""
@@ -156,9 +147,9 @@ class WhatsAppBusinessHandler:
             self.agent_memory = None
 
     def get_database_connection(self):
-        """Get database connection"""
+        """Get a connection from the shared process-wide pool"""
         try:
-            return psycopg2.connect(**self.config.db_config)
+            return get_pooled_connection()
         except Exception as e:
             logger.error(f"❌ Database connection error: {e}")
             raise
@@ -2320,12 +2311,12 @@ If you already have a RaqibTech account with email, you can link it to this What
                     'confidence': 0.8
                 })
 
-            # Store the insights in agent memory
+            # Queue the insights; the ingest worker embeds them in batches and schedules consolidation
             from .agent_memory_system import MemoryType
             for insight in insights_to_store:
                 memory_type = MemoryType.EPISODIC if insight['type'] == 'episodic' else MemoryType.SEMANTIC
 
-                success = self.agent_memory.store_memory(
+                queued = self.agent_memory.enqueue_memory(
                     content=insight['content'],
                     memory_type=memory_type,
                     user_id=user_id,
@@ -2333,12 +2324,8 @@ If you already have a RaqibTech account with email, you can link it to this What
                     confidence_score=insight['confidence']
                 )
 
-                if success:
-                    logger.info(f"📝 Stored WhatsApp agent memory for {user_id}: {insight['content'][:50]}...")
-
-            # Schedule memory consolidation if we stored insights
-            if insights_to_store:
-                self.agent_memory.schedule_memory_consolidation(user_id)
+                if queued:
+                    logger.info(f"📝 Queued WhatsApp agent memory for {user_id}: {insight['content'][:50]}...")
 
         except Exception as e:
             logger.error(f"❌ Error storing WhatsApp agent memory insights: {e}")
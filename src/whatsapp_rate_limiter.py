@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
-from config.database_config import safe_int_env, safe_str_env
+from config.database_config import get_pooled_connection
 
 load_dotenv()
 
@@ -53,19 +53,10 @@ class WhatsAppRateLimiter:
     Manages rate limiting for WhatsApp conversations and messages
     """
 
-    def __init__(self):
-        self.db_config = {
-            'host': safe_str_env('DB_HOST', 'localhost'),
-            'port': safe_int_env('DB_PORT', 5432),
-            'database': safe_str_env('DB_NAME', 'nigerian_ecommerce'),
-            'user': safe_str_env('DB_USER', 'postgres'),
-            'password': safe_str_env('DB_PASSWORD', 'oracle')
-        }
-
     def get_database_connection(self):
-        """Get database connection with error handling"""
+        """Get a pooled database connection with error handling"""
         try:
-            return psycopg2.connect(**self.db_config)
+            return get_pooled_connection()
         except Exception as e:
             logger.error(f"❌ Database connection failed: {e}")
             raise